@@ -0,0 +1,72 @@
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db.models import Count
+
+from .models import COUNTED_MODELS, UserActivity
+
+
+COUNTERS = tuple(COUNTED_MODELS.values())
+
+
+def count_by_user(user_ids=None):
+    """
+    Recount every activity counter with one GROUP BY per counted model
+
+    Args:
+        user_ids (iterable): Limit to these users (default: all users)
+
+    Returns:
+        dict: {user_id: {counter: count}}, zero counts included for user_ids
+    """
+    totals = {}
+    if user_ids is not None:
+        totals = {user_id: dict.fromkeys(COUNTERS, 0) for user_id in user_ids}
+
+    for label, counter in COUNTED_MODELS.items():
+        rows = apps.get_model(label).objects.all()
+        if user_ids is not None:
+            rows = rows.filter(user_id__in=list(totals))
+        for user_id, count in rows.order_by().values('user_id').annotate(n=Count('id')).values_list('user_id', 'n'):
+            totals.setdefault(user_id, dict.fromkeys(COUNTERS, 0))[counter] = count
+    return totals
+
+
+def get_activity(user):
+    """A user's activity row, created from a recount if it does not exist yet"""
+    try:
+        return UserActivity.objects.get(user=user)
+    except UserActivity.DoesNotExist:
+        counts = count_by_user([user.id])[user.id]
+        activity, _ = UserActivity.objects.get_or_create(user=user, defaults=counts)
+        return activity
+
+
+def reconcile(batch_size=1000):
+    """
+    Recompute all activity rows and fix any that drifted
+
+    Args:
+        batch_size (int): Rows per bulk upsert
+
+    Returns:
+        int: Number of rows created or corrected
+    """
+    actual = count_by_user(User.objects.values_list('id', flat=True))
+    stored = {
+        row[0]: dict(zip(COUNTERS, row[1:]))
+        for row in UserActivity.objects.values_list('user_id', *COUNTERS)
+    }
+
+    changed = [
+        UserActivity(user_id=user_id, **counts)
+        for user_id, counts in actual.items()
+        if stored.get(user_id) != counts
+    ]
+    UserActivity.objects.bulk_create(
+        changed,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=list(COUNTERS) + ['updated_at'],
+    )
+    return len(changed)
@@ -1,8 +1,21 @@
 from django.contrib import admin
-from .models import FarmerProfile
+from .models import AccountDeletion, FarmerProfile, UserActivity
 # Register your models here.
 
 @admin.register(FarmerProfile)
 class FarmerProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'location', 'farm_size', 'created_at']
-    search_fields = ['user__username', 'location']
\ No newline at end of file
+    search_fields = ['user__username', 'location']
+
+@admin.register(UserActivity)
+class UserActivityAdmin(admin.ModelAdmin):
+    list_display = ['user', 'detection_count', 'post_count', 'comment_count', 'location_count', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = ['detection_count', 'post_count', 'comment_count', 'location_count']
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ['username', 'user_id', 'status', 'files_deleted', 'requested_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['username']
+    readonly_fields = ['user_id', 'username', 'progress', 'files_deleted', 'error', 'requested_at', 'started_at', 'finished_at']
@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.functions import Lower
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+# Every authenticated request resolves its token to a User. The row (with
+# the farmer profile, which most endpoints read) is cached per token
+# subject for a short time. Saving or deleting the user or the profile
+# drops the entry (see the receivers in models.py); the TTL bounds how
+# long a write that skips signals (a queryset update), or one made in
+# another worker when the cache is per-process, can go unseen.
+
+def user_cache_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+def cached_user(user_id):
+    """The user with this id, profile loaded, from the cache if possible (None if not found)"""
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.select_related('profile').filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is not None:
+            cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def users_with_email(email):
+    """
+    Users with this email, ignoring case
+
+    Compares LOWER(email), the expression of the unique index on auth_user
+    (accounts migration 0004), so the lookup is an index search.
+    """
+    return User.objects.annotate(email_lower=Lower('email')).filter(email_lower=email.strip().lower())
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication reading the token's user through cached_user
+
+    Same checks as the parent (user exists and is active, password not
+    changed when CHECK_REVOKE_TOKEN is on), without a query per request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,175 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.utils import timezone
+
+from calendar_app import occurrences
+from calendar_app.models import Event, ScheduleSuggestion
+from calendar_app.serializers import EventListSerializer
+from detection.models import DetectionRecord
+from weather.forecast import Forecast, is_compact
+from weather.models import FarmLocation, WeatherCache
+from weather.services import cache_cutoff, coordinate_cache_key
+from .activity import get_activity
+from .models import UserActivity
+from .serializers import RecentDetectionSerializer
+
+logger = logging.getLogger(__name__)
+
+
+# The dashboard page in one response. Its parts are independent reads. By
+# default (DASHBOARD_WORKERS=0) they run in turn in the request thread; with
+# a database server (e.g. Postgres) DASHBOARD_WORKERS > 0 runs them
+# concurrently on a small pool of worker threads, each with its own database
+# connection (recycled like a request's). On SQLite the queries all run in
+# this process and concurrency gains nothing. The assembled rows
+# are cached under one key per user, dropped when the user's detections,
+# posts, comments, locations or events change (see models.py).
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.DASHBOARD_WORKERS, thread_name_prefix='dashboard')
+    return _executor
+
+
+def dashboard_cache_key(user_id):
+    return f"accounts:dashboard:{user_id}"
+
+
+def forget_dashboard(user_id):
+    cache.delete(dashboard_cache_key(user_id))
+
+
+def in_worker(function, *args):
+    """Run function(*args) on the dashboard pool (inline if DASHBOARD_WORKERS is 0), returning a Future"""
+    if not settings.DASHBOARD_WORKERS:
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def run():
+        close_old_connections()
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+    return executor().submit(run)
+
+
+def counts(user, today):
+    """
+    Every dashboard count in one statement: the denormalized activity row,
+    with the average detection confidence and pending scheduling conflicts
+    as subquery annotations
+    """
+    user_id = user.pk
+    average_confidence = DetectionRecord.objects.filter(
+        user_id=OuterRef('user_id')
+    ).order_by().values('user_id').annotate(average=Avg('confidence')).values('average')
+    conflicts = ScheduleSuggestion.objects.filter(
+        user_id=OuterRef('user_id'),
+        date__gte=today
+    ).order_by().values('user_id').annotate(total=Count('id')).values('total')
+
+    rows = UserActivity.objects.filter(user_id=user_id).annotate(
+        average_confidence=Subquery(average_confidence),
+        scheduling_conflicts=Subquery(conflicts)
+    ).values('detection_count', 'post_count', 'comment_count', 'location_count',
+             'average_confidence', 'scheduling_conflicts')
+    row = rows.first()
+    if row is None:
+        get_activity(user)  # created from a recount
+        row = rows.first()
+    return row
+
+
+def disease_breakdown(user_id, limit=5):
+    return list(DetectionRecord.objects.filter(
+        user_id=user_id,
+        detected_disease__isnull=False
+    ).values('detected_disease__name').annotate(count=Count('id')).order_by('-count', 'detected_disease__name')[:limit])
+
+
+def recent_detections(user_id, limit=3):
+    return list(RecentDetectionSerializer.values(
+        DetectionRecord.objects.filter(user_id=user_id).order_by('-detected_at')
+    )[:limit])
+
+
+def upcoming_events(user_id, today):
+    """(number of occurrences in the next DASHBOARD_EVENT_DAYS days, the first few)"""
+    rows = occurrences.window_rows(
+        Event.objects.filter(user_id=user_id),
+        today,
+        today + timedelta(days=settings.DASHBOARD_EVENT_DAYS),
+        EventListSerializer.lookups()
+    )
+    return len(rows), rows[:5]
+
+
+def cached_weather(user_id):
+    """Current conditions for the default farm from the weather cache only (None if not cached)"""
+    location = FarmLocation.objects.filter(
+        user_id=user_id,
+        latitude__isnull=False,
+        longitude__isnull=False
+    ).order_by('-is_default', 'id').values('name', 'latitude', 'longitude').first()
+    if location is None:
+        return None
+    entry = WeatherCache.objects.filter(
+        city=coordinate_cache_key(location['latitude'], location['longitude']),
+        cached_at__gte=cache_cutoff()
+    ).values('city', 'weather_data', 'cached_at').first()
+    if entry is None or not is_compact(entry['weather_data']):
+        return None
+    rendered = Forecast(entry['city'], entry['weather_data'], entry['cached_at']).render()
+    return {'location': location['name'], 'current': rendered['current'], 'cached_at': rendered['cached_at']}
+
+
+def dashboard_rows(user):
+    """
+    The dashboard's raw parts for a user, cached for DASHBOARD_CACHE_TTL seconds
+
+    A failed part is logged and left out (None) rather than failing the
+    page, and the result is then not cached.
+
+    Returns:
+        dict: counts, diseases, detections, events (count, rows) and weather
+    """
+    key = dashboard_cache_key(user.pk)
+    rows = cache.get(key)
+    if rows is not None:
+        return rows
+
+    today = timezone.localdate()
+    futures = {
+        'counts': in_worker(counts, user, today),
+        'diseases': in_worker(disease_breakdown, user.pk),
+        'detections': in_worker(recent_detections, user.pk),
+        'events': in_worker(upcoming_events, user.pk, today),
+        'weather': in_worker(cached_weather, user.pk),
+    }
+    rows = {}
+    failed = False
+    for name, future in futures.items():
+        try:
+            rows[name] = future.result()
+        except Exception as e:
+            logger.error(f"Dashboard {name} failed for user {user.pk}: {str(e)}")
+            rows[name] = None
+            failed = True
+    if not failed:
+        cache.set(key, rows, settings.DASHBOARD_CACHE_TTL)
+    return rows
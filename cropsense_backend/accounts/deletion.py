@@ -0,0 +1,190 @@
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from calendar_app.models import Event, EventException, ScheduleSuggestion
+from community import feed
+from community.models import Comment, Post
+from detection.models import DetectionRecord, DiseaseRiskScore
+from weather.models import FarmLocation
+from .authentication import forget_user
+from .dashboard import forget_dashboard
+from .models import AccountDeletion, UserActivity
+
+logger = logging.getLogger(__name__)
+
+
+# Account deletion runs in the background. DeleteAccountView deactivates the
+# account and queues an AccountDeletion; process_account_deletions then
+# removes the user's rows table by table, children first, in batches of
+# DELETE ... WHERE id IN (...) each in its own short transaction. No cascade
+# is collected in Python and no lock is held for long. Detection images are
+# deleted on a thread pool once the batch that referenced them commits.
+# Every step is idempotent, so an interrupted deletion is simply run again.
+
+
+def steps(user_id):
+    """(label, queryset) for each table holding the user's rows, in deletion order"""
+    return [
+        ('schedule_suggestions', ScheduleSuggestion.objects.filter(user_id=user_id)),
+        ('event_exceptions', EventException.objects.filter(event__user_id=user_id)),
+        ('events', Event.objects.filter(user_id=user_id)),
+        ('comments_received', Comment.objects.filter(post__user_id=user_id)),
+        ('comments', Comment.objects.filter(user_id=user_id)),
+        ('posts', Post.objects.filter(user_id=user_id)),
+        ('disease_risk_scores', DiseaseRiskScore.objects.filter(location__user_id=user_id)),
+        ('farm_locations', FarmLocation.objects.filter(user_id=user_id)),
+        ('detections', DetectionRecord.objects.filter(user_id=user_id)),
+        ('blacklisted_tokens', BlacklistedToken.objects.filter(token__user_id=user_id)),
+        ('outstanding_tokens', OutstandingToken.objects.filter(user_id=user_id)),
+    ]
+
+
+def delete_rows(model, ids):
+    """Delete rows by primary key with one raw statement (no signals, no cascade collection)"""
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {model._meta.db_table} WHERE {model._meta.pk.column} IN ({placeholders})",
+            ids
+        )
+        return cursor.rowcount
+
+
+def release_comments(rows, user_id):
+    """
+    Keep the counters of other users' rows right for comments about to go
+
+    The comment signals are skipped, so the affected posts' comment_count
+    and commenters' UserActivity.comment_count are decremented here.
+    """
+    for post_id, count in Counter(post_id for post_id, author_id in rows).items():
+        Post.objects.filter(pk=post_id, comment_count__gte=count).exclude(
+            user_id=user_id
+        ).update(comment_count=F('comment_count') - count)
+    for author_id, count in Counter(author_id for post_id, author_id in rows).items():
+        if author_id != user_id:
+            UserActivity.objects.filter(user_id=author_id, comment_count__gte=count).update(
+                comment_count=F('comment_count') - count
+            )
+
+
+def delete_account(deletion, batch_size=None, workers=None):
+    """
+    Carry out a queued AccountDeletion
+
+    Progress (rows per table, files) is saved on the record after every
+    batch. The user row itself goes last, once nothing references it.
+
+    Args:
+        deletion (AccountDeletion): Claimed (status 'running') deletion
+        batch_size (int): Rows per DELETE (default ACCOUNT_DELETION_BATCH_SIZE)
+        workers (int): Threads deleting media files (default ACCOUNT_DELETION_FILE_WORKERS)
+    """
+    batch_size = batch_size or settings.ACCOUNT_DELETION_BATCH_SIZE
+    workers = workers or settings.ACCOUNT_DELETION_FILE_WORKERS
+    user_id = deletion.user_id
+    progress = dict(deletion.progress)
+    files = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for label, queryset in steps(user_id):
+            model = queryset.model
+            while True:
+                if model is Comment:
+                    rows = list(queryset.order_by('pk').values_list('pk', 'post_id', 'user_id')[:batch_size])
+                elif model is DetectionRecord:
+                    rows = list(queryset.order_by('pk').values_list('pk', 'image')[:batch_size])
+                else:
+                    rows = [(pk,) for pk in queryset.order_by('pk').values_list('pk', flat=True)[:batch_size]]
+                if not rows:
+                    break
+
+                with transaction.atomic():
+                    if model is Comment:
+                        release_comments([row[1:] for row in rows], user_id)
+                    deleted = delete_rows(model, [row[0] for row in rows])
+                if model is DetectionRecord:
+                    files += [pool.submit(delete_file, row[1]) for row in rows if row[1]]
+
+                progress[label] = progress.get(label, 0) + deleted
+                deletion.progress = progress
+                finished = {future for future in files if future.done()}
+                deletion.files_deleted += sum(1 for future in finished if future.result())
+                files = [future for future in files if future not in finished]
+                deletion.save(update_fields=['progress', 'files_deleted'])
+
+        deletion.files_deleted += sum(1 for future in files if future.result())
+
+    # Only the profile, activity and schedule state rows are left to cascade
+    User.objects.filter(pk=user_id).delete()
+    feed.reset()
+    forget_user(user_id)
+    forget_dashboard(user_id)
+
+    deletion.status = 'done'
+    deletion.finished_at = timezone.now()
+    deletion.save(update_fields=['status', 'files_deleted', 'finished_at'])
+    logger.info(f"Deleted account {deletion.username}: {progress}, {deletion.files_deleted} files")
+
+
+def delete_file(name):
+    """Delete a stored file; True if it was there (failures are logged, not raised)"""
+    try:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+            return True
+    except Exception as e:
+        logger.error(f"Failed to delete media file {name}: {str(e)}")
+    return False
+
+
+def claimable(retry=False):
+    """
+    Deletions a worker may take: pending ones, and with retry also failed
+    ones and those left running (by a worker that died) for over an hour
+    """
+    if not retry:
+        return Q(status='pending')
+    stale = timezone.now() - timedelta(hours=1)
+    return Q(status__in=('pending', 'failed')) | Q(status='running', started_at__lt=stale)
+
+
+def claim(deletion_id, retry=False):
+    """Mark a deletion as running; False if another worker took it first"""
+    return AccountDeletion.objects.filter(claimable(retry), pk=deletion_id).update(
+        status='running', started_at=timezone.now(), error=''
+    ) == 1
+
+
+def process_pending(batch_size=None, workers=None, retry=False):
+    """
+    Run every queued deletion, oldest first
+
+    Returns:
+        tuple: (deletions completed, deletions failed)
+    """
+    done = failed = 0
+    for deletion_id in list(AccountDeletion.objects.filter(
+        claimable(retry)
+    ).order_by('requested_at').values_list('id', flat=True)):
+        if not claim(deletion_id, retry):
+            continue
+        deletion = AccountDeletion.objects.get(pk=deletion_id)
+        try:
+            delete_account(deletion, batch_size, workers)
+            done += 1
+        except Exception as e:
+            logger.error(f"Failed to delete account {deletion.username}: {str(e)}")
+            AccountDeletion.objects.filter(pk=deletion_id).update(status='failed', error=str(e))
+            failed += 1
+    return done, failed
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2-SHA256 hasher with the cost set by PASSWORD_HASH_ITERATIONS
+
+    It keeps the algorithm name, so it verifies every existing pbkdf2_sha256
+    hash; one made with another iteration count is rehashed at the next
+    successful login (must_update), in whichever direction the setting moved.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import deletion
+from calendar_app.models import Event
+from community.models import Comment, Post
+from cropsense_backend.benchmark import throwaway_database
+from detection.models import DetectionRecord
+from weather.models import FarmLocation
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark deleting an account with a long history: the former '
+        'synchronous user.delete() vs queueing the deletion in the request '
+        'and running it in batches (job time, longest transaction, media files)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--detections', type=int, default=5000, help='Detections (each with an image file)')
+        parser.add_argument('--posts', type=int, default=500)
+        parser.add_argument('--comments', type=int, default=10, help="Other users' comments per post")
+        parser.add_argument('--events', type=int, default=2000)
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        with throwaway_database(), tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            others = User.objects.bulk_create([User(username=f'neighbour{i}') for i in range(20)])
+
+            # Before: one request deletes everything in one transaction (image files are left behind)
+            user = self.populate('synchronous', others, media, options)
+            started = time.perf_counter()
+            user.delete()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"user.delete(): {elapsed:.2f}s in the request and in one transaction, "
+                f"{self.files(media, 'synchronous')} image files left on disk"
+            )
+
+            # After: the request deactivates and queues; the job deletes in batches
+            user = self.populate('queued', others, media, options)
+            user.set_password('pass')
+            user.save()
+            client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+            started = time.perf_counter()
+            response = client.delete('/api/accounts/delete/', {'password': 'pass'}, content_type='application/json')
+            request_time = time.perf_counter() - started
+
+            batches = []
+            delete_rows = deletion.delete_rows
+
+            def timed(model, ids):
+                started = time.perf_counter()
+                count = delete_rows(model, ids)
+                batches.append(time.perf_counter() - started)
+                return count
+
+            deletion.delete_rows = timed
+            try:
+                started = time.perf_counter()
+                deletion.process_pending(options['batch_size'], options['workers'])
+                job_time = time.perf_counter() - started
+            finally:
+                deletion.delete_rows = delete_rows
+
+            record = deletion.AccountDeletion.objects.get(user_id=user.id)
+            self.stdout.write(
+                f"Queued deletion: {request_time * 1000:.1f}ms in the request (status {response.status_code}), "
+                f"job {job_time:.2f}s in {len(batches)} batches, longest delete {max(batches) * 1000:.1f}ms, "
+                f"{record.files_deleted} image files deleted, {self.files(media, 'queued')} left"
+            )
+
+    def populate(self, username, others, media, options):
+        user = User.objects.create_user(username)
+        now = timezone.now()
+        folder = os.path.join(media, 'detections', username)
+        os.makedirs(folder)
+        images = []
+        for i in range(options['detections']):
+            name = f'detections/{username}/{i}.jpg'
+            with open(os.path.join(media, name), 'wb') as image:
+                image.write(b'\xff\xd8' + os.urandom(2048))
+            images.append(name)
+
+        with transaction.atomic():
+            DetectionRecord.objects.bulk_create(
+                [DetectionRecord(user=user, image=name, confidence=0.9) for name in images], batch_size=1000
+            )
+            FarmLocation.objects.bulk_create([FarmLocation(user=user, name=f'Farm {i}') for i in range(3)])
+            Event.objects.bulk_create(
+                [Event(user=user, title='Weeding', date=now.date() + timedelta(days=i % 365)) for i in range(options['events'])],
+                batch_size=1000
+            )
+            posts = Post.objects.bulk_create(
+                [Post(user=user, title=f'Post {i}', content='Leaf spots on maize',
+                      comment_count=options['comments']) for i in range(options['posts'])],
+                batch_size=1000
+            )
+            Comment.objects.bulk_create(
+                [Comment(post=post, user=others[(post.id + i) % len(others)], content='Try copper')
+                 for post in posts for i in range(options['comments'])],
+                batch_size=1000
+            )
+            for i in range(20):
+                RefreshToken.for_user(user)
+        return user
+
+    def files(self, media, username):
+        return len(os.listdir(os.path.join(media, 'detections', username)))
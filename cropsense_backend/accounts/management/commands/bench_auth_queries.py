@@ -0,0 +1,83 @@
+import statistics
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.authentication import CachedJWTAuthentication
+from calendar_app.models import Event
+from community.models import Post
+from cropsense_backend.benchmark import throwaway_database
+from weather.models import FarmLocation
+
+ENDPOINTS = (
+    '/api/accounts/me/',
+    '/api/accounts/profile/',
+    '/api/accounts/statistics/',
+    '/api/calendar/',
+    '/api/community/posts/my/',
+    '/api/weather/locations/',
+    '/api/detection/history/',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Count database queries (and time) per authenticated request on the main '
+        'endpoints: plain JWTAuthentication vs CachedJWTAuthentication'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user = User.objects.create_user('farmer', password='unused-password-1')
+            user.profile.primary_crops = 'maize, beans'
+            user.profile.save()
+            FarmLocation.objects.create(user=user, name='Farm', latitude=-1.29, longitude=36.82, is_default=True)
+            Post.objects.create(user=user, title='Leaf spots', content='What is this?')
+            Event.objects.create(user=user, title='Spray fungicide', date=timezone.localdate() + timedelta(days=2))
+
+            client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+            # Every view inherits its authenticators from APIView (read from settings at import)
+            with mock.patch.object(APIView, 'authentication_classes', [JWTAuthentication, SessionAuthentication]):
+                before = self.measure(client, options['repeat'])
+            with mock.patch.object(APIView, 'authentication_classes', [CachedJWTAuthentication, SessionAuthentication]):
+                cache.clear()
+                after = self.measure(client, options['repeat'])
+
+            self.stdout.write(f"{'endpoint':28} {'queries before':>15} {'after':>6}  {'ms before':>9} {'after':>6}")
+            for path in ENDPOINTS:
+                self.stdout.write(
+                    f"{path:28} {before[path][0]:15} {after[path][0]:6}  "
+                    f"{before[path][1]:9.2f} {after[path][1]:6.2f}"
+                )
+
+    def measure(self, client, repeat):
+        results = {}
+        for path in ENDPOINTS:
+            client.get(path)  # warm caches other than authentication
+            queries = []
+            # Counted at the cursor: each request resets connection.queries
+            with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+                response = client.get(path)
+            if response.status_code != 200:
+                self.stderr.write(f"{path}: {response.status_code}")
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                client.get(path)
+                timings.append(time.perf_counter() - started)
+            results[path] = (len(queries), statistics.median(timings) * 1000)
+        return results
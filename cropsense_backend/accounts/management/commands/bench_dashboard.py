@@ -0,0 +1,133 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import dashboard
+from calendar_app.management.commands.bench_schedule_suggestions import Command as ScheduleBenchmark
+from calendar_app.models import Event
+from community.models import Post
+from cropsense_backend.benchmark import throwaway_database
+from detection.models import DetectionRecord, Disease
+from weather.models import FarmLocation, WeatherCache
+from weather.services import coordinate_cache_key
+
+# What the dashboard page requested on load before the dashboard endpoint
+PAGE_LOAD = (
+    '/api/accounts/me/',
+    '/api/accounts/statistics/',
+    '/api/detection/statistics/',
+    '/api/detection/history/',
+    '/api/weather/current/',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark loading the dashboard page: the separate requests it made '
+        'before vs the dashboard endpoint (cold, parts sequential or concurrent, '
+        'and cached)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--detections', type=int, default=2000, help='Detections of the measured user')
+        parser.add_argument('--others', type=int, default=100, help='Other users, with as many detections each')
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--workers', type=int, default=4, help='Pool size for the concurrent run')
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user = self.populate(options['detections'], options['others'])
+            client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+            repeat = options['repeat']
+
+            def page_load():
+                for path in PAGE_LOAD:
+                    client.get(path)
+
+            def cold():
+                cache.clear()
+                client.get('/api/accounts/dashboard/')
+
+            def warm():
+                client.get('/api/accounts/dashboard/')
+
+            def parts_sequential():
+                today = timezone.localdate()
+                dashboard.counts(user, today)
+                dashboard.disease_breakdown(user.pk)
+                dashboard.recent_detections(user.pk)
+                dashboard.upcoming_events(user.pk, today)
+                dashboard.cached_weather(user.pk)
+
+            def parts_concurrent():
+                cache.delete(dashboard.dashboard_cache_key(user.pk))
+                dashboard.dashboard_rows(user)
+
+            queries = self.count_queries(page_load)
+            self.report(f'{len(PAGE_LOAD)} separate requests ({queries} queries)', page_load, repeat)
+            queries = self.count_queries(parts_sequential)
+            self.report(f'dashboard parts, sequential ({queries} queries)', parts_sequential, repeat)
+            self.report('dashboard parts, inline (DASHBOARD_WORKERS=0)', parts_concurrent, repeat)
+            with override_settings(DASHBOARD_WORKERS=options['workers']):
+                self.report(f"dashboard parts, on a pool of {options['workers']} threads", parts_concurrent, repeat)
+            self.report('dashboard request, not cached', cold, repeat)
+            warm()
+            self.report(f'dashboard request, cached ({self.count_queries(warm)} queries)', warm, repeat)
+
+    def populate(self, detections, others):
+        rng = random.Random(0)
+        today = timezone.localdate()
+        diseases = [
+            Disease.objects.create(name=f'Disease_{i}', crop_type='Maize', description='', symptoms='',
+                                   treatment='', prevention='')
+            for i in range(20)
+        ]
+        users = [User.objects.create_user(f'farmer{i}') for i in range(others + 1)]
+        now = timezone.now()
+        sql = (f"INSERT INTO {DetectionRecord._meta.db_table} "
+               "(user_id, image, detected_disease_id, confidence, detected_at, geohash) VALUES (%s, %s, %s, %s, %s, '')")
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (user.id, 'detections/leaf.jpg', rng.choice(diseases).id, rng.random(), now - timedelta(minutes=i))
+                for user in users for i in range(detections)
+            ])
+        user = users[0]
+        from accounts.activity import reconcile
+        reconcile()
+
+        for i in range(50):
+            Post.objects.create(user=user, title=f'Post {i}', content='Question about my maize')
+        for i in range(60):
+            Event.objects.create(user=user, title='Scout field', date=today + timedelta(days=i - 30),
+                                 recurrence='FREQ=WEEKLY' if i % 10 == 0 else '')
+        location = FarmLocation.objects.create(user=user, name='Home farm', latitude=-1.29, longitude=36.82, is_default=True)
+        forecast = ScheduleBenchmark()._forecast(rng, today)
+        forecast['currently'] = {field: values[0] for field, values in forecast['hourly'].items()}
+        WeatherCache.objects.create(city=coordinate_cache_key(location.latitude, location.longitude), weather_data=forecast)
+        self.stdout.write(f"{len(users)} users with {detections} detections each")
+        return User.objects.get(pk=user.pk)
+
+    def count_queries(self, function):
+        # Requests reset connection.queries, so count at the cursor (this thread only)
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            function()
+        return len(queries)
+
+    def report(self, label, function, repeat):
+        function()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(f"{label:48} {statistics.median(timings) * 1000:8.2f} ms median")
@@ -0,0 +1,108 @@
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+
+from accounts.authentication import users_with_email
+from accounts.throttling import reset_login_buckets
+from cropsense_backend.benchmark import throwaway_database
+
+PASSWORD = 'correct horse battery'
+
+# Limits high enough that the throttle never rejects
+UNTHROTTLED = {'LOGIN_THROTTLE_IP_BURST': 10 ** 9, 'LOGIN_THROTTLE_ACCOUNT_BURST': 10 ** 9}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark login: email lookup (exact match vs the LOWER(email) index), '
+        'logins/sec on one core at two hasher costs (with the rehash on first '
+        'login), and a credential-stuffing burst with and without the throttle'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument('--logins', type=int, default=20, help='Logins per measurement')
+        parser.add_argument('--iterations', type=int, default=100000,
+                            help='PASSWORD_HASH_ITERATIONS to compare with the default')
+        parser.add_argument('--burst', type=int, default=200, help='Wrong-password attempts from one client')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"One thread, so per core ({os.cpu_count()} cores here)")
+        with throwaway_database():
+            self.populate(options['users'])
+            self.lookup(options['users'])
+
+            client = Client(SERVER_NAME='localhost')
+            with override_settings(**UNTHROTTLED):
+                reset_login_buckets()
+                for iterations in (None, options['iterations']):
+                    self.logins(client, iterations, options['logins'])
+
+            self.burst(client, options['burst'], UNTHROTTLED, 'without throttle')
+            self.burst(client, options['burst'], {}, 'with throttle')
+            reset_login_buckets()
+
+    def populate(self, count):
+        # One hash for everyone: hashing each password would take minutes
+        password = make_password(PASSWORD)
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [User(username=f'farmer{i}', email=f'Farmer{i}@Example.com', password=password) for i in range(count)],
+                batch_size=2000
+            )
+
+    def lookup(self, count):
+        numbers = range(0, count, max(1, count // 200))
+        for label, query in (
+            ('exact match (before)', lambda i: User.objects.filter(email=f'Farmer{i}@Example.com')),
+            ('LOWER(email) index', lambda i: users_with_email(f'farmer{i}@example.com')),
+        ):
+            started = time.perf_counter()
+            for i in numbers:
+                query(i).first()
+            elapsed = time.perf_counter() - started
+            plan = query(0).explain().splitlines()[-1].strip()
+            self.stdout.write(
+                f"Email lookup, {label}: {elapsed / len(numbers) * 1000:.2f}ms each among {count} users ({plan})"
+            )
+
+    def logins(self, client, iterations, count):
+        settings = {'PASSWORD_HASH_ITERATIONS': iterations} if iterations else {}
+        with override_settings(**settings):
+            body = {'email': 'FARMER1@example.com', 'password': PASSWORD}
+            started = time.perf_counter()
+            response = client.post('/api/accounts/login/', body, content_type='application/json')
+            first = time.perf_counter() - started
+            stored = User.objects.get(username='farmer1').password.split('$')[1]
+
+            started = time.perf_counter()
+            for _ in range(count):
+                response = client.post('/api/accounts/login/', body, content_type='application/json')
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Login, {iterations or 'default'} iterations: {count / elapsed:.1f} logins/s "
+            f"(status {response.status_code}; first login {first * 1000:.0f}ms, hash now {stored} iterations)"
+        )
+
+    def burst(self, client, attempts, limits, label):
+        with override_settings(**limits):
+            reset_login_buckets()
+            statuses = {}
+            started = time.perf_counter()
+            for i in range(attempts):
+                response = client.post(
+                    '/api/accounts/login/',
+                    {'username': f'farmer{i % 50}', 'password': f'guess{i}'},
+                    content_type='application/json'
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{attempts} wrong-password attempts from one IP, {label}: {elapsed:.2f}s, "
+            f"{attempts / elapsed:,.0f} attempts/s, responses {dict(sorted(statuses.items()))}"
+        )
@@ -0,0 +1,101 @@
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from accounts import tokens
+from accounts.management.commands.prune_tokens import prune
+from accounts.serializers import RefreshSerializer
+from cropsense_backend.benchmark import throwaway_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark token refresh (rotation + blacklist) against a large token '
+        'history: stock serializer vs filter-backed RefreshSerializer, before '
+        'and after prune_tokens'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=2000000,
+                            help='Historical refresh tokens, spread over --weeks, all but the newest blacklisted')
+        parser.add_argument('--weeks', type=int, default=8)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--refreshes', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            users = [User.objects.create_user(f'farmer{i}') for i in range(options['users'])]
+            self.populate([user.id for user in users], options['tokens'], options['weeks'])
+
+            for label in ('before pruning', 'after pruning'):
+                tokens.reset_blacklist_filter()
+                started = time.perf_counter()
+                blacklist = tokens.blacklist_filter()
+                self.stdout.write(
+                    f"{label}: {OutstandingToken.objects.count()} outstanding, "
+                    f"{BlacklistedToken.objects.count()} blacklisted; filter built in "
+                    f"{time.perf_counter() - started:.2f}s ({len(blacklist.bits) / 1024 / 1024:.1f} MiB)"
+                )
+                for name, serializer in (('stock', TokenRefreshSerializer), ('filtered', RefreshSerializer)):
+                    self.bench(name, serializer, users, options['refreshes'])
+                if label == 'before pruning':
+                    started = time.perf_counter()
+                    outstanding, blacklisted = prune(2000)
+                    self.stdout.write(
+                        f"prune_tokens: {outstanding} expired tokens ({blacklisted} blacklisted) "
+                        f"in {time.perf_counter() - started:.1f}s"
+                    )
+
+    def populate(self, user_ids, count, weeks):
+        now = aware_utcnow()
+        span = timedelta(weeks=weeks)
+        lifetime = timedelta(days=7)
+        started = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            for offset in range(0, count, 100000):
+                rows = []
+                for i in range(offset, min(offset + 100000, count)):
+                    created = now - span + span * i / count  # issued in id order, like real rotation
+                    rows.append((i + 1, user_ids[i % len(user_ids)], uuid.uuid4().hex, 'x', created, created + lifetime))
+                cursor.executemany(
+                    f"INSERT INTO {OutstandingToken._meta.db_table} (id, user_id, jti, token, created_at, expires_at) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)", rows
+                )
+                cursor.executemany(
+                    f"INSERT INTO {BlacklistedToken._meta.db_table} (token_id, blacklisted_at) VALUES (%s, %s)",
+                    [(row[0], row[4]) for row in rows[:len(rows) - (len(user_ids) if offset + 100000 >= count else 0)]]
+                )
+            cursor.execute('ANALYZE')
+        self.stdout.write(f"{count} historical tokens over {weeks} weeks ({time.perf_counter() - started:.1f}s)")
+
+    def bench(self, name, serializer_class, users, refreshes):
+        presented = [str(RefreshToken.for_user(users[i % len(users)])) for i in range(refreshes)]
+        queries = []
+        timings = []
+        for i, token in enumerate(presented):
+            counter = []
+            started = time.perf_counter()
+            with connection.execute_wrapper(lambda execute, sql, *args: counter.append(sql) or execute(sql, *args)):
+                serializer = serializer_class(data={'refresh': token})
+                serializer.is_valid(raise_exception=True)
+            timings.append(time.perf_counter() - started)
+            queries.append(len(counter))
+        replay = serializer_class(data={'refresh': presented[0]})
+        try:
+            rejected = not replay.is_valid()
+        except Exception:
+            rejected = True
+        self.stdout.write(
+            f"  {name:9} {statistics.median(timings) * 1000:6.2f} ms median, "
+            f"p95 {statistics.quantiles(timings, n=20)[-1] * 1000:6.2f} ms, "
+            f"{statistics.median(queries):.0f} queries; replay rejected: {rejected}"
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.deletion import process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the data of accounts queued for deletion: rows in small '
+        'batches, each in its own short transaction, and detection images on '
+        'a thread pool. An interrupted deletion can safely run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Rows per delete (default ACCOUNT_DELETION_BATCH_SIZE)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Threads deleting media files (default ACCOUNT_DELETION_FILE_WORKERS)')
+        parser.add_argument('--retry', action='store_true',
+                            help='Also run failed deletions and ones left running for over an hour')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, every --interval seconds')
+        parser.add_argument('--interval', type=int, default=60,
+                            help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            done, failed = process_pending(options['batch_size'], options['workers'], options['retry'])
+            if done or failed or not options['loop']:
+                self.stdout.write(
+                    f"Deleted {done} accounts ({failed} failed) in {time.monotonic() - started:.1f}s"
+                )
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.activity import reconcile
+from community import feed
+from community.counters import reconcile_comment_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the denormalized counters (Post.comment_count and per-user '
+        'UserActivity totals) and correct any that drifted.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows per bulk write')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        posts = reconcile_comment_counts(batch_size=options['batch_size'])
+        users = reconcile(batch_size=options['batch_size'])
+        feed.reset()
+        self.stdout.write(
+            f"Corrected {posts} post comment counts and {users} user activity rows "
+            f"in {time.monotonic() - started:.2f}s"
+        )
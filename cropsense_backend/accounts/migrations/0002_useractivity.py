@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-19 09:04
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+COUNTED_MODELS = {
+    ('detection', 'DetectionRecord'): 'detection_count',
+    ('community', 'Post'): 'post_count',
+    ('community', 'Comment'): 'comment_count',
+    ('weather', 'FarmLocation'): 'location_count',
+}
+
+
+def backfill_activity(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    UserActivity = apps.get_model('accounts', 'UserActivity')
+    totals = {user_id: {} for user_id in User.objects.values_list('id', flat=True)}
+    for (app_label, model_name), counter in COUNTED_MODELS.items():
+        rows = apps.get_model(app_label, model_name).objects.order_by().values('user_id').annotate(n=Count('id'))
+        for user_id, count in rows.values_list('user_id', 'n'):
+            totals[user_id][counter] = count
+    UserActivity.objects.bulk_create(
+        [UserActivity(user_id=user_id, **counts) for user_id, counts in totals.items()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('accounts', '0001_initial'),
+        ('community', '0004_post_comment_count'),
+        ('detection', '0003_detection_location'),
+        ('weather', '0005_weatherobservationblock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserActivity',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('detection_count', models.PositiveIntegerField(default=0)),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('location_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'User activity',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['-post_count'], name='activity_post_count_idx'),
+        ),
+        migrations.RunPython(backfill_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-19 11:05
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # Accounts cannot be merged automatically: list them for an admin to resolve
+    User = apps.get_model('auth', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').annotate(email_lower=Lower('email'))
+        .values('email_lower').annotate(users=Count('id')).filter(users__gt=1)
+        .values_list('email_lower', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Several accounts share an email (ignoring case); change all but one '
+            f'before migrating: {", ".join(duplicates)}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('accounts', '0003_account_deletion'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        # One account per email ignoring case. Blank emails (e.g. superusers
+        # made without one) get their id as the second key, so they never
+        # collide; LOWER(email) = %s lookups use the index's first column.
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX accounts_user_email_lower_uniq ON auth_user "
+            "(LOWER(email), (CASE WHEN email = '' THEN id ELSE 0 END))",
+            "DROP INDEX accounts_user_email_lower_uniq"
+        ),
+    ]
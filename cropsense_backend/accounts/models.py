@@ -1,6 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 # Create your models here.
 
@@ -16,6 +17,46 @@ class FarmerProfile(models.Model):
     def __str__(self):
         return f"Profile of {self.user.username}"
 
+class UserActivity(models.Model):
+    # Denormalized per-user totals, kept current by the signals below and
+    # recomputed by the reconcile_counters command
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='activity')
+    detection_count = models.PositiveIntegerField(default=0)
+    post_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    location_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'User activity'
+        indexes = [
+            models.Index(fields=['-post_count'], name='activity_post_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"Activity of {self.user_id}"
+
+class AccountDeletion(models.Model):
+    # A deactivated account waiting for (or going through) deletion; queued by
+    # DeleteAccountView and carried out by process_account_deletions
+    user_id = models.IntegerField(unique=True)  # Not a ForeignKey: the record outlives the user
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=10, default='pending')  # pending, running, done, failed
+    progress = models.JSONField(default=dict)  # Rows deleted per table
+    files_deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'requested_at'], name='deletion_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Deletion of {self.username} ({self.status})"
+
 # Signal to create profile automatically 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -23,6 +64,64 @@ def create_user_profile(sender, instance, created, **kwargs):
         FarmerProfile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
+def create_user_activity(sender, instance, created, **kwargs):
+    if created:
+        UserActivity.objects.create(user=instance)
+
+# Drop the cached authentication row (see authentication.py) once a change commits
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=FarmerProfile)
+@receiver(post_delete, sender=FarmerProfile)
+def forget_cached_user(sender, instance, **kwargs):
+    from .authentication import forget_user
+    user_id = instance.pk if sender is User else instance.user_id
+    transaction.on_commit(lambda: forget_user(user_id))
+
+# Drop the cached dashboard (see dashboard.py) when something it shows changes
+@receiver(post_save, sender=FarmerProfile)
+@receiver(post_delete, sender=FarmerProfile)
+@receiver(post_save, sender='detection.DetectionRecord')
+@receiver(post_delete, sender='detection.DetectionRecord')
+@receiver(post_save, sender='community.Post')
+@receiver(post_delete, sender='community.Post')
+@receiver(post_save, sender='community.Comment')
+@receiver(post_delete, sender='community.Comment')
+@receiver(post_save, sender='weather.FarmLocation')
+@receiver(post_delete, sender='weather.FarmLocation')
+@receiver(post_save, sender='calendar_app.Event')
+@receiver(post_delete, sender='calendar_app.Event')
+def forget_dashboard(sender, instance, **kwargs):
+    from .dashboard import forget_dashboard
+    user_id = instance.user_id
+    transaction.on_commit(lambda: forget_dashboard(user_id))
+
+# Activity counters: one atomic F() update per create/delete (bulk writes
+# skip signals; reconcile_counters recomputes the totals)
+COUNTED_MODELS = {
+    'detection.DetectionRecord': 'detection_count',
+    'community.Post': 'post_count',
+    'community.Comment': 'comment_count',
+    'weather.FarmLocation': 'location_count',
+}
+
+def _adjust_activity(user_id, counter, delta):
+    rows = UserActivity.objects.filter(user_id=user_id)
+    if delta < 0:
+        rows = rows.filter(**{f'{counter}__gte': -delta})
+    rows.update(**{counter: F(counter) + delta})
+
+@receiver(post_save, sender='detection.DetectionRecord')
+@receiver(post_save, sender='community.Post')
+@receiver(post_save, sender='community.Comment')
+@receiver(post_save, sender='weather.FarmLocation')
+def activity_created(sender, instance, created, **kwargs):
+    if created:
+        _adjust_activity(instance.user_id, COUNTED_MODELS[sender._meta.label], 1)
 
+@receiver(post_delete, sender='detection.DetectionRecord')
+@receiver(post_delete, sender='community.Post')
+@receiver(post_delete, sender='community.Comment')
+@receiver(post_delete, sender='weather.FarmLocation')
+def activity_deleted(sender, instance, **kwargs):
+    _adjust_activity(instance.user_id, COUNTED_MODELS[sender._meta.label], -1)
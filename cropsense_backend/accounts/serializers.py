@@ -1,7 +1,15 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from cropsense_backend.serializers import ValuesSerializer
+from .authentication import cached_user, users_with_email
 from .models import FarmerProfile
+from .tokens import RotatingRefreshToken
 
 
 class FarmerProfileSerializer(serializers.ModelSerializer):
@@ -46,6 +54,18 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['date_joined']
 
 
+class RecentDetectionSerializer(ValuesSerializer):
+    """Dashboard detection rows, with the disease name and crop joined in"""
+    fields = ('id', 'image', 'confidence', 'detected_at', 'disease', 'crop_type')
+    sources = {'disease': 'detected_disease__name', 'crop_type': 'detected_disease__crop_type'}
+
+    def to_representation(self, row):
+        data = super().to_representation(row)
+        data['image'] = self.file_url(data['image'])
+        data['disease_details'] = {'name': data.pop('disease'), 'crop_type': data.pop('crop_type')} if data['disease'] else None
+        return data
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
     password2 = serializers.CharField(write_only=True, required=True, label="Confirm Password")
@@ -65,7 +85,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return attrs
     
     def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
+        if users_with_email(value).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value
     
@@ -105,4 +125,44 @@ class PasswordChangeSerializer(serializers.Serializer):
     def validate(self, attrs):
         if attrs['new_password'] != attrs['new_password2']:
             raise serializers.ValidationError({"new_password": "Password fields didn't match."})
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class RefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer with fewer queries per refresh
+
+    The blacklist lookup goes through the filter in tokens.py, the user
+    through the authentication cache, and the rotated token is blacklisted
+    and recorded with one lookup each instead of re-reading the user.
+    """
+    token_class = RotatingRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = cached_user(user_id) if user_id else None
+        if user_id and (user is None or not api_settings.USER_AUTHENTICATION_RULE(user)):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist_once(user.pk if user else None)
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            OutstandingToken.objects.create(
+                user=user,
+                jti=refresh[api_settings.JTI_CLAIM],
+                token=str(refresh),
+                created_at=refresh.current_time,
+                expires_at=datetime_from_epoch(refresh['exp'])
+            )
+
+            data['refresh'] = str(refresh)
+
+        return data
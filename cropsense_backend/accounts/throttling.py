@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+
+# Every login attempt costs a full password hash, so a credential-stuffing
+# burst is mostly CPU spent hashing wrong passwords. LoginRateThrottle turns
+# attempts away before the view runs: each client IP and each account name
+# tried has a token bucket, and an attempt needs a token from both. Buckets
+# live in process memory (no cache round trip per attempt); with several
+# processes each enforces its own limit. Behind a proxy, set DRF's
+# NUM_PROXIES so the client IP cannot be picked from X-Forwarded-For.
+
+
+class TokenBucket:
+    """
+    Token buckets per key: `burst` tokens, refilled at `rate` (> 0) per second
+
+    At most max_keys buckets are kept; the least recently used go first
+    (a forgotten key starts again with a full bucket).
+    """
+
+    def __init__(self, burst, rate, max_keys):
+        self.burst = burst
+        self.rate = rate
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()  # key -> (tokens, monotonic time of last update)
+        self.lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """
+        Take a token for key
+
+        Returns:
+            float: 0 if a token was taken, else seconds until one is available
+        """
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self.buckets[key] = (tokens, now)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def buckets():
+    """This process's (per IP, per account) buckets, created from the settings on first use"""
+    with _buckets_lock:
+        if not _buckets:
+            _buckets['ip'] = TokenBucket(
+                settings.LOGIN_THROTTLE_IP_BURST,
+                settings.LOGIN_THROTTLE_IP_PER_MINUTE / 60,
+                settings.LOGIN_THROTTLE_MAX_KEYS
+            )
+            _buckets['account'] = TokenBucket(
+                settings.LOGIN_THROTTLE_ACCOUNT_BURST,
+                settings.LOGIN_THROTTLE_ACCOUNT_PER_MINUTE / 60,
+                settings.LOGIN_THROTTLE_MAX_KEYS
+            )
+        return _buckets['ip'], _buckets['account']
+
+
+def reset_login_buckets():
+    """Forget every bucket (they are recreated from the settings on next use)"""
+    with _buckets_lock:
+        _buckets.clear()
+
+
+class LoginRateThrottle(BaseThrottle):
+    """Per-IP and per-account token buckets for the login endpoint"""
+
+    def allow_request(self, request, view):
+        by_ip, by_account = buckets()
+        self.delay = by_ip.take(self.get_ident(request))
+        if self.delay:
+            return False  # An IP already turned away does not drain the account's bucket
+
+        data = request.data if hasattr(request.data, 'get') else {}
+        account = data.get('username') or data.get('email')
+        if isinstance(account, str) and account.strip():
+            self.delay = by_account.take(account.strip().lower())
+        return self.delay == 0
+
+    def wait(self):
+        return self.delay
@@ -0,0 +1,131 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+
+# Refresh with rotation blacklists the presented token, and simplejwt first
+# checks the blacklist with a query. Nearly every presented token is not
+# blacklisted, so a per-process Bloom filter of blacklisted JTIs answers
+# "definitely not" without the query. The filter may be stale: a token
+# blacklisted after it was built (by another process) passes the filter,
+# but the blacklist insert that follows finds the existing row and the
+# refresh is rejected (RotatingRefreshToken.blacklist_once). The filter
+# therefore only saves queries; it never decides that a token is valid.
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings (no false negatives)"""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+_filter = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def build_blacklist_filter():
+    """A BloomFilter of the JTIs of blacklisted tokens that have not expired"""
+    jtis = BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow()).values_list('token__jti', flat=True)
+    blacklist = BloomFilter(
+        int(jtis.count() * 1.25) + 1024,
+        settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE
+    )
+    for jti in jtis.iterator(chunk_size=5000):
+        blacklist.add(jti)
+    return blacklist
+
+
+def blacklist_filter():
+    """
+    This process's blacklist filter, rebuilt every TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS
+
+    One thread rebuilds; the others keep using the previous filter meanwhile.
+    """
+    global _filter, _built_at
+    if _filter is not None and time.monotonic() - _built_at < settings.TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS:
+        return _filter
+    if not _lock.acquire(blocking=_filter is None):
+        return _filter
+    try:
+        if _filter is None or time.monotonic() - _built_at >= settings.TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS:
+            _filter = build_blacklist_filter()
+            _built_at = time.monotonic()
+        return _filter
+    finally:
+        _lock.release()
+
+
+def reset_blacklist_filter():
+    """Drop this process's filter (rebuilt on next use)"""
+    global _filter
+    _filter = None
+
+
+class RotatingRefreshToken(RefreshToken):
+    """
+    RefreshToken for the rotating refresh endpoint (see RefreshSerializer)
+
+    The blacklist query is skipped when the filter rules the token out;
+    blacklist_once is then the authoritative check. Only valid while
+    rotation blacklists every refreshed token.
+    """
+
+    def check_blacklist(self):
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            if self.payload[api_settings.JTI_CLAIM] not in blacklist_filter():
+                return
+        super().check_blacklist()
+
+    def blacklist_once(self, user_id=None):
+        """
+        Blacklist this token, failing if it already was
+
+        Raises:
+            TokenError: The token was already blacklisted (e.g. replayed
+            after an earlier refresh)
+        """
+        jti = self.payload[api_settings.JTI_CLAIM]
+        try:
+            with transaction.atomic():
+                token, created = OutstandingToken.objects.get_or_create(
+                    jti=jti,
+                    defaults={
+                        'user_id': user_id,
+                        'created_at': self.current_time,
+                        'token': str(self),
+                        'expires_at': datetime_from_epoch(self.payload['exp']),
+                    }
+                )
+                # The unique token_id makes this the check, even against concurrent refreshes
+                BlacklistedToken.objects.create(token=token)
+        except IntegrityError:
+            raise TokenError(_("Token is blacklisted"))
+        if _filter is not None:
+            _filter.add(jti)
@@ -13,6 +13,7 @@ from .views import (
     UserProfileView,
     PasswordChangeView,
     UserStatisticsView,
+    DashboardView,
     DeleteAccountView
 )
 
@@ -28,6 +29,7 @@ urlpatterns = [
     path('profile/', UserProfileView.as_view(), name='user-profile'),
     path('change-password/', PasswordChangeView.as_view(), name='change-password'),
     path('statistics/', UserStatisticsView.as_view(), name='user-statistics'),
+    path('dashboard/', DashboardView.as_view(), name='user-dashboard'),
     path('delete/', DeleteAccountView.as_view(), name='delete-account'),
 
      # JWT Token endpoints
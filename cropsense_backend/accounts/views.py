@@ -4,15 +4,21 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
-from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from .models import FarmerProfile
+from django.db import transaction
+from calendar_app.serializers import OccurrenceListSerializer
+from .models import AccountDeletion, FarmerProfile
+from .activity import get_activity
+from .authentication import users_with_email
+from .dashboard import dashboard_rows
+from .throttling import LoginRateThrottle
 from .serializers import (
     UserSerializer, 
     FarmerProfileSerializer, 
     UserRegistrationSerializer,
     LoginSerializer,
-    PasswordChangeSerializer
+    PasswordChangeSerializer,
+    RecentDetectionSerializer
 )
 import logging
 
@@ -53,6 +59,7 @@ class UserLoginView(APIView):
     """POST: User login with JWT"""
     permission_classes = [AllowAny]
     authentication_classes = []
+    throttle_classes = [LoginRateThrottle]
     
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -62,21 +69,22 @@ class UserLoginView(APIView):
             email = serializer.validated_data.get('email')
             password = serializer.validated_data['password']
             
-            # Authenticate by username or email
+            # Authenticate by username or email (a stored hash made with
+            # other settings is upgraded by the successful check)
             if username:
                 user = authenticate(request, username=username, password=password)
             elif email:
-                try:
-                    user_obj = User.objects.get(email=email)
+                user_obj = users_with_email(email).only('username').first()
+                if user_obj is not None:
                     user = authenticate(request, username=user_obj.username, password=password)
-                except User.DoesNotExist:
+                else:
                     logger.warning(f"Login attempt with non-existent email: {email}")
                     user = None
             else:
                 user = None
             
             if user is None:
-                logger.error(f"Authentication failed for username: {username}, email: {email}")
+                logger.warning(f"Authentication failed for username: {username}, email: {email}")
                 return Response({
                     'error': 'Invalid credentials'
                 }, status=status.HTTP_401_UNAUTHORIZED)
@@ -158,9 +166,12 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
-        # Ensure profile exists
-        profile, created = FarmerProfile.objects.get_or_create(user=self.request.user)
-        return profile
+        # Loaded with the user by authentication; created if missing
+        try:
+            return self.request.user.profile
+        except FarmerProfile.DoesNotExist:
+            profile, created = FarmerProfile.objects.get_or_create(user=self.request.user)
+            return profile
     
     def retrieve(self, request, *args, **kwargs):
         try:
@@ -228,11 +239,8 @@ class UserStatisticsView(APIView):
         try:
             user = request.user
             
-            # Get counts from related models
-            total_detections = user.detections.count()
-            total_posts = user.posts.count()
-            total_comments = user.comments.count()
-            total_locations = user.farm_locations.count()
+            # Denormalized counts: a single-row lookup
+            activity = get_activity(user)
             
             return Response({
                 'user': {
@@ -241,10 +249,10 @@ class UserStatisticsView(APIView):
                     'date_joined': user.date_joined.isoformat()
                 },
                 'statistics': {
-                    'total_detections': total_detections,
-                    'total_posts': total_posts,
-                    'total_comments': total_comments,
-                    'total_locations': total_locations
+                    'total_detections': activity.detection_count,
+                    'total_posts': activity.post_count,
+                    'total_comments': activity.comment_count,
+                    'total_locations': activity.location_count
                 }
             }, status=status.HTTP_200_OK)
         except Exception as e:
@@ -254,8 +262,59 @@ class UserStatisticsView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class DashboardView(APIView):
+    """
+    GET: Everything the dashboard page shows, in one response
+
+    User, activity counts, detection statistics, recent detections,
+    upcoming events and the cached weather of the default farm (see
+    dashboard.py). Parts that fail to load are null.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            user = request.user
+            rows = dashboard_rows(user)
+            counts = rows['counts'] or {}
+            average_confidence = counts.get('average_confidence') or 0
+            events = rows['events'] or (0, [])
+            
+            return Response({
+                'user': UserSerializer(user).data,
+                'statistics': {
+                    'total_detections': counts.get('detection_count', 0),
+                    'total_posts': counts.get('post_count', 0),
+                    'total_comments': counts.get('comment_count', 0),
+                    'total_locations': counts.get('location_count', 0),
+                    'upcoming_events': events[0],
+                    'scheduling_conflicts': counts.get('scheduling_conflicts') or 0
+                },
+                'detection_statistics': {
+                    'total_detections': counts.get('detection_count', 0),
+                    'most_common_diseases': [
+                        {'disease': row['detected_disease__name'], 'count': row['count']}
+                        for row in rows['diseases'] or []
+                    ],
+                    'average_confidence': average_confidence,
+                    'average_confidence_percentage': f"{average_confidence * 100:.2f}%"
+                },
+                'recent_detections': RecentDetectionSerializer(
+                    rows['detections'] or [],
+                    context={'request': request}
+                ).data,
+                'upcoming_events': OccurrenceListSerializer(events[1]).data,
+                'weather': rows['weather']
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.error(f"Error building dashboard: {str(e)}")
+            return Response({
+                'error': 'Failed to load dashboard'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class DeleteAccountView(APIView):
-    """DELETE: Delete user account"""
+    """DELETE: Deactivate user account and queue its deletion"""
     permission_classes = [IsAuthenticated]
     
     def delete(self, request):
@@ -273,11 +332,26 @@ class DeleteAccountView(APIView):
                 'error': 'Incorrect password'
             }, status=status.HTTP_401_UNAUTHORIZED)
         
-        # Delete user (this will cascade delete related data)
+        # Deactivate now (the user can no longer log in or authenticate) and
+        # leave the data to process_account_deletions, which removes it in
+        # batches without holding long locks
         username = user.username
-        logger.info(f"Deleting account for user: {username}")
-        user.delete()
-        
+        try:
+            with transaction.atomic():
+                user.is_active = False
+                user.save(update_fields=['is_active'])
+                deletion, created = AccountDeletion.objects.get_or_create(
+                    user_id=user.id,
+                    defaults={'username': username}
+                )
+        except Exception as e:
+            logger.error(f"Failed to queue deletion for user {username}: {str(e)}")
+            return Response({
+                'error': 'Failed to delete account'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        logger.info(f"Queued account deletion for user: {username}")
+
         return Response({
-            'message': f'Account {username} has been deleted successfully'
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+            'message': f'Account {username} has been deactivated and will be deleted shortly',
+            'status': deletion.status
+        }, status=status.HTTP_202_ACCEPTED)
\ No newline at end of file
@@ -1,7 +1,22 @@
 from django.contrib import admin
-from .models import Event
+from .models import Event, EventException, ScheduleSuggestion
+
+
+class EventExceptionInline(admin.TabularInline):
+    model = EventException
+    extra = 0
+
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ('title', 'user', 'date', 'created_at')
-    search_fields = ('title', 'user__username')
\ No newline at end of file
+    list_display = ('title', 'user', 'date', 'recurrence', 'created_at')
+    search_fields = ('title', 'user__username')
+    readonly_fields = ('recurrence_end',)
+    inlines = [EventExceptionInline]
+
+
+@admin.register(ScheduleSuggestion)
+class ScheduleSuggestionAdmin(admin.ModelAdmin):
+    list_display = ('event', 'user', 'date', 'activity', 'reason', 'suggested_date')
+    list_filter = ('activity',)
+    search_fields = ('event__title', 'user__username')
@@ -0,0 +1,316 @@
+from datetime import date, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from . import scheduling
+from .models import Event, EventException
+from .recurrence import Rule
+
+
+# iCalendar (RFC 5545) export and import of farm calendars. Both directions
+# stream: export is a generator reading events with a server-side iterator,
+# import reads the upload line by line and inserts in batches, so memory
+# stays flat however many events a calendar holds. Under ASGI, aexport
+# hands the same chunks to the server one at a time.
+
+PRODID = '-//CropSense//Farm calendar//EN'
+UID_DOMAIN = 'cropsense'
+CHUNK_BYTES = 64 * 1024  # export output is sent in chunks of about this size
+
+
+class CalendarImportError(ValueError):
+    """The file as a whole cannot be imported"""
+
+
+def escape(text):
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def unescape(text):
+    if '\\' not in text:
+        return text
+    result = []
+    chars = iter(text)
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '')
+            result.append('\n' if char in 'nN' else char)
+        else:
+            result.append(char)
+    return ''.join(result)
+
+
+def content_line(name, value):
+    """One content line as bytes, folded at 75 octets"""
+    line = f'{name}:{value}'.encode()
+    if len(line) <= 75:
+        return line + b'\r\n'
+    parts = []
+    while len(line) > 75:
+        cut = 75 if not parts else 74  # continuation lines start with a space
+        while cut and (line[cut] & 0xC0) == 0x80:
+            cut -= 1  # do not split a UTF-8 sequence
+        parts.append(line[:cut])
+        line = line[cut:]
+    parts.append(line)
+    return b'\r\n '.join(parts) + b'\r\n'
+
+
+def export(user, chunk_size=2000):
+    """
+    Generate a user's calendar as iCalendar bytes
+
+    Events and their exceptions are read with two iterators ordered by
+    event id and merged, so neither is loaded into memory.
+    """
+    events = Event.objects.filter(user=user).order_by('id').values(
+        'id', 'title', 'description', 'date', 'recurrence', 'updated_at'
+    ).iterator(chunk_size)
+    exceptions = EventException.objects.filter(event__user=user).order_by('event_id', 'original_date').values(
+        'event_id', 'original_date', 'cancelled', 'date', 'title', 'description'
+    ).iterator(chunk_size)
+
+    buffer = [
+        b'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n',
+        content_line('PRODID', PRODID),
+        content_line('X-WR-CALNAME', escape(f'CropSense - {user.username}')),
+    ]
+    size = 0
+    pending = next(exceptions, None)
+    for event in events:
+        own = []
+        while pending is not None and pending['event_id'] <= event['id']:
+            if pending['event_id'] == event['id']:
+                own.append(pending)
+            pending = next(exceptions, None)
+        for line in vevent(event, own):
+            buffer.append(line)
+            size += len(line)
+        if size >= CHUNK_BYTES:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    buffer.append(b'END:VCALENDAR\r\n')
+    yield b''.join(buffer)
+
+
+
+async def aexport(user, chunk_size=2000):
+    """
+    export() as an async iterator, for responses served under ASGI
+
+    Given a sync iterator, Django's ASGI handler reads it whole with
+    sync_to_async(list) before sending anything. Here each chunk is taken
+    from export() in the sync thread as the server asks for it, so only one
+    chunk is held at a time and the database cursor stays on one thread.
+    """
+    chunks = export(user, chunk_size)
+    take = sync_to_async(next)
+    try:
+        while (chunk := await take(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+def vevent(event, exceptions):
+    """Content lines for an event, plus one VEVENT per changed occurrence"""
+    uid = content_line('UID', f"event-{event['id']}@{UID_DOMAIN}")
+    stamp = content_line('DTSTAMP', f"{event['updated_at'].astimezone(dt_timezone.utc):%Y%m%dT%H%M%SZ}")
+
+    lines = [b'BEGIN:VEVENT\r\n', uid, stamp, content_line('DTSTART;VALUE=DATE', f"{event['date']:%Y%m%d}")]
+    lines.append(content_line('SUMMARY', escape(event['title'])))
+    if event['description']:
+        lines.append(content_line('DESCRIPTION', escape(event['description'])))
+    if event['recurrence']:
+        lines.append(content_line('RRULE', event['recurrence']))
+        cancelled = [f"{exception['original_date']:%Y%m%d}" for exception in exceptions if exception['cancelled']]
+        if cancelled:
+            lines.append(content_line('EXDATE;VALUE=DATE', ','.join(cancelled)))
+    lines.append(b'END:VEVENT\r\n')
+
+    if event['recurrence']:
+        for exception in exceptions:
+            if exception['cancelled']:
+                continue
+            lines += [
+                b'BEGIN:VEVENT\r\n', uid, stamp,
+                content_line('RECURRENCE-ID;VALUE=DATE', f"{exception['original_date']:%Y%m%d}"),
+                content_line('DTSTART;VALUE=DATE', f"{exception['date'] or exception['original_date']:%Y%m%d}"),
+                content_line('SUMMARY', escape(exception['title'] or event['title'])),
+            ]
+            description = exception['description'] if exception['description'] is not None else event['description']
+            if description:
+                lines.append(content_line('DESCRIPTION', escape(description)))
+            lines.append(b'END:VEVENT\r\n')
+    return lines
+
+
+def unfolded(lines):
+    """Logical content lines from an iterable of physical lines (bytes or str)"""
+    current = None
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', 'replace')
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t'):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def split_line(line):
+    """(NAME, value) of a content line; parameters are dropped"""
+    head, sep, value = line.partition(':')
+    if '"' not in head:
+        return head.split(';', 1)[0].strip().upper(), value
+    quoted = False  # a quoted parameter value may contain ':'
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ':' and not quoted:
+            return line[:index].split(';', 1)[0].strip().upper(), line[index + 1:]
+    return line.strip().upper(), ''
+
+
+def parse_date(value):
+    """Date of a DATE or DATE-TIME value (the time of day is dropped)"""
+    value = value.strip()
+    try:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    except ValueError:
+        raise ValueError(f"'{value}' is not a date")
+
+
+def components(lines):
+    """
+    Yield each VEVENT of an iCalendar stream as a dict
+
+    Keys: uid, summary, description, dtstart, rrule, recurrence_id (raw
+    strings) and exdates (list). Nested components (e.g. VALARM) are skipped.
+    """
+    event = None
+    nested = 0
+    for line in unfolded(lines):
+        name, value = split_line(line)
+        if name == 'BEGIN':
+            if event is not None:
+                nested += 1
+            elif value.strip().upper() == 'VEVENT':
+                event = {'exdates': []}
+        elif name == 'END':
+            if nested:
+                nested -= 1
+            elif event is not None and value.strip().upper() == 'VEVENT':
+                yield event
+                event = None
+        elif event is not None and not nested:
+            if name == 'EXDATE':
+                event['exdates'].extend(value.split(','))
+            elif name in ('UID', 'SUMMARY', 'DESCRIPTION', 'DTSTART', 'RRULE', 'RECURRENCE-ID'):
+                event[name.lower().replace('-', '_')] = value
+
+
+def import_events(user, lines, batch_size=None, max_events=None):
+    """
+    Import VEVENTs from an iCalendar stream into a user's calendar
+
+    Events are inserted with bulk_create in batches, all in one transaction.
+    Exceptions (EXDATE and RECURRENCE-ID overrides) are attached to their
+    recurring event once every event is in. Events that cannot be imported
+    (no DTSTART, an unsupported RRULE) are skipped and reported. bulk_create
+    sends no post_save, so the user's schedule suggestions are refreshed
+    once, after the transaction commits.
+
+    Args:
+        user: Owner of the imported events
+        lines (iterable): Lines of the file (e.g. an uploaded file)
+
+    Returns:
+        dict: {'created': int, 'exceptions': int, 'skipped': int, 'errors': [str]}
+
+    Raises:
+        CalendarImportError: More than max_events events (nothing is imported)
+    """
+    batch_size = batch_size or settings.CALENDAR_IMPORT_BATCH_SIZE
+    max_events = max_events or settings.CALENDAR_IMPORT_MAX_EVENTS
+    created = skipped = 0
+    errors = []
+    batch = []
+    recurring = {}  # UID -> Event, for attaching exceptions
+    changes = {}  # (UID, original date) -> EventException fields
+
+    def skip(component, reason):
+        nonlocal skipped
+        skipped += 1
+        if len(errors) < 20:
+            errors.append(f"{unescape(component.get('summary', '')) or component.get('uid', 'Event')}: {reason}")
+
+    with transaction.atomic():
+        for component in components(lines):
+            uid = component.get('uid')
+            try:
+                if 'recurrence_id' in component:
+                    if not uid:
+                        raise ValueError('Changed occurrence without a UID')
+                    original_date = parse_date(component['recurrence_id'])
+                    changes[uid, original_date] = {
+                        'date': parse_date(component['dtstart']) if 'dtstart' in component else None,
+                        'title': unescape(component.get('summary', ''))[:120],
+                        'description': unescape(component['description']) if 'description' in component else None,
+                    }
+                    continue
+                if 'dtstart' not in component:
+                    raise ValueError('No start date')
+                event = Event(
+                    user=user,
+                    title=unescape(component.get('summary', '')).strip()[:120] or 'Untitled event',
+                    description=unescape(component.get('description', '')) or None,
+                    date=parse_date(component['dtstart'])
+                )
+                if 'rrule' in component:
+                    rule = Rule.parse(component['rrule'])
+                    event.recurrence = str(rule)
+                    event.recurrence_end = rule.last_occurrence(event.date)
+                    if uid:
+                        recurring[uid] = event
+                        for exdate in component['exdates']:
+                            changes.setdefault((uid, parse_date(exdate)), {'cancelled': True})
+            except ValueError as e:
+                skip(component, e)
+                continue
+
+            batch.append(event)
+            if created + len(batch) > max_events:
+                raise CalendarImportError(f'The file has more than {max_events} events')
+            if len(batch) >= batch_size:
+                Event.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        Event.objects.bulk_create(batch)
+        created += len(batch)
+
+        exceptions = []
+        for (uid, original_date), fields in changes.items():
+            event = recurring.get(uid)
+            # Only occurrences the rule actually produces (bulk_create set the pks)
+            if event is None or original_date not in event.rule.occurrences(
+                event.date, original_date, original_date, last=event.recurrence_end
+            ):
+                continue
+            moved = fields.get('date')
+            if moved and (moved < event.date or (event.recurrence_end and moved > event.recurrence_end)):
+                skip({'summary': event.title}, f"occurrence of {original_date} moved outside the event's date range")
+                continue
+            exceptions.append(EventException(event=event, original_date=original_date, **fields))
+        EventException.objects.bulk_create(exceptions, batch_size=batch_size)
+        if created:
+            transaction.on_commit(lambda: scheduling.refresh_user(user.pk))
+
+    return {'created': created, 'exceptions': len(exceptions), 'skipped': skipped, 'errors': errors}
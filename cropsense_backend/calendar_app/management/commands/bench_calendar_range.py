@@ -0,0 +1,94 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from calendar_app.models import Event
+from cropsense_backend.benchmark import throwaway_database
+
+TITLES = ('Plant maize', 'Top dress', 'Weeding', 'Spray fungicide', 'Irrigate', 'Harvest', 'Scout for pests')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark loading one month of a large calendar: all events filtered '
+        'in Python vs a date-range query, with and without the (user, date) index'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--events', type=int, default=12000,
+                            help='Events per user, spread over five years')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user_ids = self.populate(options['users'], options['events'])
+            self.bench(user_ids, options['repeat'])
+
+    def populate(self, users, per_user):
+        rng = np.random.default_rng(0)
+        now = timezone.now()
+        start = date(2023, 1, 1)
+        user_ids = [User.objects.create_user(f'farmer{i}').id for i in range(users)]
+
+        sql = (f"INSERT INTO {Event._meta.db_table} (user_id, title, description, date, created_at, updated_at) "
+               "VALUES (%s, %s, %s, %s, %s, %s)")
+        started = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Users interleaved, as rows would be in a shared table
+            offsets = rng.integers(0, 5 * 365, (per_user, users))
+            for row in range(0, per_user, 1000):
+                cursor.executemany(sql, [
+                    (user_id, TITLES[(row + i) % len(TITLES)], 'Seasonal task',
+                     start + timedelta(days=int(offsets[row + i, u])), now, now)
+                    for i in range(min(1000, per_user - row))
+                    for u, user_id in enumerate(user_ids)
+                ])
+        self.stdout.write(f"Inserted {users * per_user} events for {users} users in "
+                          f"{time.perf_counter() - started:.1f}s")
+        return user_ids
+
+    def bench(self, user_ids, repeat):
+        first, last = date(2025, 6, 1), date(2025, 6, 30)
+
+        def load_all(user_id):
+            # Before: the UI loaded every event and picked out the month
+            return [
+                event for event in Event.objects.filter(user_id=user_id).order_by('date').values('id', 'title', 'date')
+                if first <= event['date'] <= last
+            ]
+
+        def range_query(user_id):
+            return list(Event.objects.filter(
+                user_id=user_id, date__gte=first, date__lte=last
+            ).order_by('date').values('id', 'title', 'date'))
+
+        index = next(index for index in Event._meta.indexes if index.name == 'event_user_date_idx')
+        with connection.schema_editor() as editor:
+            editor.remove_index(Event, index)
+
+        results = {}
+        for label, query in (('all events, filter in Python', load_all), ('range query, no index', range_query)):
+            results[label] = self.time(query, user_ids, repeat)
+
+        with connection.schema_editor() as editor:
+            editor.add_index(Event, index)
+        connection.cursor().execute('ANALYZE')
+        results['range query, (user, date) index'] = self.time(range_query, user_ids, repeat)
+
+        for label, (median, rows) in results.items():
+            self.stdout.write(f"{label:34} {median * 1000:8.2f} ms median  ({rows} events in June 2025)")
+
+    def time(self, query, user_ids, repeat):
+        timings = []
+        for i in range(repeat):
+            started = time.perf_counter()
+            rows = len(query(user_ids[i % len(user_ids)]))
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings), rows
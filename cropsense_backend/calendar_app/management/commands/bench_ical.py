@@ -0,0 +1,159 @@
+import io
+import time
+import tracemalloc
+import warnings
+from datetime import date, timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from calendar_app import ical
+from calendar_app.models import Event
+from cropsense_backend.benchmark import throwaway_database
+
+TITLES = ('Plant maize', 'Top dress', 'Weeding', 'Spray fungicide', 'Irrigate', 'Harvest', 'Scout for pests')
+RULES = ('FREQ=WEEKLY;BYDAY=MO,TH', 'FREQ=WEEKLY;INTERVAL=2', 'FREQ=MONTHLY;COUNT=12')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark .ics export (streamed, peak memory, also through the ASGI '
+        'handler) and import (batched bulk_create, rows/sec) for a large farm calendar'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=50000)
+        parser.add_argument('--recurring', type=float, default=0.05,
+                            help='Share of the events that repeat')
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            owner = User.objects.create_user('exporter')
+            self.populate(owner, options['events'] // 10, options['recurring'])
+            small = self.export(owner)
+            self.populate(owner, options['events'] - options['events'] // 10, options['recurring'])
+            large = self.export(owner)
+            self.stdout.write(
+                f"Export peak memory: {small['peak'] / 1024:.0f} KiB for {small['events']} events, "
+                f"{large['peak'] / 1024:.0f} KiB for {large['events']} events"
+            )
+            self.export_asgi(owner)
+            body = b''.join(ical.export(owner))
+            self.import_file(User.objects.create_user('importer'), body, large['events'])
+
+    def populate(self, user, count, recurring):
+        now = timezone.now()
+        every = max(1, round(1 / recurring)) if recurring else 0
+        sql = (f"INSERT INTO {Event._meta.db_table} "
+               "(user_id, title, description, date, recurrence, recurrence_end, created_at, updated_at) "
+               "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)")
+        rows = []
+        for i in range(count):
+            rule = RULES[i % len(RULES)] if every and i % every == 0 else ''
+            day = date(2024, 1, 1) + timedelta(days=i % 1500)
+            end = day + timedelta(days=330) if rule.endswith('COUNT=12') else None
+            rows.append((user.id, TITLES[i % len(TITLES)], f'Block {i % 40}, notes for task {i}', day, rule, end, now, now))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+
+    def export(self, user):
+        events = Event.objects.filter(user=user).count()
+        started = time.perf_counter()
+        chunks = size = 0
+        for chunk in ical.export(user):
+            # A streaming response hands each chunk to the server and drops it
+            chunks += 1
+            size += len(chunk)
+        elapsed = time.perf_counter() - started
+
+        # Memory is measured on a second pass: tracing slows Python down
+        tracemalloc.start()
+        for chunk in ical.export(user):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"Export {events} events: {elapsed:.2f}s ({events / elapsed:,.0f} events/s), "
+            f"{size / 1024 / 1024:.1f} MiB in {chunks} chunks"
+        )
+        return {'events': events, 'peak': peak}
+
+    def export_asgi(self, user):
+        """The export endpoint served by Django's ASGI handler, as under daphne"""
+        token = str(RefreshToken.for_user(user).access_token)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': '/api/calendar/export/', 'raw_path': b'/api/calendar/export/',
+            'query_string': b'', 'root_path': '', 'server': ('localhost', 8000), 'client': ('127.0.0.1', 50000),
+            'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+        }
+
+        async def endpoint(send):
+            await ASGIHandler()(scope, self.receive, send)
+        self.report_asgi('ASGI export endpoint', endpoint)
+
+        # Baseline: the sync generator handed to the ASGI server as before
+        async def sync_generator(send):
+            response = StreamingHttpResponse(ical.export(user))
+            await send({'type': 'http.response.start', 'status': response.status_code})
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                async for chunk in response:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        self.report_asgi('ASGI, sync generator', sync_generator)
+
+    async def receive(self):
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    def report_asgi(self, label, serve):
+        timings = {'chunks': 0, 'size': 0}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                timings['status'] = message['status']
+            elif message.get('body'):
+                timings.setdefault('first', time.perf_counter())
+                timings['chunks'] += 1
+                timings['size'] += len(message['body'])
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        async_to_sync(serve)(send)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"{label} (status {timings['status']}): first chunk after "
+            f"{(timings.get('first', started) - started) * 1000:.0f}ms, {elapsed:.2f}s total, "
+            f"{timings['size'] / 1024 / 1024:.1f} MiB in {timings['chunks']} chunks, peak memory {peak / 1024:.0f} KiB"
+        )
+
+    def import_file(self, user, body, events):
+        started = time.perf_counter()
+        result = ical.import_events(user, io.BytesIO(body))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Import {events} events ({len(body) / 1024 / 1024:.1f} MiB): {elapsed:.2f}s, "
+            f"{result['created'] / elapsed:,.0f} rows/s (created {result['created']}, skipped {result['skipped']})"
+        )
+
+        # Baseline: the same events saved one at a time (a sample, extrapolated)
+        sample = list(ical.components(io.BytesIO(body)))[:2000]
+        started = time.perf_counter()
+        with transaction.atomic():
+            for component in sample:
+                Event.objects.create(
+                    user=user,
+                    title=ical.unescape(component['summary']),
+                    description=ical.unescape(component.get('description', '')),
+                    date=ical.parse_date(component['dtstart']),
+                    recurrence=component.get('rrule', '')
+                )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"One save() per event, in one transaction: {len(sample) / elapsed:,.0f} rows/s")
@@ -0,0 +1,108 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from calendar_app import occurrences
+from calendar_app.models import Event
+from calendar_app.recurrence import Rule
+from cropsense_backend.benchmark import throwaway_database
+
+SCHEDULES = (
+    ('Irrigate', 'FREQ=WEEKLY;BYDAY=MO,TH'),
+    ('Spray fungicide', 'FREQ=WEEKLY;INTERVAL=2'),
+    ('Scout for pests', 'FREQ=DAILY;INTERVAL=3'),
+    ('Top dress', 'FREQ=MONTHLY'),
+    ('Plant maize', 'FREQ=YEARLY'),
+)
+FIELDS = ('id', 'title', 'description', 'date', 'recurrence', 'recurrence_end', 'updated_at')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark reading a date range of recurring farm tasks: one stored row '
+        'per occurrence vs one row per schedule expanded lazily (cold and cached)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--schedules', type=int, default=40,
+                            help='Recurring schedules per user, each running for ten years')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            materialized, recurring = self.populate(options['users'], options['schedules'])
+            self.bench(materialized, recurring, options['repeat'])
+
+    def populate(self, users, schedules):
+        now = timezone.now()
+        start, end = date(2021, 1, 1), date(2030, 12, 31)
+        sql = (f"INSERT INTO {Event._meta.db_table} "
+               "(user_id, title, description, date, recurrence, recurrence_end, created_at, updated_at) "
+               "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)")
+
+        materialized, recurring = [], []
+        rows = 0
+        started = time.perf_counter()
+        with transaction.atomic(), connection.cursor() as cursor:
+            for i in range(users):
+                # The same calendar stored both ways, for two different users
+                flat = User.objects.create_user(f'flat{i}').id
+                lazy = User.objects.create_user(f'lazy{i}').id
+                materialized.append(flat)
+                recurring.append(lazy)
+                for s in range(schedules):
+                    title, text = SCHEDULES[s % len(SCHEDULES)]
+                    first = start + timedelta(days=s % 28)
+                    rule = Rule.parse(text)
+                    days = list(rule.occurrences(first, first, end))
+                    cursor.executemany(sql, [(flat, title, '', day, '', None, now, now) for day in days])
+                    cursor.execute(sql, (lazy, title, '', first, f'{text};UNTIL={end:%Y%m%d}', end, now, now))
+                    rows += len(days)
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f"{users * schedules} schedules per layout: {rows} occurrence rows vs "
+            f"{users * schedules} recurring rows ({time.perf_counter() - started:.1f}s)"
+        )
+        return materialized, recurring
+
+    def bench(self, materialized, recurring, repeat):
+        windows = {'one month': (date(2026, 6, 1), date(2026, 6, 30)),
+                   'one year': (date(2026, 1, 1), date(2026, 12, 31))}
+
+        def stored(user_id, start, end):
+            return list(Event.objects.filter(
+                user_id=user_id, date__gte=start, date__lte=end
+            ).order_by('date', 'id').values(*FIELDS))
+
+        def expanded(user_id, start, end):
+            return occurrences.window_rows(Event.objects.filter(user_id=user_id), start, end, FIELDS)
+
+        def cold(user_id, start, end):
+            cache.clear()
+            return expanded(user_id, start, end)
+
+        for name, (start, end) in windows.items():
+            cache.clear()
+            for user_id in recurring:
+                expanded(user_id, start, end)  # fill the cache for the cached run
+            for label, query, user_ids in (
+                ('one row per occurrence', stored, materialized),
+                ('recurring rows, cached expansion', expanded, recurring),
+                ('recurring rows, expanded', cold, recurring),
+            ):
+                timings = []
+                for i in range(repeat):
+                    user_id = user_ids[i % len(user_ids)]
+                    started = time.perf_counter()
+                    count = len(query(user_id, start, end))
+                    timings.append(time.perf_counter() - started)
+                self.stdout.write(
+                    f"{name:9} {label:34} {statistics.median(timings) * 1000:8.2f} ms median  ({count} occurrences)"
+                )
@@ -0,0 +1,140 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from calendar_app.models import Event, ScheduleSuggestion
+from calendar_app.scheduling import refresh
+from cropsense_backend.benchmark import throwaway_database
+from weather.forecast import DAILY_FIELDS, FORMAT_VERSION, HOURLY_FIELDS
+from weather.models import FarmLocation, WeatherCache
+from weather.services import coordinate_cache_key
+
+TITLES = ('Spray fungicide', 'Irrigate block A', 'Weeding', 'Harvest beans', 'Scout for pests', 'Market day')
+RULES = ('FREQ=DAILY;INTERVAL=2', 'FREQ=WEEKLY;BYDAY=MO,TH')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the weather-aware scheduling job: a full run over every user, '
+        'a rerun with nothing changed, and a rerun after a few events and one '
+        'forecast changed'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--events', type=int, default=10,
+                            help='Upcoming events per user (one in five recurring)')
+        parser.add_argument('--farms', type=int, default=200,
+                            help='Distinct forecast locations shared by the users')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with throwaway_database():
+            user_ids, keys = self.populate(rng, options['users'], options['events'], options['farms'])
+            batch_size = options['batch_size']
+
+            def run(label, force=False):
+                started = time.perf_counter()
+                recomputed = sum(
+                    refresh(user_ids[i:i + batch_size], force=force)
+                    for i in range(0, len(user_ids), batch_size)
+                )
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label:32} {elapsed:7.2f} s  {recomputed} users recomputed, "
+                    f"{len(user_ids) / elapsed:,.0f} users/s checked"
+                )
+
+            run('full run')
+            self.stdout.write(f"{ScheduleSuggestion.objects.count()} suggestions stored")
+            run('rerun, nothing changed')
+
+            # About 1% of events edited, and one shared forecast refreshed
+            events = list(Event.objects.order_by('?').values_list('id', flat=True)[:max(1, Event.objects.count() // 100)])
+            Event.objects.filter(id__in=events).update(date=F('date') + timedelta(days=1), updated_at=timezone.now())
+            WeatherCache.objects.filter(city=keys[0]).update(cached_at=timezone.now())
+            run(f'rerun, {len(events)} events + 1 forecast')
+
+            # Baseline: one user per call, as a per-user job would do it (a sample, extrapolated)
+            sample = user_ids[:200]
+            started = time.perf_counter()
+            for user_id in sample:
+                refresh([user_id], force=True)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{'one user per call (forced)':32} {len(sample) / elapsed:,.0f} users/s")
+
+    def populate(self, rng, users, events, farms):
+        today = timezone.localdate()
+        now = timezone.now()
+        coordinates = [(rng.uniform(-30, 10), rng.uniform(25, 45)) for _ in range(farms)]
+        keys = [coordinate_cache_key(lat, lon) for lat, lon in coordinates]
+        WeatherCache.objects.bulk_create(
+            [WeatherCache(city=key, weather_data=self._forecast(rng, today)) for key in dict.fromkeys(keys)]
+        )
+
+        sql = (f"INSERT INTO {Event._meta.db_table} "
+               "(user_id, title, description, date, recurrence, recurrence_end, created_at, updated_at) "
+               "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)")
+        user_ids = []
+        locations = []
+        rows = []
+        for i in range(users):
+            user_ids.append(User.objects.create_user(f'farmer{i}').id)
+            lat, lon = coordinates[i % farms]
+            locations.append(FarmLocation(user_id=user_ids[-1], name='Farm', latitude=lat, longitude=lon, is_default=True))
+            for e in range(events):
+                rule = RULES[e % len(RULES)] if e % 5 == 0 else ''
+                day = today + timedelta(days=rng.randrange(-7 if rule else 0, 8))
+                rows.append((user_ids[-1], TITLES[rng.randrange(len(TITLES))], '', day, rule, None, now, now))
+        FarmLocation.objects.bulk_create(locations)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+            cursor.execute('ANALYZE')
+        self.stdout.write(f"{users} users, {len(rows)} events, {len(set(keys))} forecasts")
+        return user_ids, keys
+
+    def _forecast(self, rng, today):
+        # Seven days hourly and eight daily from today's UTC midnight (as weather.forecast.compact stores it)
+        start = int(datetime(today.year, today.month, today.day, tzinfo=dt_timezone.utc).timestamp())
+        hourly = {field: [] for field in HOURLY_FIELDS}
+        for hour in range(168):
+            wet = rng.random() < 0.3
+            values = {
+                'time': start + hour * 3600, 'temperature': rng.uniform(14, 30), 'apparentTemperature': 22.0,
+                'dewPoint': 15.0, 'humidity': rng.random(), 'windSpeed': rng.uniform(0, 8),
+                'windGust': rng.uniform(0, 12), 'cloudCover': rng.random(), 'uvIndex': rng.randint(0, 11),
+                'precipProbability': rng.uniform(0.5, 1) if wet else rng.uniform(0, 0.3),
+                'precipIntensity': rng.uniform(0, 3) if wet else 0.0,
+                'summary': 'Synthetic', 'icon': 'cloudy', 'precipType': 'rain',
+            }
+            for field in HOURLY_FIELDS:
+                hourly[field].append(values[field])
+
+        daily = {field: [] for field in DAILY_FIELDS}
+        for day in range(8):
+            time_ = start + day * 86400
+            values = {
+                'time': time_, 'temperatureHigh': rng.uniform(22, 32), 'temperatureLow': 14.0,
+                'humidity': rng.random(), 'windSpeed': rng.uniform(0, 8), 'windGust': rng.uniform(0, 12),
+                'uvIndex': rng.randint(0, 11), 'precipProbability': rng.random(), 'precipIntensity': rng.uniform(0, 3),
+                'sunriseTime': time_ + 6 * 3600, 'sunsetTime': time_ + 18 * 3600,
+                'summary': 'Synthetic', 'icon': 'cloudy', 'precipType': 'rain',
+            }
+            for field in DAILY_FIELDS:
+                daily[field].append(values[field])
+
+        return {
+            'version': FORMAT_VERSION,
+            'location': {'latitude': 0.0, 'longitude': 0.0, 'timezone': 'UTC'},
+            'currently': {},
+            'hourly': hourly,
+            'daily': daily,
+        }
@@ -0,0 +1,51 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from calendar_app.scheduling import refresh
+
+
+class Command(BaseCommand):
+    help = (
+        'Check every user\'s upcoming events against their cached forecast and '
+        'store scheduling suggestions. Users whose events and forecast are '
+        'unchanged since the last run are skipped. Run after prefetch_weather.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Users per batch')
+        parser.add_argument('--force', action='store_true',
+                            help='Recompute every user, changed or not')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, every --interval seconds')
+        parser.add_argument('--interval', type=int, default=900,
+                            help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            checked, recomputed = self.run(options['batch_size'], options['force'])
+            self.stdout.write(
+                f"Checked {checked} users, recomputed {recomputed} "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def run(self, batch_size, force=False):
+        checked = recomputed = 0
+        last_id = 0
+        while True:
+            user_ids = list(User.objects.filter(
+                pk__gt=last_id,
+                is_active=True
+            ).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not user_ids:
+                return checked, recomputed
+            recomputed += refresh(user_ids, force=force)
+            checked += len(user_ids)
+            last_id = user_ids[-1]
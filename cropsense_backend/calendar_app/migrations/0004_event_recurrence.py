@@ -0,0 +1,48 @@
+# Generated by Django 4.2 on 2026-10-19 09:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_app', '0003_event_event_user_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_date', models.DateField()),
+                ('cancelled', models.BooleanField(default=False)),
+                ('date', models.DateField(blank=True, null=True)),
+                ('title', models.CharField(blank=True, default='', max_length=120)),
+                ('description', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_end',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('recurrence', ''), _negated=True), fields=['user', 'recurrence_end'], name='event_user_recurring_idx'),
+        ),
+        migrations.AddField(
+            model_name='eventexception',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='calendar_app.event'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventexception',
+            constraint=models.UniqueConstraint(fields=('event', 'original_date'), name='event_exception_unique_date'),
+        ),
+    ]
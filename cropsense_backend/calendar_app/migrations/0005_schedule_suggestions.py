@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-19 09:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('calendar_app', '0004_event_recurrence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='schedule_state', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('signature', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScheduleSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('activity', models.CharField(max_length=20)),
+                ('reason', models.CharField(max_length=255)),
+                ('suggested_date', models.DateField(blank=True, null=True)),
+                ('suggested_start', models.DateTimeField(blank=True, null=True)),
+                ('suggested_end', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to='calendar_app.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_suggestions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='schedulesuggestion',
+            index=models.Index(fields=['user', 'date'], name='suggestion_user_date_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .recurrence import Rule
 
 User = get_user_model()
 
@@ -9,7 +13,113 @@ class Event(models.Model):
     title = models.CharField(max_length=120)
     description = models.TextField(blank=True, null=True)
     date = models.DateField()
+    # RRULE-style recurrence (see recurrence.py); empty for a one-off event.
+    # A recurring event is one row: its occurrences are generated per request.
+    recurrence = models.CharField(max_length=200, blank=True, default='')
+    # No occurrence after this date; empty if the event repeats forever
+    recurrence_end = models.DateField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Date-range queries over one user's calendar
+            models.Index(fields=['user', 'date'], name='event_user_date_idx'),
+            # Recurring events overlapping a range (few rows per user)
+            models.Index(
+                fields=['user', 'recurrence_end'],
+                condition=~models.Q(recurrence=''),
+                name='event_user_recurring_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.date})"
+
+    @property
+    def rule(self):
+        """Parsed recurrence rule, or None for a one-off event"""
+        return Rule.parse(self.recurrence) if self.recurrence else None
+
+    def save(self, *args, **kwargs):
+        rule = self.rule
+        self.recurrence_end = rule.last_occurrence(self.date) if rule else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'recurrence' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'recurrence_end'}
+        super().save(*args, **kwargs)
+
+
+class EventException(models.Model):
+    """
+    A changed or cancelled occurrence of a recurring event
+
+    Only occurrences that differ from the rule get a row. Blank fields keep
+    the event's values; `date` moves the occurrence to another day.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='exceptions')
+    original_date = models.DateField()
+    cancelled = models.BooleanField(default=False)
+    date = models.DateField(blank=True, null=True)
+    title = models.CharField(max_length=120, blank=True, default='')
+    description = models.TextField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'original_date'], name='event_exception_unique_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.event.title} ({self.original_date}{', cancelled' if self.cancelled else ''})"
+
+
+class ScheduleSuggestion(models.Model):
+    """
+    An upcoming event occurrence whose forecast weather does not suit it,
+    with the nearest day that does (see scheduling.py)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='schedule_suggestions')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='suggestions')
+    date = models.DateField()  # The occurrence at risk
+    activity = models.CharField(max_length=20)  # Weather window id, e.g. 'spraying'
+    reason = models.CharField(max_length=255)
+    suggested_date = models.DateField(blank=True, null=True)
+    suggested_start = models.DateTimeField(blank=True, null=True)
+    suggested_end = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date'], name='suggestion_user_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event.title} ({self.date}): {self.reason}"
+
+
+class ScheduleState(models.Model):
+    """Signature of the inputs a user's stored suggestions were computed from"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='schedule_state')
+    signature = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f"{self.title} ({self.date})"
\ No newline at end of file
+        return f"{self.user.username} - {self.updated_at}"
+
+
+@receiver(post_save, sender=EventException)
+@receiver(post_delete, sender=EventException)
+def touch_event(sender, instance, **kwargs):
+    # Exceptions change the event's occurrences: bump its updated_at so ETags
+    # and cached expansions keyed on it are replaced
+    Event.objects.filter(pk=instance.event_id).update(updated_at=timezone.now())
+    from .scheduling import refresh_for_event
+    transaction.on_commit(lambda: refresh_for_event(instance.event_id))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def reschedule(sender, instance, **kwargs):
+    # Recheck the owner's upcoming events against the forecast
+    from .scheduling import refresh_user
+    transaction.on_commit(lambda: refresh_user(instance.user_id))
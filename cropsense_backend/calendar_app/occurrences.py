@@ -0,0 +1,133 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from cropsense_backend.conditional import collection_etag
+from .models import EventException
+from .recurrence import Rule
+
+
+# Recurring events are stored once and expanded into occurrences only for
+# the window being read. Expanded windows are cached, keyed by the events'
+# updated_at, which changes with every edit to an event or its exceptions:
+# a stale expansion is never read again and simply expires.
+
+EXPANSION_FIELDS = ('id', 'date', 'recurrence', 'recurrence_end', 'updated_at')
+
+
+def one_off(events, start, end):
+    """One-off events between start and end (event_user_date_idx)"""
+    return events.filter(recurrence='', date__gte=start, date__lte=end)
+
+
+def recurring(events, start, end):
+    """
+    Recurring events that may occur between start and end (event_user_recurring_idx)
+
+    Deliberately not narrowed by date <= end: SQLite would then pick the
+    (user, date) index and walk all of the user's earlier one-off events.
+    Events starting after the window simply expand to nothing.
+    """
+    return events.exclude(recurrence='').filter(Q(recurrence_end__isnull=True) | Q(recurrence_end__gte=start))
+
+
+def window_etag(events, start, end):
+    """ETag for the occurrences of `events` between start and end"""
+    return f"{collection_etag(one_off(events, start, end))}-{collection_etag(recurring(events, start, end))}"
+
+
+def window_rows(events, start, end, fields):
+    """
+    Occurrences of `events` (one user's) between start and end, as rows
+
+    Args:
+        events (QuerySet): Events to read
+        start, end (date): Window (inclusive)
+        fields (iterable): .values() lookups the caller outputs
+
+    Returns:
+        list: One row per occurrence, sorted by date then id. Each is its
+        event's row with 'date' set to the occurrence's (possibly moved)
+        date, 'original_date' to its date under the rule, and any title or
+        description changed by an exception. One-off events appear as they
+        are, with 'original_date' equal to 'date'.
+    """
+    lookups = list(dict.fromkeys([*fields, *EXPANSION_FIELDS]))
+    rows = [{**row, 'original_date': row['date']} for row in one_off(events, start, end).values(*lookups)]
+    series = list(recurring(events, start, end).values(*lookups))
+    for row, occurrences in zip(series, occurrences_of(series, start, end)):
+        for day, original_date, changes in occurrences:
+            rows.append({**row, **changes, 'date': day, 'original_date': original_date})
+    rows.sort(key=lambda row: (row['date'], row['id']))
+    return rows
+
+
+def occurrences_of(series, start, end):
+    """
+    Occurrences of recurring events between start and end, cached per window
+
+    The key covers every event's id and updated_at, so editing any of them
+    (or their exceptions) moves the window to a new key.
+
+    Returns:
+        list: For each event in `series`, a list of (date, original_date,
+        changes) tuples
+    """
+    if not series:
+        return []
+    signature = ','.join(f"{row['id']}:{row['updated_at'].timestamp()}" for row in series)
+    key = f"calendar:occurrences:{start}:{end}:{hashlib.md5(signature.encode()).hexdigest()}"
+    expanded = cache.get(key)
+    if expanded is None:
+        expanded = expand(series, start, end)
+        cache.set(key, expanded, settings.CALENDAR_OCCURRENCE_CACHE_TTL)
+    return expanded
+
+
+def expand(series, start, end):
+    """
+    Generate occurrences of recurring events between start and end (uncached)
+
+    Exceptions are read with one query for all the events.
+    """
+    ids = [row['id'] for row in series]
+    exceptions = {}
+    for exception in EventException.objects.filter(event_id__in=ids).filter(
+        Q(original_date__gte=start, original_date__lte=end) | Q(date__gte=start, date__lte=end)
+    ).values('event_id', 'original_date', 'cancelled', 'date', 'title', 'description'):
+        exceptions.setdefault(exception['event_id'], {})[exception['original_date']] = exception
+
+    expanded = []
+    for row in series:
+        rule = Rule.parse(row['recurrence'])
+        changed = exceptions.get(row['id'], {})
+        occurrences = []
+        for day in rule.occurrences(row['date'], start, end, last=row['recurrence_end']):
+            exception = changed.pop(day, None)
+            if exception is None:
+                occurrences.append((day, day, {}))
+            elif not exception['cancelled'] and start <= (exception['date'] or day) <= end:
+                occurrences.append((exception['date'] or day, day, overrides(exception)))
+
+        # Occurrences moved into the window from outside it
+        for original_date, exception in changed.items():
+            if exception['cancelled'] or exception['date'] is None or not start <= exception['date'] <= end:
+                continue
+            if original_date in rule.occurrences(row['date'], original_date, original_date, last=row['recurrence_end']):
+                occurrences.append((exception['date'], original_date, overrides(exception)))
+
+        occurrences.sort()
+        expanded.append(occurrences)
+    return expanded
+
+
+def overrides(exception):
+    """Fields an exception changes"""
+    changes = {}
+    if exception['title']:
+        changes['title'] = exception['title']
+    if exception['description'] is not None:
+        changes['description'] = exception['description']
+    return changes
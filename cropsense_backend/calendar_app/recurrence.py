@@ -0,0 +1,200 @@
+from datetime import date, timedelta
+from itertools import islice
+
+
+# A small subset of iCalendar RRULE (RFC 5545), enough for farm schedules:
+#
+#   FREQ=DAILY|WEEKLY|MONTHLY|YEARLY   required
+#   INTERVAL=n                         every n days/weeks/months/years (default 1)
+#   BYDAY=MO,TH                        WEEKLY only: the weekdays (default: the start's)
+#   COUNT=n or UNTIL=YYYYMMDD          optional end; without either it repeats forever
+#
+# e.g. "FREQ=WEEKLY;INTERVAL=2;BYDAY=TU" is fortnightly on Tuesdays. As in
+# RFC 5545, a monthly or yearly rule skips months/years without the start's
+# day (the 31st, 29 February) rather than moving it.
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+MAX_COUNT = 10000
+MAX_INTERVAL = 1000
+
+
+class Rule:
+    """
+    A parsed recurrence rule
+
+    Occurrences are generated lazily, and only inside the requested window:
+    the generator jumps straight to the first period that can reach the
+    window instead of stepping through every earlier occurrence.
+    """
+
+    def __init__(self, freq, interval=1, count=None, until=None, byday=()):
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.byday = tuple(sorted(set(byday)))
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parse an RRULE string
+
+        Raises:
+            ValueError: With a message suitable for the API client
+        """
+        parts = {}
+        for part in text.strip().removeprefix('RRULE:').split(';'):
+            if not part:
+                continue
+            name, sep, value = part.partition('=')
+            if not sep or not value:
+                raise ValueError(f"'{part}' is not NAME=VALUE")
+            parts[name.strip().upper()] = value.strip().upper()
+
+        unknown = set(parts) - {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY', 'WKST'}
+        if unknown:
+            raise ValueError(f"Unsupported rule part(s): {', '.join(sorted(unknown))}")
+        freq = parts.get('FREQ')
+        if freq not in FREQUENCIES:
+            raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+        if 'COUNT' in parts and 'UNTIL' in parts:
+            raise ValueError('Use COUNT or UNTIL, not both')
+
+        interval = cls._integer(parts, 'INTERVAL', 1, MAX_INTERVAL) or 1
+        # Weeks start on Monday; another WKST only matters (and is refused)
+        # for weekly rules that skip weeks
+        if parts.get('WKST', 'MO') != 'MO' and freq == 'WEEKLY' and interval > 1:
+            raise ValueError('Only WKST=MO is supported with INTERVAL')
+        count = cls._integer(parts, 'COUNT', 1, MAX_COUNT)
+
+        until = None
+        if 'UNTIL' in parts:
+            value = parts['UNTIL'][:8]  # a date-time UNTIL is cut to its date
+            try:
+                until = date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+            except ValueError:
+                raise ValueError('UNTIL must be a date (YYYYMMDD)')
+
+        byday = ()
+        if 'BYDAY' in parts:
+            if freq != 'WEEKLY':
+                raise ValueError('BYDAY is only supported with FREQ=WEEKLY')
+            names = parts['BYDAY'].split(',')
+            if not all(name in WEEKDAYS for name in names):
+                raise ValueError(f"BYDAY must list weekdays from {','.join(WEEKDAYS)}")
+            byday = [WEEKDAYS.index(name) for name in names]
+
+        return cls(freq, interval, count, until, byday)
+
+    @staticmethod
+    def _integer(parts, name, low, high):
+        if name not in parts:
+            return None
+        try:
+            value = int(parts[name])
+        except ValueError:
+            value = None
+        if value is None or not low <= value <= high:
+            raise ValueError(f"{name} must be a whole number from {low} to {high}")
+        return value
+
+    def __str__(self):
+        """Canonical RRULE string"""
+        parts = [f'FREQ={self.freq}']
+        if self.interval != 1:
+            parts.append(f'INTERVAL={self.interval}')
+        if self.byday:
+            parts.append('BYDAY=' + ','.join(WEEKDAYS[day] for day in self.byday))
+        if self.count:
+            parts.append(f'COUNT={self.count}')
+        if self.until:
+            parts.append(f'UNTIL={self.until:%Y%m%d}')
+        return ';'.join(parts)
+
+    def last_occurrence(self, dtstart):
+        """
+        Date after which the rule produces nothing, or None if it never ends
+
+        Exact for COUNT (the count-th occurrence); for UNTIL, the UNTIL date.
+        """
+        if self.count:
+            last = next(islice(self._generate(dtstart, dtstart, date.max), self.count - 1, None), None)
+            if last is None:
+                raise ValueError('The rule runs past the end of the calendar')
+            return last
+        return self.until
+
+    def occurrences(self, dtstart, start, end, last=None):
+        """
+        Generate occurrence dates between start and end (inclusive)
+
+        Args:
+            dtstart (date): The first occurrence (the event's date)
+            start, end (date): Window to generate
+            last (date): last_occurrence(dtstart) if already known (it is
+                computed for COUNT rules otherwise)
+        """
+        if last is None:
+            last = self.last_occurrence(dtstart)
+        if last is not None:
+            end = min(end, last)
+        return self._generate(dtstart, max(start, dtstart), end)
+
+    def _generate(self, dtstart, start, end):
+        if start > end:
+            return
+        try:
+            yield from getattr(self, f'_{self.freq.lower()}')(dtstart, start, end)
+        except (OverflowError, ValueError):
+            return  # ran past date.max
+
+    def _daily(self, dtstart, start, end):
+        skip = -(-(start - dtstart).days // self.interval)  # ceil: first period in the window
+        day = dtstart + timedelta(days=skip * self.interval)
+        step = timedelta(days=self.interval)
+        while day <= end:
+            yield day
+            day += step
+
+    def _weekly(self, dtstart, start, end):
+        weekdays = self.byday or (dtstart.weekday(),)
+        monday = dtstart - timedelta(days=dtstart.weekday())
+        week = (start - monday).days // 7 // self.interval * self.interval
+        while True:
+            week_start = monday + timedelta(weeks=week)
+            if week_start > end:
+                return
+            for weekday in weekdays:
+                day = week_start + timedelta(days=weekday)
+                if day > end:
+                    return
+                if day >= start:
+                    yield day
+            week += self.interval
+
+    def _monthly(self, dtstart, start, end):
+        first = dtstart.year * 12 + dtstart.month - 1
+        month = first + (start.year * 12 + start.month - 1 - first) // self.interval * self.interval
+        while True:
+            year, index = divmod(month, 12)
+            if date(year, index + 1, 1) > end:
+                return
+            try:
+                day = date(year, index + 1, dtstart.day)
+            except ValueError:
+                day = None  # no such day this month
+            if day is not None and start <= day <= end:
+                yield day
+            month += self.interval
+
+    def _yearly(self, dtstart, start, end):
+        year = dtstart.year + (start.year - dtstart.year) // self.interval * self.interval
+        while year <= end.year:
+            try:
+                day = date(year, dtstart.month, dtstart.day)
+            except ValueError:
+                day = None  # 29 February outside a leap year
+            if day is not None and start <= day <= end:
+                yield day
+            year += self.interval
@@ -0,0 +1,290 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from weather.forecast import DAILY_FIELDS, HOURLY_FIELDS, is_compact
+from weather.models import FarmLocation, WeatherCache
+from weather.recommendations import daylight_mask, get_engine, stack_block
+from weather.services import coordinate_cache_key
+from . import occurrences
+from .models import Event, ScheduleState, ScheduleSuggestion
+
+logger = logging.getLogger(__name__)
+
+
+# Weather-aware scheduling: upcoming event occurrences are checked against
+# the cached forecast of the user's farm. An event whose activity needs
+# suitable weather (spraying, irrigation, field work; the windows defined
+# in weather/rules.json) is flagged when its day has no suitable window,
+# and the nearest day that has one is suggested.
+#
+# Forecasts are analysed once per coordinate bucket for all users sharing
+# it, and each occurrence is then a lookup in the day tables, so a user
+# costs O(events + forecast hours). Suggestions are stored; a user is only
+# recomputed when the signature of their inputs (today's date, forecast
+# version and upcoming occurrences) changes.
+
+# Event title keywords per window id, first match wins
+ACTIVITIES = (
+    ('spraying', ('spray', 'fungicide', 'pesticide', 'herbicide', 'insecticide')),
+    ('irrigation', ('irrigat', 'water')),
+    ('field_work', ('plant', 'sow', 'transplant', 'weed', 'harvest', 'till', 'plough', 'plow',
+                    'fertili', 'top dress', 'top-dress', 'mulch', 'prun')),
+)
+
+# Daily forecast fields standing in for the hourly ones in window conditions
+DAILY_STAND_INS = {'precipProbability': 'precipProbability', 'windSpeed': 'windSpeed', 'temperature': 'temperatureHigh'}
+
+REASONS = {
+    'precipProbability': 'rain likely ({value:.0%})',
+    'windSpeed': 'wind {value:.1f} m/s',
+    'temperature': 'temperature {value:.0f}°C',
+}
+
+
+def activity_for(title):
+    """Window id for an event title, or None if its weather does not matter"""
+    title = title.lower()
+    for activity, keywords in ACTIVITIES:
+        if any(keyword in title for keyword in keywords):
+            return activity
+    return None
+
+
+def zone(forecast):
+    try:
+        return ZoneInfo(forecast['location']['timezone'])
+    except (KeyError, TypeError, ValueError, ZoneInfoNotFoundError):
+        return dt_timezone.utc
+
+
+def local_date(timestamp, tz):
+    return datetime.fromtimestamp(timestamp, tz).date()
+
+
+def analyse(forecasts):
+    """
+    Day-by-day suitability of several forecasts for each activity
+
+    All forecasts are evaluated together as (forecast x hour) arrays with
+    the rule engine's windows. Days covered by the hourly forecast need a
+    run of suitable hours; later days are judged on the daily forecast.
+
+    Returns:
+        list: Per forecast, {activity: {date: (start, end) or None}} for
+        suitable days (start/end of the first suitable run, None when only
+        the daily forecast is known), and {activity: {date: reason}} for
+        unsuitable days
+    """
+    engine = get_engine()
+    hourly = stack_block(forecasts, 'hourly', HOURLY_FIELDS)
+    daily = stack_block(forecasts, 'daily', DAILY_FIELDS)
+    hourly['daylight'] = daylight_mask(hourly, daily)
+    params = {name: np.full(len(forecasts), value, dtype=float) for name, value in engine.crops['default'].items()}
+    daily_arrays = {field: daily[source] for field, source in DAILY_STAND_INS.items()}
+    windows = {window.id: window for window in engine.windows}
+
+    zones = [zone(forecast) for forecast in forecasts]
+    days = []  # per forecast: [(date, index in the daily block, covered by hourly)]
+    for row, tz in enumerate(zones):
+        times = hourly['time'][row]
+        last_hour = np.nanmax(times) if not np.isnan(times).all() else -np.inf
+        forecast_days = []
+        for index, start in enumerate(daily['time'][row].tolist()):
+            if start != start:
+                continue
+            sunset = daily['sunsetTime'][row, index]
+            covered = last_hour >= (sunset if sunset == sunset else start + 86399)
+            forecast_days.append((local_date(start, tz), index, covered))
+        days.append(forecast_days)
+
+    suitable = [{activity: {} for activity in windows} for _ in forecasts]
+    unsuitable = [{activity: {} for activity in windows} for _ in forecasts]
+    for activity, window in windows.items():
+        rows, starts, ends = window.runs(hourly, params)
+        for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist()):
+            # A run may span midnight: each day keeps its own part, if long enough
+            times = hourly['time'][row, start:end].tolist()
+            first = 0
+            for hour in range(1, len(times) + 1):
+                day = local_date(times[first], zones[row])
+                if hour < len(times) and local_date(times[hour], zones[row]) == day:
+                    continue
+                if hour - first >= window.min_hours and day not in suitable[row][activity]:
+                    suitable[row][activity][day] = (
+                        datetime.fromtimestamp(times[first], dt_timezone.utc),
+                        datetime.fromtimestamp(times[hour - 1] + 3600, dt_timezone.utc)
+                    )
+                first = hour
+
+        # Daily values: the verdict beyond the hourly horizon, and the reason for any unsuitable day
+        passed = [
+            (condition, condition.evaluate(daily_arrays, params))
+            for condition in window.conditions if condition.field in daily_arrays
+        ]
+        for row, forecast_days in enumerate(days):
+            for day, index, covered in forecast_days:
+                if day in suitable[row][activity]:
+                    continue
+                failing = [condition for condition, mask in passed if not mask[row, index]]
+                if not covered and not failing:
+                    suitable[row][activity][day] = None
+                    continue
+                unsuitable[row][activity][day] = reason(window, failing, daily_arrays, row, index)
+    return [{'suitable': s, 'unsuitable': u} for s, u in zip(suitable, unsuitable)]
+
+
+def reason(window, failing, arrays, row, index):
+    if not failing:
+        return f"No {window.min_hours}-hour {'daylight ' if window.daylight else ''}window with suitable weather"
+    parts = []
+    for condition in failing:
+        value = arrays[condition.field][row, index]
+        if condition.field in REASONS and value == value:
+            parts.append(REASONS[condition.field].format(value=value))
+    return ('Unsuitable weather: ' + ', '.join(parts)) if parts else 'Unsuitable weather'
+
+
+def nearest(suitable_days, day, today):
+    """The suitable day closest to `day`, not before today (earlier on ties)"""
+    candidates = [candidate for candidate in suitable_days if candidate >= today]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda candidate: (abs((candidate - day).days), candidate))
+
+
+def suggestions_for(user_id, rows, analysis, today):
+    """ScheduleSuggestion objects for one user's upcoming occurrences"""
+    result = []
+    for row in rows:
+        activity = activity_for(row['title'])
+        if activity is None:
+            continue
+        problem = analysis['unsuitable'][activity].get(row['date'])
+        if problem is None:
+            continue  # suitable, or beyond the forecast
+        suitable = analysis['suitable'][activity]
+        alternative = nearest(suitable, row['date'], today)
+        window = suitable.get(alternative) if alternative else None
+        result.append(ScheduleSuggestion(
+            user_id=user_id,
+            event_id=row['id'],
+            date=row['date'],
+            activity=activity,
+            reason=problem[:255],
+            suggested_date=alternative,
+            suggested_start=window[0] if window else None,
+            suggested_end=window[1] if window else None
+        ))
+    return result
+
+
+def signature(today, forecast, rows):
+    parts = [str(today), forecast['key'] if forecast else '-', str(forecast['cached_at'].timestamp()) if forecast else '-']
+    parts += [f"{row['id']}:{row['date']}:{row['updated_at'].timestamp()}" for row in rows]
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def refresh(user_ids, today=None, force=False):
+    """
+    Recompute stored suggestions for users whose events or forecast changed
+
+    Reads every input with a fixed number of queries for the whole batch:
+    active users, farm locations, cached forecasts, upcoming occurrences and the stored
+    signatures.
+
+    Args:
+        user_ids (list): Users to check
+        today (date): Defaults to the local date
+        force (bool): Recompute even if the inputs are unchanged
+
+    Returns:
+        int: Number of users recomputed
+    """
+    today = today or timezone.localdate()
+    end = today + timedelta(days=settings.SCHEDULE_HORIZON_DAYS)
+
+    # Deleted and deactivated (deletion pending) accounts get no suggestions
+    user_ids = list(User.objects.filter(pk__in=user_ids, is_active=True).values_list('pk', flat=True))
+    if not user_ids:
+        return 0
+
+    # The default farm (else the first with coordinates) decides the weather
+    keys = {}
+    for location in FarmLocation.objects.filter(
+        user_id__in=user_ids,
+        latitude__isnull=False,
+        longitude__isnull=False
+    ).order_by('user_id', '-is_default', 'id').values('user_id', 'latitude', 'longitude'):
+        keys.setdefault(location['user_id'], coordinate_cache_key(location['latitude'], location['longitude']))
+
+    fresh_since = timezone.now() - timedelta(hours=settings.SCHEDULE_FORECAST_MAX_AGE_HOURS)
+    # Versions only: the forecasts themselves are loaded for users that changed
+    forecasts = {
+        cache['city']: {'key': cache['city'], 'cached_at': cache['cached_at']}
+        for cache in WeatherCache.objects.filter(
+            city__in=set(keys.values()),
+            cached_at__gte=fresh_since
+        ).values('city', 'cached_at')
+    }
+
+    upcoming = {user_id: [] for user_id in user_ids}
+    for row in occurrences.window_rows(
+        Event.objects.filter(user_id__in=user_ids), today, end, ['title', 'user_id']
+    ):
+        upcoming[row['user_id']].append(row)
+
+    stored = dict(ScheduleState.objects.filter(user_id__in=user_ids).values_list('user_id', 'signature'))
+    signatures = {
+        user_id: signature(today, forecasts.get(keys.get(user_id)), rows)
+        for user_id, rows in upcoming.items()
+    }
+    changed = [user_id for user_id in user_ids if force or stored.get(user_id) != signatures[user_id]]
+    if not changed:
+        return 0
+
+    # Analyse each needed forecast once, however many users share it
+    needed = {keys[user_id] for user_id in changed if keys.get(user_id) in forecasts}
+    raw = dict(WeatherCache.objects.filter(city__in=needed).values_list('city', 'weather_data'))
+    needed = sorted(key for key in needed if is_compact(raw.get(key)))
+    analyses = dict(zip(needed, analyse([raw[key] for key in needed]))) if needed else {}
+
+    suggestions = []
+    for user_id in changed:
+        analysis = analyses.get(keys.get(user_id))
+        if analysis is not None:
+            suggestions += suggestions_for(user_id, upcoming[user_id], analysis, today)
+
+    with transaction.atomic():
+        ScheduleSuggestion.objects.filter(user_id__in=changed).delete()
+        ScheduleSuggestion.objects.bulk_create(suggestions, batch_size=500)
+        ScheduleState.objects.bulk_create(
+            [ScheduleState(user_id=user_id, signature=signatures[user_id]) for user_id in changed],
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['signature', 'updated_at'],
+            batch_size=500
+        )
+    return len(changed)
+
+
+def refresh_user(user_id):
+    """Recompute one user's suggestions if their inputs changed (never fails the caller)"""
+    try:
+        refresh([user_id])
+    except Exception as e:
+        logger.error(f"Failed to refresh schedule suggestions for user {user_id}: {str(e)}")
+
+
+def refresh_for_event(event_id):
+    """refresh_user for an event's owner, e.g. after one of its exceptions changed"""
+    user_id = Event.objects.filter(pk=event_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        refresh_user(user_id)
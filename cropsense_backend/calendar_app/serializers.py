@@ -17,15 +17,44 @@ from .models import Event
 #         return value
     
 from rest_framework import serializers
-from .models import Event
+from cropsense_backend.serializers import ValuesSerializer
+from .models import Event, EventException
+from .recurrence import Rule
+
+
+class EventExceptionSerializer(serializers.ModelSerializer):
+    """A changed or cancelled occurrence; the event comes from the URL"""
+
+    class Meta:
+        model = EventException
+        fields = ['original_date', 'cancelled', 'date', 'title', 'description']
+
+    def validate(self, attrs):
+        event = self.context['event']
+        rule = event.rule
+        original_date = attrs['original_date']
+        if rule is None:
+            raise serializers.ValidationError("Only recurring events have exceptions")
+        if original_date not in rule.occurrences(event.date, original_date, original_date, last=event.recurrence_end):
+            raise serializers.ValidationError({'original_date': "The event does not occur on this date"})
+        # A moved occurrence stays within the event's span, so range queries
+        # that select events by span still find it
+        moved = attrs.get('date')
+        if moved and (moved < event.date or (event.recurrence_end and moved > event.recurrence_end)):
+            raise serializers.ValidationError({'date': "An occurrence cannot move outside the event's date range"})
+        return attrs
 
 
 class EventSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
+    exceptions = EventExceptionSerializer(many=True, read_only=True)
     
     class Meta:
         model = Event
-        fields = ['id', 'title', 'description', 'date', 'username', 'created_at']
+        fields = [
+            'id', 'title', 'description', 'date', 'recurrence', 'recurrence_end',
+            'exceptions', 'username', 'created_at'
+        ]
         read_only_fields = ['created_at']
     
     def validate_title(self, value):
@@ -36,4 +65,44 @@ class EventSerializer(serializers.ModelSerializer):
     def validate_date(self, value):
         if not value:
             raise serializers.ValidationError("Date is required")
-        return value
\ No newline at end of file
+        return value
+
+    def validate_recurrence(self, value):
+        if not value or not value.strip():
+            return ''
+        try:
+            return str(Rule.parse(value))
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, attrs):
+        recurrence = attrs.get('recurrence', self.instance.recurrence if self.instance else '')
+        event_date = attrs.get('date', self.instance.date if self.instance else None)
+        if recurrence and event_date:
+            try:
+                Rule.parse(recurrence).last_occurrence(event_date)
+            except ValueError as e:
+                raise serializers.ValidationError({'recurrence': str(e)})
+        return attrs
+
+
+class EventListSerializer(ValuesSerializer):
+    """Read-only EventSerializer output built from .values() rows"""
+    fields = ('id', 'title', 'description', 'date', 'recurrence', 'recurrence_end', 'username', 'created_at')
+    sources = {'username': 'user__username'}
+
+
+class ScheduleSuggestionSerializer(ValuesSerializer):
+    """Stored weather conflicts for upcoming events, from .values() rows"""
+    fields = ('id', 'event', 'title', 'date', 'activity', 'reason', 'suggested_date', 'suggested_start', 'suggested_end')
+    sources = {'event': 'event_id', 'title': 'event__title'}
+
+
+class OccurrenceListSerializer(EventListSerializer):
+    """
+    Event occurrences in a date range (rows from occurrences.window_rows)
+
+    'id' is the event's; 'original_date' is the occurrence's date under the
+    rule, which an exception may have moved from.
+    """
+    fields = EventListSerializer.fields + ('original_date',)
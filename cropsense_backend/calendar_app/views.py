@@ -1,12 +1,79 @@
-from rest_framework import viewsets, permissions
-from .models import Event
-from .serializers import EventSerializer
+import calendar
+import logging
+from datetime import date
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from cropsense_backend.conditional import collection_etag, conditional_get
+from . import ical, occurrences
+from .models import Event, EventException, ScheduleSuggestion
+from .serializers import (
+    EventSerializer, EventListSerializer, EventExceptionSerializer, OccurrenceListSerializer,
+    ScheduleSuggestionSerializer
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest start..end range the list expands recurring events over
+MAX_RANGE_DAYS = 3660
+
+
+def parse_date_param(params, name):
+    """A YYYY-MM-DD query parameter as a date (None if absent)"""
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({'error': f'{name} must be a date (YYYY-MM-DD)'})
+    return parsed
+
+
+def parse_range_params(params):
+    """(start, end) from ?start=&end=, either possibly None"""
+    start = parse_date_param(params, 'start')
+    end = parse_date_param(params, 'end')
+    if start and end:
+        if start > end:
+            raise ValidationError({'error': 'start must not be after end'})
+        if (end - start).days > MAX_RANGE_DAYS:
+            raise ValidationError({'error': f'The range can span at most {MAX_RANGE_DAYS} days'})
+    return start, end
+
+
+def parse_month_params(params):
+    """(first, last) day of the ?year=&month= month (default: the current month)"""
+    today = timezone.localdate()
+    try:
+        year = int(params.get('year', today.year))
+        month = int(params.get('month', today.month))
+        first = date(year, month, 1)
+    except (ValueError, OverflowError):
+        raise ValidationError({'error': 'year and month must be a valid year and month (1-12)'})
+    return first, first.replace(day=calendar.monthrange(year, month)[1])
 
 
 class EventViewSet(viewsets.ModelViewSet):
     """
     A viewset for managing user-specific farming calendar events.
-    Supports: list, create, retrieve, update, delete
+    Supports: list, create, retrieve, update, delete, month, exceptions,
+    export (.ics download), import (.ics upload) and suggestions
+    
+    An event with a recurrence rule (e.g. "FREQ=WEEKLY;BYDAY=MO") is stored
+    once. list with both ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive) returns
+    the occurrences in that range, recurring events expanded; with only one
+    of them (or neither) it filters the stored events by date.
     """
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -15,10 +82,188 @@ class EventViewSet(viewsets.ModelViewSet):
         """
         Return only events belonging to the logged-in user.
         """
-        return Event.objects.filter(user=self.request.user).order_by('date')
+        events = Event.objects.filter(user=self.request.user).order_by('date')
+        if self.action == 'list':
+            start, end = parse_range_params(self.request.query_params)
+            if start and end:
+                return events  # list() expands the range
+            if start:
+                events = events.filter(date__gte=start)
+            if end:
+                events = events.filter(date__lte=end)
+        return events
+
+    def list_validators(self, request, *args, **kwargs):
+        start, end = parse_range_params(request.query_params)
+        if start and end:
+            return f"occurrences-{request.user.pk}-{start}-{end}-{occurrences.window_etag(self.get_queryset(), start, end)}", None
+        return f"events-{request.user.pk}-{collection_etag(self.get_queryset())}", None
+
+    def retrieve_validators(self, request, pk=None):
+        updated_at = self.get_queryset().filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None, None
+        return f"event-{pk}-{updated_at.timestamp()}", updated_at
+
+    @conditional_get(retrieve_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @conditional_get(list_validators)
+    def list(self, request, *args, **kwargs):
+        """
+        List events from .values() rows (see EventListSerializer), or the
+        occurrences in a start..end range (see OccurrenceListSerializer).
+        """
+        start, end = parse_range_params(request.query_params)
+        if start and end:
+            serializer_class = OccurrenceListSerializer
+            rows = occurrences.window_rows(self.get_queryset(), start, end, EventListSerializer.lookups())
+        else:
+            serializer_class = EventListSerializer
+            rows = serializer_class.values(self.get_queryset())
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(serializer_class(rows).data)
+        return self.get_paginated_response(serializer_class(page).data)
+
+    def month_validators(self, request, *args, **kwargs):
+        first, last = parse_month_params(request.query_params)
+        events = Event.objects.filter(user=request.user)
+        return f"month-{request.user.pk}-{first:%Y-%m}-{occurrences.window_etag(events, first, last)}", None
+
+    @action(detail=False, methods=['get'])
+    @conditional_get(month_validators)
+    def month(self, request):
+        """
+        Compact month view: ?year=&month= (default: the current month)
+        Returns the month's event occurrences grouped per day, for days that
+        have any.
+        """
+        first, last = parse_month_params(request.query_params)
+        rows = occurrences.window_rows(Event.objects.filter(user=request.user), first, last, ['title'])
+
+        days = {}
+        for row in rows:
+            days.setdefault(row['date'].isoformat(), []).append({'id': row['id'], 'title': row['title']})
+
+        return Response({'year': first.year, 'month': first.month, 'days': days})
+
+    @action(detail=True, methods=['post', 'delete'])
+    def exceptions(self, request, pk=None):
+        """
+        POST: Change or cancel one occurrence of a recurring event
+              {original_date, cancelled, date, title, description}; replaces
+              any earlier exception for that occurrence
+        DELETE: ?original_date=YYYY-MM-DD restores the occurrence
+        """
+        event = self.get_object()
+
+        if request.method == 'DELETE':
+            original_date = parse_date_param(request.query_params, 'original_date')
+            if original_date is None:
+                return Response({'error': 'original_date is required'}, status=status.HTTP_400_BAD_REQUEST)
+            deleted, _ = event.exceptions.filter(original_date=original_date).delete()
+            if not deleted:
+                return Response({'error': 'No exception for this date'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = EventExceptionSerializer(data=request.data, context={'event': event})
+        serializer.is_valid(raise_exception=True)
+        data = {'cancelled': False, 'date': None, 'title': '', 'description': None, **serializer.validated_data}
+        exception, created = EventException.objects.update_or_create(
+            event=event,
+            original_date=data.pop('original_date'),
+            defaults=data
+        )
+        return Response(
+            EventExceptionSerializer(exception).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    def suggestions_validators(self, request, *args, **kwargs):
+        upcoming = ScheduleSuggestion.objects.filter(user=request.user, date__gte=timezone.localdate())
+        return f"suggestions-{request.user.pk}-{collection_etag(upcoming, 'created_at')}", None
+
+    @action(detail=False, methods=['get'])
+    @conditional_get(suggestions_validators)
+    def suggestions(self, request):
+        """
+        GET: Upcoming events whose forecast weather does not suit them,
+             with the nearest suitable day (see scheduling.py)
+        """
+        rows = ScheduleSuggestionSerializer.values(
+            ScheduleSuggestion.objects.filter(user=request.user, date__gte=timezone.localdate()).order_by('date', 'id')
+        )
+        return Response(ScheduleSuggestionSerializer(rows).data)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        GET: The user's calendar as an iCalendar (.ics) file, streamed
+        """
+        # An ASGI server consumes the body asynchronously; a sync generator
+        # would be read whole before the first byte is sent
+        chunks = ical.aexport(request.user) if isinstance(request._request, ASGIRequest) else ical.export(request.user)
+        response = StreamingHttpResponse(chunks, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="cropsense-calendar.ics"'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_ics(self, request):
+        """
+        POST: Import events from an uploaded iCalendar file ('file')
+        All events are added, or none if the file is rejected.
+        """
+        if 'file' not in request.FILES:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = request.FILES['file']
+        if upload.size > settings.CALENDAR_IMPORT_MAX_BYTES:
+            return Response(
+                {'error': f'File too large (max {settings.CALENDAR_IMPORT_MAX_BYTES // (1024 * 1024)}MB)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = ical.import_events(request.user, upload)
+        except ical.CalendarImportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Calendar import failed for {request.user.username}: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        logger.info(f"Imported {result['created']} events for {request.user.username} ({result['skipped']} skipped)")
+        return Response(result, status=status.HTTP_201_CREATED)
 
     def perform_create(self, serializer):
         """
         Automatically assign the logged-in user as the event owner.
         """
         serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        """
+        Save the event and, if its date or rule changed, delete in the same
+        transaction the exceptions it no longer allows: occurrences the rule
+        does not produce any more, or moved outside the event's new span.
+        """
+        with transaction.atomic():
+            before = (serializer.instance.date, serializer.instance.recurrence)
+            event = serializer.save()
+            if (event.date, event.recurrence) == before:
+                return
+
+            rule = event.rule
+            stale = [
+                exception.pk for exception in EventException.objects.filter(event=event)
+                if rule is None
+                or exception.original_date not in rule.occurrences(
+                    event.date, exception.original_date, exception.original_date, last=event.recurrence_end
+                )
+                or (exception.date and (
+                    exception.date < event.date or (event.recurrence_end and exception.date > event.recurrence_end)
+                ))
+            ]
+            if stale:
+                EventException.objects.filter(pk__in=stale).delete()
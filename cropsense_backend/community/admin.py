@@ -4,7 +4,7 @@ from .models import Post, Comment
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ['title', 'user', 'created_at']
+    list_display = ['title', 'user', 'comment_count', 'created_at']
     search_fields = ['title', 'content']
 
 @admin.register(Comment)
@@ -0,0 +1,164 @@
+import asyncio
+import itertools
+from collections import OrderedDict, deque
+
+
+class Subscription:
+    """
+    One connection's bounded queue of encoded messages
+
+    Backpressure is per connection: if a client reads slower than messages
+    arrive and its queue fills up, the queue is emptied and the subscription
+    marked as lagged, so the stream tells that client to resync (refetch)
+    instead of buffering without bound or slowing down other subscribers.
+    """
+
+    def __init__(self, topic, max_queue):
+        self.topic = topic
+        self.queue = asyncio.Queue(max_queue)
+        self.lagged = False
+        self.closed = False
+
+    def deliver(self, frame):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._drain()
+            self.lagged = True
+            self.queue.put_nowait(b'')  # wake the reader
+
+    def close(self):
+        """Wake the reader and make it stop"""
+        self.closed = True
+        self._drain()
+        self.queue.put_nowait(None)
+
+    def _drain(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+class Broker:
+    """
+    In-process publish/subscribe hub for server-sent events
+
+    Subscribers live on the ASGI event loop; publish() may be called from any
+    thread (e.g. a sync view's post_save signal) and hands delivery to the
+    loop. Each message is encoded once and the same bytes are queued for
+    every subscriber of the topic. The most recent messages per topic are
+    kept so a reconnecting client can resume from its Last-Event-ID.
+    """
+
+    def __init__(self, max_queue=100, replay=100, max_topics=1000, heartbeat=15, heartbeat_frame=b': ping\n\n'):
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self.heartbeat_frame = heartbeat_frame
+        self.heartbeat_task = None
+        self.replay = replay
+        self.max_topics = max_topics
+        self.topics = {}
+        self.history = OrderedDict()  # topic -> deque of (id, frame), least recently used first
+        self.dropped = {}  # topic -> newest id that fell out of its history
+        self.dropped_topics = 0  # newest id in any history dropped as a whole
+        self.ids = itertools.count(1)
+        self.loop = None
+
+    def subscribe(self, topic):
+        """Register a subscription on the running loop (call from the loop)"""
+        self.loop = asyncio.get_running_loop()
+        subscription = Subscription(topic, self.max_queue)
+        self.topics.setdefault(topic, set()).add(subscription)
+        if self.heartbeat_task is None or self.heartbeat_task.done():
+            self.heartbeat_task = self.loop.create_task(self._beat())
+        return subscription
+
+    def resume(self, topic, last_id):
+        """
+        Subscribe and take the frames published after last_id, in one step
+
+        Nothing can be dispatched in between (both happen on the loop with
+        no await), so a frame is either replayed or queued, never both.
+
+        Returns:
+            tuple: (subscription, missed frames or None as in replay_since)
+        """
+        subscription = self.subscribe(topic)
+        return subscription, self.replay_since(topic, last_id)
+
+    def unsubscribe(self, subscription):
+        subscribers = self.topics.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.topics[subscription.topic]
+
+    def subscriber_count(self):
+        return sum(len(subscribers) for subscribers in self.topics.values())
+
+    def replay_since(self, topic, last_id):
+        """
+        Frames published to a topic after last_id
+
+        Returns:
+            list or None: Frames in order, or None if some are no longer kept
+        """
+        history = self.history.get(topic)
+        if history is None:
+            return None if last_id < self.dropped_topics else []
+        if last_id < self.dropped.get(topic, 0):
+            return None
+        return [frame for message_id, frame in history if message_id > last_id]
+
+    def publish(self, topic, event, data):
+        """
+        Broadcast an event to a topic's subscribers
+
+        Args:
+            topic (str): e.g. 'feed' or 'post:42'
+            event (str): SSE event name
+            data (bytes): JSON-encoded payload
+        """
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return  # No subscriber has ever connected to this process
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(topic, event, data)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, topic, event, data)
+
+    def _dispatch(self, topic, event, data):
+        message_id = next(self.ids)
+        frame = b'id: %d\nevent: %s\ndata: %s\n\n' % (message_id, event.encode(), data)
+        self._remember(topic, message_id, frame)
+        for subscription in list(self.topics.get(topic, ())):
+            subscription.deliver(frame)
+
+    def _remember(self, topic, message_id, frame):
+        history = self.history.get(topic)
+        if history is None:
+            history = self.history[topic] = deque(maxlen=self.replay)
+            if len(self.history) > self.max_topics:
+                oldest, dropped = self.history.popitem(last=False)
+                self.dropped.pop(oldest, None)
+                self.dropped_topics = max(self.dropped_topics, dropped[-1][0])
+        else:
+            self.history.move_to_end(topic)
+        if len(history) == history.maxlen:
+            self.dropped[topic] = history[0][0]
+        history.append((message_id, frame))
+
+    async def _beat(self):
+        # One timer for all connections keeps idle streams (and any proxies
+        # in between) alive; stops once nobody is subscribed
+        while self.topics:
+            await asyncio.sleep(self.heartbeat)
+            for subscribers in list(self.topics.values()):
+                for subscription in list(subscribers):
+                    if not subscription.queue.full():
+                        subscription.queue.put_nowait(self.heartbeat_frame)
@@ -0,0 +1,25 @@
+from django.db.models import Count
+
+from .models import Post
+
+
+def reconcile_comment_counts(batch_size=1000):
+    """
+    Recompute Post.comment_count and fix posts whose stored count drifted
+
+    Only drifted posts are read back (one aggregate query) and written.
+
+    Args:
+        batch_size (int): Rows per bulk update
+
+    Returns:
+        int: Number of posts corrected
+    """
+    drifted = []
+    rows = Post.objects.order_by().annotate(actual=Count('comments')).values_list('id', 'comment_count', 'actual')
+    for post_id, stored, actual in rows.iterator(chunk_size=batch_size):
+        if stored != actual:
+            drifted.append(Post(id=post_id, comment_count=actual))
+
+    Post.objects.bulk_update(drifted, ['comment_count'], batch_size=batch_size)
+    return len(drifted)
@@ -0,0 +1,118 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+# Every cached community read is keyed by the current feed version. Any post
+# or comment write bumps the version, so stale entries are simply never read
+# again and expire on their own.
+#
+# With a per-process cache (CACHE_SHARED off) a write only bumps the version
+# of the worker that handled it, so there the version itself expires after
+# COMMUNITY_CACHE_TTL: other workers' pages and ETags go stale for at most
+# that long.
+VERSION_KEY = 'community:version'
+COUNTER_KEYS = {
+    'posts': 'community:count:posts',
+    'comments': 'community:count:comments',
+}
+
+
+def version():
+    """Current feed version"""
+    current = cache.get(VERSION_KEY)
+    if current is None:
+        # Start from the clock so a lost version key never reuses old entries
+        timeout = None if settings.CACHE_SHARED else settings.COMMUNITY_CACHE_TTL
+        cache.add(VERSION_KEY, time.time_ns() // 1000000, timeout)
+        current = cache.get(VERSION_KEY)
+    return current
+
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        version()
+
+
+def invalidate():
+    """Invalidate all cached community reads once the current transaction commits"""
+    transaction.on_commit(_bump)
+
+
+def reset():
+    """Drop the running counters and cached reads, e.g. after bulk writes that skip signals"""
+    cache.delete_many(list(COUNTER_KEYS.values()))
+    invalidate()
+
+
+def adjust_count(name, delta):
+    """
+    Add delta to a running counter once the current transaction commits
+
+    A counter that is not cached is left alone; it is recounted on next read.
+    """
+    def apply():
+        try:
+            cache.incr(COUNTER_KEYS[name], delta)
+        except ValueError:
+            pass
+
+    transaction.on_commit(apply)
+
+
+def counts():
+    """
+    Total posts and comments from the running counters
+
+    Counters are seeded with a COUNT(*) when missing and expire after
+    COMMUNITY_COUNTER_TTL, which bounds any drift.
+
+    Returns:
+        dict: {'posts': int, 'comments': int}
+    """
+    from .models import Post, Comment
+
+    cached = cache.get_many(COUNTER_KEYS.values())
+    result = {}
+    for name, key in COUNTER_KEYS.items():
+        if key not in cached:
+            model = Post if name == 'posts' else Comment
+            cache.add(key, model.objects.count(), settings.COMMUNITY_COUNTER_TTL)
+            cached[key] = cache.get(key)
+        result[name] = cached[key]
+    return result
+
+
+def validators(view, request, *args, **kwargs):
+    """
+    conditional_get validators for community reads
+
+    The ETag is the feed version (bumped by every post or comment write) and
+    the reader, since some lists are per-user; no query is needed.
+    """
+    return f'community-{version()}-{request.user.pk or 0}', None
+
+
+def cached(request, name, build):
+    """
+    Data for a community read, from cache when the feed has not changed
+
+    Args:
+        request: DRF request
+        name (str): Name of the cached read (part of the key)
+        build (callable): Returns the data on a cache miss
+
+    Returns:
+        The cached or freshly built data
+    """
+    # Page links are absolute, so the host is part of the key
+    key = f'community:{name}:{request.get_host()}:{version()}'
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, settings.COMMUNITY_CACHE_TTL)
+    return data
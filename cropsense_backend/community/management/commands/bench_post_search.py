@@ -0,0 +1,88 @@
+import statistics
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from cropsense_backend.benchmark import throwaway_database
+from community.models import Post
+from community.search import RankedSearchResults
+
+WORDS = (
+    'maize tomato beans potato cassava coffee wheat rice blight rust mildew '
+    'aphids fertilizer irrigation harvest planting seedlings soil compost yield '
+    'rain drought market price seed spraying pest leaves roots weeding manure '
+    'storage cooperative extension organic greenhouse nursery mulch pruning'
+).split()
+QUERIES = ('maize', 'late blight', 'tomato rust', 'irrig', 'organic compost mulch', 'xylophone')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark FTS5 post search (capped at COMMUNITY_SEARCH_MAX_RANKED '
+        'matches; FTS5* ranks all of them) against the LIKE query it replaced, '
+        'in a throwaway database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.populate(options['posts'])
+            self.bench(options['repeat'])
+
+    def populate(self, count):
+        rng = np.random.default_rng(0)
+        user = User.objects.create_user('bench')
+        # Zipf-like word frequencies
+        weights = 1 / np.arange(1, len(WORDS) + 1)
+        weights /= weights.sum()
+        now = timezone.now()
+
+        started = time.perf_counter()
+        table = Post._meta.db_table
+        sql = (f"INSERT INTO {table} (user_id, title, content, comment_count, created_at, updated_at) "
+               "VALUES (%s, %s, %s, 0, %s, %s)")
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, count, 10000):
+                size = min(10000, count - start)
+                titles = rng.choice(WORDS, (size, 4), p=weights)
+                contents = rng.choice(WORDS, (size, 40), p=weights)
+                cursor.executemany(sql, [
+                    (user.id, ' '.join(titles[i]), ' '.join(contents[i]), now, now)
+                    for i in range(size)
+                ])
+        self.stdout.write(f"Inserted {count} posts (FTS index maintained by triggers) in "
+                          f"{time.perf_counter() - started:.1f}s")
+
+    def bench(self, repeat):
+        def like(query):
+            posts = Post.objects.filter(Q(title__icontains=query) | Q(content__icontains=query))
+            return posts.count(), list(posts[:10])
+
+        def fts(query):
+            results = RankedSearchResults(query)
+            return results.count(), results[0:10]
+
+        def fts_uncapped(query):
+            # Every match ranked, as before COMMUNITY_SEARCH_MAX_RANKED
+            results = RankedSearchResults(query, max_ranked=2 ** 62)
+            return results.count(), results[0:10]
+
+        for query in QUERIES:
+            for name, search in (('LIKE', like), ('FTS5*', fts_uncapped), ('FTS5', fts)):
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    count, _ = search(query)
+                    timings.append(time.perf_counter() - started)
+                self.stdout.write(
+                    f"{query!r:24} {name:5} {count:8} matches, first page "
+                    f"{statistics.median(timings) * 1000:9.1f} ms"
+                )
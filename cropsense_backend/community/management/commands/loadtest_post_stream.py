@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from cropsense_backend.benchmark import throwaway_database
+from community.models import Post
+from community.streams import broker
+
+
+def rss_kib():
+    """Resident set size of this process in KiB (Linux), or 0 if unknown"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the community event stream: hold N idle subscribers on the '
+        'ASGI app in this process, then time one new post reaching all of them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=10000)
+        parser.add_argument('--posts', type=int, default=5,
+                            help='Posts to broadcast (fan-out is timed for each)')
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user = User.objects.create_user('loadtest')
+            asyncio.run(self.run(user, options['subscribers'], options['posts']))
+
+    async def run(self, user, count, posts):
+        from cropsense_backend.asgi import application
+
+        hangup = asyncio.Event()
+        delivered = {'count': 0, 'done': asyncio.Event()}
+
+        async def receive():
+            await hangup.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if b'event: post' in message.get('body', b''):
+                delivered['count'] += 1
+                if delivered['count'] == count:
+                    delivered['done'].set()
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': '/api/community/stream/',
+            'query_string': b'', 'headers': [],
+        }
+
+        before = rss_kib()
+        started = time.perf_counter()
+        connections = [asyncio.ensure_future(application(scope, receive, send)) for _ in range(count)]
+        while broker.subscriber_count() < count:
+            await asyncio.sleep(0.01)
+        connected = time.perf_counter() - started
+        held = rss_kib() - before
+        self.stdout.write(
+            f"{count} subscribers connected in {connected:.2f}s; "
+            f"RSS +{held / 1024:.1f} MiB ({held / count:.2f} KiB per idle connection)"
+        )
+
+        create_post = sync_to_async(Post.objects.create)
+        timings = []
+        for i in range(posts):
+            delivered['count'] = 0
+            delivered['done'].clear()
+            started = time.perf_counter()
+            await create_post(user=user, title=f'Load test post {i}', content='Broadcast to every subscriber')
+            await delivered['done'].wait()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        self.stdout.write(
+            f"New post reached all {count} subscribers in "
+            f"{timings[len(timings) // 2] * 1000:.1f} ms median, {timings[-1] * 1000:.1f} ms max "
+            f"(save + commit + fan-out)"
+        )
+
+        hangup.set()
+        await asyncio.gather(*connections)
+        self.stdout.write(f"All disconnected; {broker.subscriber_count()} subscriptions left")
@@ -0,0 +1,76 @@
+from django.db import migrations
+
+
+# SQLite FTS5 index over post titles and content. It is an external-content
+# table: it stores only the index and reads text from community_post, and
+# the triggers keep it in sync with every insert, update and delete.
+CREATE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE community_post_fts USING fts5(
+        title, content,
+        content='community_post', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER community_post_fts_insert AFTER INSERT ON community_post BEGIN
+        INSERT INTO community_post_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER community_post_fts_delete AFTER DELETE ON community_post BEGIN
+        INSERT INTO community_post_fts(community_post_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER community_post_fts_update AFTER UPDATE OF title, content ON community_post BEGIN
+        INSERT INTO community_post_fts(community_post_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO community_post_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO community_post_fts(community_post_fts) VALUES ('rebuild')",
+]
+
+DROP_INDEX = [
+    "DROP TRIGGER IF EXISTS community_post_fts_update",
+    "DROP TRIGGER IF EXISTS community_post_fts_delete",
+    "DROP TRIGGER IF EXISTS community_post_fts_insert",
+    "DROP TABLE IF EXISTS community_post_fts",
+]
+
+
+def fts5_supported(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_index(apps, schema_editor):
+    # Other databases (or SQLite builds without FTS5) fall back to LIKE search
+    if fts5_supported(schema_editor):
+        for statement in CREATE_INDEX:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_INDEX:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_alter_comment_options_alter_post_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
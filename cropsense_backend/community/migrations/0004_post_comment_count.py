@@ -0,0 +1,66 @@
+# Generated by Django 4.2 on 2026-10-19 09:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+# SQLite adds this column by rebuilding community_post, which drops the
+# search index triggers from 0003_post_search_index; recreate them (the
+# index itself is untouched since post ids are preserved).
+CREATE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS community_post_fts_insert AFTER INSERT ON community_post BEGIN
+        INSERT INTO community_post_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS community_post_fts_delete AFTER DELETE ON community_post BEGIN
+        INSERT INTO community_post_fts(community_post_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS community_post_fts_update AFTER UPDATE OF title, content ON community_post BEGIN
+        INSERT INTO community_post_fts(community_post_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO community_post_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    if 'community_post_fts' in schema_editor.connection.introspection.table_names():
+        for statement in CREATE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+def backfill_comment_counts(apps, schema_editor):
+    Post = apps.get_model('community', 'Post')
+    Comment = apps.get_model('community', 'Comment')
+    counts = Comment.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(n=Count('id')).values('n')
+    Post.objects.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0003_post_search_index'),
+    ]
+
+    operations = [
+        # Both directions rebuild the table, so triggers are restored either way
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill_comment_counts, migrations.RunPython.noop),
+    ]
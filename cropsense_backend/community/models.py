@@ -1,10 +1,16 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import feed, streams
 
 class Post(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     title = models.CharField(max_length=200)
     content = models.TextField()
+    comment_count = models.PositiveIntegerField(default=0, editable=False)  # maintained by the comment signals below
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -29,4 +35,26 @@ class Comment(models.Model):
         verbose_name_plural = 'Comments'
     
     def __str__(self):
-        return f"Comment by {self.user.username} on {self.post.title}"
\ No newline at end of file
+        return f"Comment by {self.user.username} on {self.post.title}"
+
+
+# Keep the cached feed and counters in step with writes
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def community_saved(sender, instance, created, **kwargs):
+    if created:
+        feed.adjust_count('posts' if sender is Post else 'comments', 1)
+        if sender is Comment:
+            Post.objects.filter(pk=instance.post_id).update(comment_count=F('comment_count') + 1)
+        # Push to event stream subscribers (community/streams.py)
+        transaction.on_commit(lambda: streams.announce(instance))
+    feed.invalidate()
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def community_deleted(sender, instance, **kwargs):
+    feed.adjust_count('posts' if sender is Post else 'comments', -1)
+    if sender is Comment:
+        Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(comment_count=F('comment_count') - 1)
+    feed.invalidate()
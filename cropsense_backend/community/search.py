@@ -0,0 +1,162 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from .models import Post
+
+
+FTS_TABLE = 'community_post_fts'
+TITLE_WEIGHT = 10.0  # bm25 column weights: a title match counts for more
+CONTENT_WEIGHT = 1.0
+SNIPPET_TOKENS = {'title': 12, 'content': 24}
+
+# Highlights are marked with control characters inside SQLite and turned
+# into <mark> only after the text itself has been HTML-escaped
+_OPEN, _CLOSE = '\x02', '\x03'
+_TERM = re.compile(r'\w+\*?', re.UNICODE)
+
+_available = None
+
+
+def fts_available():
+    """True if the FTS5 index exists (SQLite with FTS5, migrated)"""
+    global _available
+    if _available is None:
+        _available = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _available
+
+
+def match_expression(query):
+    """
+    Turn free text into a safe FTS5 MATCH expression
+
+    Every term must match. Terms are quoted so FTS5 operators in user input
+    are treated as text; the last term, and any term ending in '*', matches
+    as a prefix so results appear while the user is still typing.
+
+    Returns:
+        str: MATCH expression, or '' if the query has no searchable terms
+    """
+    terms = _TERM.findall(query)
+    parts = []
+    for i, term in enumerate(terms):
+        prefix = term.endswith('*') or i == len(terms) - 1
+        term = term.rstrip('*')
+        if term:
+            parts.append(f'"{term}"' + ('*' if prefix else ''))
+    return ' '.join(parts)
+
+
+def highlight(snippet):
+    return escape(snippet).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+
+class RankedSearchResults:
+    """
+    Lazily evaluated, BM25-ranked post search results
+
+    Supports len() and slicing, so Django's paginator (and DRF's page number
+    pagination) only ranks and loads the requested page. Each result is a
+    Post with `rank`, `title_snippet` and `content_snippet` attributes.
+
+    Ranking reads every match, so a term found in most posts would cost as
+    much as the table. Results are therefore the COMMUNITY_SEARCH_MAX_RANKED
+    newest matches, ranked: FTS5 walks a term's matches by rowid (newest
+    first) cheaply, and the ranking query is bounded to that rowid range.
+    """
+
+    def __init__(self, query, max_ranked=None):
+        self.match = match_expression(query)
+        self.max_ranked = max_ranked or settings.COMMUNITY_SEARCH_MAX_RANKED
+        self._count = None
+        self._min_rowid = 0
+
+    def count(self):
+        """Number of matches, at most max_ranked"""
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT count(*) FROM (SELECT 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s)",
+                        [self.match, self.max_ranked]
+                    )
+                    self._count = cursor.fetchone()[0]
+                    if self._count == self.max_ranked:
+                        # Oldest of the newest max_ranked matches
+                        cursor.execute(
+                            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                            "ORDER BY rowid DESC LIMIT 1 OFFSET %s",
+                            [self.match, self.max_ranked - 1]
+                        )
+                        self._min_rowid = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        offset = index.start or 0
+        limit = min(index.stop if index.stop is not None else self.count(), self.count()) - offset
+        if not self.match or limit <= 0:
+            return []
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT rowid,
+                       bm25({FTS_TABLE}, %s, %s) AS rank,
+                       snippet({FTS_TABLE}, 0, %s, %s, '…', %s),
+                       snippet({FTS_TABLE}, 1, %s, %s, '…', %s)
+                FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH %s AND rowid >= %s
+                ORDER BY rank
+                LIMIT %s OFFSET %s
+                """,
+                [
+                    TITLE_WEIGHT, CONTENT_WEIGHT,
+                    _OPEN, _CLOSE, SNIPPET_TOKENS['title'],
+                    _OPEN, _CLOSE, SNIPPET_TOKENS['content'],
+                    self.match, self._min_rowid, limit, offset,
+                ]
+            )
+            rows = cursor.fetchall()
+
+        posts = Post.objects.select_related('user').prefetch_related('comments').in_bulk(
+            [row[0] for row in rows]
+        )
+        results = []
+        for post_id, rank, title_snippet, content_snippet in rows:
+            post = posts.get(post_id)
+            if post is None:
+                continue
+            post.rank = -rank  # bm25() is lower-is-better; expose higher-is-better
+            post.title_snippet = highlight(title_snippet)
+            post.content_snippet = highlight(content_snippet)
+            results.append(post)
+        return results
+
+
+def search_posts(query):
+    """
+    Search posts by title and content
+
+    Uses the FTS5 index where available, otherwise falls back to the old
+    case-insensitive substring match (unranked, newest first).
+
+    Returns:
+        RankedSearchResults or QuerySet
+    """
+    if fts_available():
+        return RankedSearchResults(query)
+
+    return Post.objects.filter(
+        Q(title__icontains=query) | Q(content__icontains=query)
+    ).select_related('user').prefetch_related('comments')
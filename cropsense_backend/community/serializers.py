@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from cropsense_backend.serializers import ValuesSerializer
 from .models import Post, Comment
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -13,7 +14,6 @@ class CommentSerializer(serializers.ModelSerializer):
 class PostSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
-    comment_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Post
@@ -21,10 +21,56 @@ class PostSerializer(serializers.ModelSerializer):
             'id', 'user', 'username', 'title', 'content',
             'created_at', 'updated_at', 'comments', 'comment_count'
         ]
-        read_only_fields = ['user', 'created_at', 'updated_at']
+        read_only_fields = ['user', 'created_at', 'updated_at', 'comment_count']
+
+
+class CommentListSerializer(ValuesSerializer):
+    """Read-only CommentSerializer output built from .values() rows"""
+    fields = ('id', 'post', 'user', 'username', 'content', 'created_at')
+    sources = {'username': 'user__username'}
+
+
+class PostListSerializer(ValuesSerializer):
+    """
+    Read-only PostSerializer output built from .values() rows
+
+    Comments for the whole page are read with one query.
+    """
+    fields = ('id', 'user', 'username', 'title', 'content', 'created_at', 'updated_at', 'comment_count')
+    sources = {'username': 'user__username'}
+
+    @property
+    def data(self):
+        posts = super().data
+        comments = {post['id']: [] for post in posts}
+        rows = CommentListSerializer.values(
+            Comment.objects.filter(post_id__in=list(comments)).order_by('created_at', 'id')
+        )
+        for comment in CommentListSerializer(rows).data:
+            comments[comment['post']].append(comment)
+
+        for post in posts:
+            post['comments'] = comments[post['id']]
+        return posts
+
+
+class PostSearchResultSerializer(PostSerializer):
+    """Post with its search rank and highlighted snippets (HTML, <mark> around matches)"""
+    rank = serializers.SerializerMethodField()
+    title_snippet = serializers.SerializerMethodField()
+    content_snippet = serializers.SerializerMethodField()
+    
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + ['rank', 'title_snippet', 'content_snippet']
+    
+    def get_rank(self, obj):
+        return getattr(obj, 'rank', None)
+    
+    def get_title_snippet(self, obj):
+        return getattr(obj, 'title_snippet', None)
     
-    def get_comment_count(self, obj):
-        return obj.comments.count()
+    def get_content_snippet(self, obj):
+        return getattr(obj, 'content_snippet', None)
 
 
 class PostCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,141 @@
+import asyncio
+import re
+from urllib.parse import parse_qs
+
+from django.conf import settings
+
+from cropsense_backend.renderers import FastJSONRenderer
+from .broker import Broker
+
+
+# Server-sent event streams of new community activity, served straight by
+# the ASGI app (see cropsense_backend/asgi.py) rather than through a Django
+# view: an idle connection costs two small coroutines and a bounded queue,
+# and client disconnects are noticed immediately.
+#
+#   /api/community/stream/                 new posts, and comment notices
+#   /api/community/posts/<id>/stream/      new comments on one post
+#
+# Streams are public, like the post and comment lists. The broker is
+# in-process: a write is pushed to the clients connected to the process
+# that handled it.
+
+broker = Broker(
+    max_queue=settings.COMMUNITY_STREAM_QUEUE_SIZE,
+    replay=settings.COMMUNITY_STREAM_REPLAY,
+    heartbeat=settings.COMMUNITY_STREAM_HEARTBEAT
+)
+
+STREAM_PATH = re.compile(r'^/api/community/(?:stream|posts/(?P<post_id>\d+)/stream)/$')
+RESYNC = b'event: resync\ndata: {}\n\n'
+
+
+def stream_topic(path):
+    """Broker topic for a stream URL path, or None if it is not a stream"""
+    match = STREAM_PATH.match(path)
+    if match is None:
+        return None
+    post_id = match.group('post_id')
+    return f'post:{post_id}' if post_id else 'feed'
+
+
+def announce(instance):
+    """
+    Broadcast a newly created post or comment to its subscribers
+
+    Called from the post_save signals once the transaction commits.
+    """
+    render = FastJSONRenderer().render
+    if instance._meta.model_name == 'post':
+        broker.publish('feed', 'post', render({
+            'id': instance.id,
+            'user': instance.user_id,
+            'username': instance.user.username,
+            'title': instance.title,
+            'content': instance.content,
+            'created_at': instance.created_at,
+            'updated_at': instance.updated_at,
+            'comment_count': 0,
+            'comments': [],
+        }))
+    else:
+        comment = {
+            'id': instance.id,
+            'post': instance.post_id,
+            'user': instance.user_id,
+            'username': instance.user.username,
+            'content': instance.content,
+            'created_at': instance.created_at,
+        }
+        broker.publish(f'post:{instance.post_id}', 'comment', render(comment))
+        broker.publish('feed', 'comment', render({'id': instance.id, 'post': instance.post_id}))
+
+
+def response_headers(scope):
+    headers = [
+        (b'content-type', b'text/event-stream'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),  # Disable proxy buffering (nginx)
+    ]
+    # The stream bypasses Django's middleware, so answer CORS here
+    origin = dict(scope['headers']).get(b'origin')
+    if origin:
+        if getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False):
+            headers.append((b'access-control-allow-origin', b'*'))
+        elif origin.decode('latin-1') in getattr(settings, 'CORS_ALLOWED_ORIGINS', ()):
+            headers.append((b'access-control-allow-origin', origin))
+            headers.append((b'vary', b'origin'))
+    return headers
+
+
+def last_event_id(scope):
+    # EventSource sends Last-Event-ID when reconnecting; allow a query
+    # parameter too, for the first connection after a page reload
+    value = dict(scope['headers']).get(b'last-event-id', b'').decode('latin-1')
+    if not value:
+        value = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('last_event_id', [''])[0]
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+async def wait_for_disconnect(receive, subscription):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            subscription.close()
+            return
+
+
+async def serve_stream(scope, receive, send, topic):
+    """ASGI handler for one event stream connection"""
+    if scope['method'] != 'GET':
+        await send({'type': 'http.response.start', 'status': 405, 'headers': [(b'allow', b'GET')]})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+
+    last_id = last_event_id(scope)
+    if last_id is not None:
+        subscription, missed = broker.resume(topic, last_id)
+    else:
+        subscription, missed = broker.subscribe(topic), []
+    watcher = asyncio.ensure_future(wait_for_disconnect(receive, subscription))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': response_headers(scope)})
+        opening = b'retry: 5000\n\n' + (RESYNC if missed is None else b''.join(missed))
+        await send({'type': 'http.response.body', 'body': opening, 'more_body': True})
+
+        while True:
+            frame = await subscription.queue.get()
+            if frame is None:
+                break
+            if subscription.lagged:
+                subscription.lagged = False
+                frame = RESYNC
+            elif not frame:
+                continue
+            await send({'type': 'http.response.body', 'body': frame, 'more_body': True})
+    finally:
+        broker.unsubscribe(subscription)
+        watcher.cancel()
@@ -3,8 +3,12 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from cropsense_backend.conditional import conditional_get
+from accounts.models import UserActivity
 from .models import Post, Comment
-from .serializers import PostSerializer, CommentSerializer, PostCreateSerializer
+from .serializers import PostSerializer, PostListSerializer, CommentSerializer, PostCreateSerializer, PostSearchResultSerializer
+from .search import search_posts
+from . import feed
 
 
 class PostListCreateView(generics.ListCreateAPIView):
@@ -20,6 +24,24 @@ class PostListCreateView(generics.ListCreateAPIView):
             return PostCreateSerializer
         return PostSerializer
     
+    @conditional_get(feed.validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    def list(self, request, *args, **kwargs):
+        # The unfiltered first page is the same for every reader: serve it from cache
+        if set(request.query_params) <= {'page'} and request.query_params.get('page', '1') == '1':
+            return Response(feed.cached(request, 'feed', lambda: self.list_page(request).data))
+        return self.list_page(request)
+    
+    def list_page(self, request):
+        # Read path built from .values() rows (see PostListSerializer)
+        rows = PostListSerializer.values(Post.objects.all())
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(PostListSerializer(rows).data)
+        return self.get_paginated_response(PostListSerializer(page).data)
+    
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -34,6 +56,10 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    @conditional_get(feed.validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return PostCreateSerializer
@@ -69,6 +95,10 @@ class UserPostsView(generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    @conditional_get(feed.validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
         username = self.kwargs.get('username')
         return Post.objects.filter(
@@ -81,6 +111,10 @@ class MyPostsView(generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticated]
     
+    @conditional_get(feed.validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
         return Post.objects.filter(
             user=self.request.user
@@ -94,6 +128,7 @@ class CommentListCreateView(APIView):
     """
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    @conditional_get(feed.validators)
     def get(self, request, post_id):
         post = get_object_or_404(Post, id=post_id)
         comments = post.comments.all().select_related('user')
@@ -121,6 +156,10 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    @conditional_get(feed.validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def update(self, request, *args, **kwargs):
         comment = self.get_object()
         
@@ -151,6 +190,10 @@ class MyCommentsView(generics.ListAPIView):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
     
+    @conditional_get(feed.validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
         return Comment.objects.filter(
             user=self.request.user
@@ -158,45 +201,45 @@ class MyCommentsView(generics.ListAPIView):
 
 
 class CommunityStatisticsView(APIView):
-    """GET: Community statistics"""
+    """GET: Community statistics (cached until the next post or comment write)"""
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    @conditional_get(feed.validators)
     def get(self, request):
-        total_posts = Post.objects.count()
-        total_comments = Comment.objects.count()
+        return Response(feed.cached(request, 'statistics', self.build))
+    
+    def build(self):
+        counts = feed.counts()
         
         # Get recent posts
-        recent_posts = Post.objects.all()[:5]
+        recent_posts = Post.objects.select_related('user').prefetch_related('comments')[:5]
         
-        # Get most active users
-        from django.db.models import Count
-        active_users = Post.objects.values(
-            'user__username'
-        ).annotate(
-            post_count=Count('id')
-        ).order_by('-post_count')[:5]
+        # Get most active users (from the per-user activity counters)
+        active_users = UserActivity.objects.filter(
+            post_count__gt=0
+        ).order_by('-post_count').values('user__username', 'post_count')[:5]
         
-        return Response({
-            'total_posts': total_posts,
-            'total_comments': total_comments,
+        return {
+            'total_posts': counts['posts'],
+            'total_comments': counts['comments'],
             'recent_posts': PostSerializer(recent_posts, many=True).data,
             'most_active_users': list(active_users)
-        })
+        }
 
 
 class SearchPostsView(generics.ListAPIView):
-    """GET: Search posts by title or content"""
-    serializer_class = PostSerializer
+    """GET: Search posts by title or content (ranked, with highlighted snippets)"""
+    serializer_class = PostSearchResultSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    @conditional_get(feed.validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
     def get_queryset(self):
-        query = self.request.query_params.get('q', '')
+        query = self.request.query_params.get('q', '').strip()
         
         if query:
-            return Post.objects.filter(
-                title__icontains=query
-            ) | Post.objects.filter(
-                content__icontains=query
-            )
+            return search_posts(query)
         
         return Post.objects.none()
\ No newline at end of file
@@ -3,6 +3,16 @@ ASGI config for cropsense_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The community event streams (/api/community/stream/ and
+/api/community/posts/<id>/stream/) are only served here, and the async views
+only run concurrently here, so the app is run under an ASGI server:
+
+    daphne -b 0.0.0.0 -p 8000 cropsense_backend.asgi:application
+
+In development, `python manage.py runserver` does the same once daphne is
+installed (settings put it first in INSTALLED_APPS). A WSGI server serves
+everything except the streams.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +23,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cropsense_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up
+from community.streams import serve_stream, stream_topic  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Community event streams are long-lived and served directly; everything
+    # else goes to Django
+    if scope['type'] == 'http':
+        topic = stream_topic(scope['path'])
+        if topic is not None:
+            return await serve_stream(scope, receive, send, topic)
+    await django_application(scope, receive, send)
@@ -0,0 +1,18 @@
+from contextlib import contextmanager
+from django.db import connection
+
+
+@contextmanager
+def throwaway_database(verbosity=0):
+    """
+    Run a benchmark against a freshly migrated test database
+
+    Management-command benchmarks generate their own data; the test database
+    (in memory on SQLite) keeps it out of the real one and is destroyed on exit.
+    """
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
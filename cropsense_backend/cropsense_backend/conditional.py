@@ -0,0 +1,78 @@
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """
+    304 Not Modified response if the client's copy is current, else None
+
+    Args:
+        request: Django or DRF request
+        etag (str): Unquoted entity tag, or None
+        last_modified (datetime): Last modification time, or None
+
+    Returns:
+        HttpResponse or None
+    """
+    if etag is None and last_modified is None:
+        return None
+    return get_conditional_response(
+        request,
+        etag=quote_etag(etag) if etag else None,
+        last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """Add ETag/Last-Modified headers to a successful response"""
+    if response.status_code in (200, 304):
+        if etag and not response.has_header('ETag'):
+            response['ETag'] = quote_etag(etag)
+        if last_modified and not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_get(validators):
+    """
+    Decorator for view GET handlers adding ETag/Last-Modified support
+
+    `validators(view, request, *args, **kwargs)` returns (etag, last_modified)
+    and must be cheap: a version counter or an aggregate over updated_at, never
+    the serialized body. When the client's copy is current the handler is not
+    called at all, so the 304 skips both serialization and transfer. Either
+    value may be None; if both are None (e.g. a stale cache entry) the handler
+    runs and validators are recomputed afterwards for the response headers.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            etag, last_modified = validators(view, request, *args, **kwargs)
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return set_validators(response, etag, last_modified)
+
+            response = handler(view, request, *args, **kwargs)
+            if etag is None and last_modified is None and response.status_code == 200:
+                etag, last_modified = validators(view, request, *args, **kwargs)
+            return set_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
+
+
+def collection_etag(queryset, field='updated_at', prefix=''):
+    """
+    ETag for a collection, from one aggregate query
+
+    Combines the row count with the latest value of `field`, so additions,
+    edits and deletions all change it. (No Last-Modified for collections: a
+    deletion does not move the latest timestamp.)
+    """
+    summary = queryset.order_by().aggregate(count=Count('pk'), latest=Max(field))
+    latest = summary['latest']
+    if hasattr(latest, 'timestamp'):
+        latest = latest.timestamp()
+    return f"{prefix}{summary['count']}-{latest or 0}"
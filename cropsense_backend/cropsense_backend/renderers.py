@@ -0,0 +1,34 @@
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard library encoder
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer using orjson when it is installed
+
+    orjson encodes dicts, lists, datetimes, UUIDs and NumPy arrays natively and
+    several times faster than json.dumps. Anything it does not know (Decimal,
+    lazy translation strings, ...) goes through DRF's encoder, so the output
+    matches JSONRenderer. Indented output (the browsable API) and installs
+    without orjson use JSONRenderer itself.
+    """
+    options = (orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        ret = orjson.dumps(data, default=encoders.JSONEncoder().default, option=self.options)
+
+        # Like JSONRenderer, escape U+2028/U+2029 so the output is valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,47 @@
+from django.core.files.storage import default_storage
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer for list endpoints, built on .values() rows
+
+    Rows come straight from the database cursor as dicts, skipping model
+    instantiation and DRF's per-field serializer machinery. Subclasses list
+    the output keys in `fields`, map keys to values() lookups where they
+    differ in `sources`, and override `to_representation` for formatting.
+    Datetimes are left as objects for the renderer to encode.
+
+    Usage mirrors a DRF serializer with many=True:
+        rows = DetectionHistorySerializer.values(queryset)
+        DetectionHistorySerializer(rows, context={'request': request}).data
+    """
+    fields = ()
+    sources = {}
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @classmethod
+    def lookups(cls):
+        return [cls.sources.get(field, field) for field in cls.fields]
+
+    @classmethod
+    def values(cls, queryset):
+        """The queryset narrowed to the lookups this serializer reads"""
+        return queryset.values(*cls.lookups())
+
+    def to_representation(self, row):
+        return {field: row[self.sources.get(field, field)] for field in self.fields}
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+    def file_url(self, name):
+        """Absolute URL of a stored file, as DRF's FileField renders it"""
+        if not name:
+            return None
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
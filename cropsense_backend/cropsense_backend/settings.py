@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+from importlib.util import find_spec
 from pathlib import Path
 from decouple import config
 
@@ -50,6 +51,13 @@ INSTALLED_APPS = [
     'calendar_app',
 ]
 
+# The community event streams and async views need an ASGI server. With
+# daphne installed (requirements.txt) and listed first, `manage.py runserver`
+# serves ASGI_APPLICATION too; in production run
+# `daphne cropsense_backend.asgi:application` (see asgi.py)
+if find_spec('daphne') is not None:
+    INSTALLED_APPS.insert(0, 'daphne')
+
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -79,6 +87,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'cropsense_backend.wsgi.application'
+ASGI_APPLICATION = 'cropsense_backend.asgi.application'
 
 
 # Database
@@ -110,6 +119,19 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: PASSWORD_HASHER hashes new passwords, the others verify
+# older hashes. A hash made by another hasher, or with other PBKDF2
+# iterations, is replaced on the user's next successful login.
+PASSWORD_HASH_ITERATIONS = config('PASSWORD_HASH_ITERATIONS', default=600000, cast=int)
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='accounts.hashers.PBKDF2PasswordHasher')
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [hasher for hasher in (
+    'accounts.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+) if hasher != PASSWORD_HASHER]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -147,12 +169,16 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Changed from IsAuthenticatedOrReadOnly
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'cropsense_backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
@@ -180,13 +206,100 @@ SIMPLE_JWT = {
     
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.RefreshSerializer',
 
     'JTI_CLAIM': 'jti',
 }
 
+# Dashboard endpoint: lifetime of the per-user cached page, days of upcoming
+# events shown, and worker threads loading its parts concurrently (0: one after
+# another in the request; only worth raising with a database server such as Postgres)
+DASHBOARD_CACHE_TTL = config('DASHBOARD_CACHE_TTL', default=60, cast=int)
+DASHBOARD_EVENT_DAYS = config('DASHBOARD_EVENT_DAYS', default=7, cast=int)
+DASHBOARD_WORKERS = config('DASHBOARD_WORKERS', default=0, cast=int)
+
+# Refresh token blacklist: per-process Bloom filter rebuild interval (s) and
+# false-positive rate (see accounts/tokens.py), and the prune_tokens batch size
+TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS = config('TOKEN_BLACKLIST_FILTER_REBUILD_SECONDS', default=600, cast=int)
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = config('TOKEN_BLACKLIST_FILTER_ERROR_RATE', default=0.01, cast=float)
+TOKEN_PRUNE_BATCH_SIZE = config('TOKEN_PRUNE_BATCH_SIZE', default=2000, cast=int)
+
+# Background account deletion (accounts/deletion.py): rows per DELETE and
+# threads removing detection images
+ACCOUNT_DELETION_BATCH_SIZE = config('ACCOUNT_DELETION_BATCH_SIZE', default=500, cast=int)
+ACCOUNT_DELETION_FILE_WORKERS = config('ACCOUNT_DELETION_FILE_WORKERS', default=8, cast=int)
+
+# Login rate limits (accounts/throttling.py), token buckets kept in each
+# process: attempts allowed in a burst and refilled per minute, per client IP
+# and per account name tried, and the most keys remembered
+LOGIN_THROTTLE_IP_BURST = config('LOGIN_THROTTLE_IP_BURST', default=20, cast=int)
+LOGIN_THROTTLE_IP_PER_MINUTE = config('LOGIN_THROTTLE_IP_PER_MINUTE', default=10, cast=float)
+LOGIN_THROTTLE_ACCOUNT_BURST = config('LOGIN_THROTTLE_ACCOUNT_BURST', default=10, cast=int)
+LOGIN_THROTTLE_ACCOUNT_PER_MINUTE = config('LOGIN_THROTTLE_ACCOUNT_PER_MINUTE', default=5, cast=float)
+LOGIN_THROTTLE_MAX_KEYS = config('LOGIN_THROTTLE_MAX_KEYS', default=100000, cast=int)
+
 #Weather API Configuration
 PIRATE_WEATHER_API_KEY = config('PIRATE_WEATHER_API_KEY', default='')
 
+# Upstream HTTP client (pooled keep-alive session used for weather and geocoding)
+WEATHER_HTTP_CONNECT_TIMEOUT = config('WEATHER_HTTP_CONNECT_TIMEOUT', default=3.05, cast=float)
+WEATHER_HTTP_READ_TIMEOUT = config('WEATHER_HTTP_READ_TIMEOUT', default=10, cast=float)
+WEATHER_HTTP_POOL_SIZE = config('WEATHER_HTTP_POOL_SIZE', default=20, cast=int)
+WEATHER_HTTP_RETRIES = config('WEATHER_HTTP_RETRIES', default=3, cast=int)
+WEATHER_HTTP_BACKOFF = config('WEATHER_HTTP_BACKOFF', default=0.5, cast=float)
+
+# Weather cache: entry lifetime and coordinate bucket size (decimal places, 2 ~ 1 km)
+WEATHER_CACHE_TTL_MINUTES = config('WEATHER_CACHE_TTL_MINUTES', default=60, cast=int)
+WEATHER_COORD_PRECISION = config('WEATHER_COORD_PRECISION', default=2, cast=int)
+
+# Shared cache. Per-process memory by default; point CACHE_BACKEND/CACHE_LOCATION at
+# a shared backend (e.g. django.core.cache.backends.redis.RedisCache) when running
+# several workers so invalidations reach all of them.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='cropsense'),
+    }
+}
+# Whether every worker sees the same cache (and so every invalidation)
+CACHE_SHARED = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Authenticated user + profile rows cached per token subject (seconds; see
+# accounts/authentication.py). With a per-process cache, a deactivation or
+# password change only drops the entry in the worker that saw it, so the
+# default there is a few seconds.
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60 if CACHE_SHARED else 5, cast=int)
+
+# Community feed cache: lifetime of cached pages/statistics and of the running
+# counters. A per-process cache misses other workers' writes, so it defaults to
+# seconds, and the feed version (the ETag) expires with it (see community/feed.py)
+COMMUNITY_CACHE_TTL = config('COMMUNITY_CACHE_TTL', default=900 if CACHE_SHARED else 10, cast=int)
+COMMUNITY_COUNTER_TTL = config('COMMUNITY_COUNTER_TTL', default=3600 if CACHE_SHARED else 10, cast=int)
+
+# Post search: at most this many matches (the newest) are ranked and returned
+COMMUNITY_SEARCH_MAX_RANKED = config('COMMUNITY_SEARCH_MAX_RANKED', default=5000, cast=int)
+
+# Community event streams (server-sent events): per-connection queue bound,
+# messages kept per topic for reconnecting clients, and heartbeat interval (s)
+COMMUNITY_STREAM_QUEUE_SIZE = config('COMMUNITY_STREAM_QUEUE_SIZE', default=100, cast=int)
+COMMUNITY_STREAM_REPLAY = config('COMMUNITY_STREAM_REPLAY', default=100, cast=int)
+COMMUNITY_STREAM_HEARTBEAT = config('COMMUNITY_STREAM_HEARTBEAT', default=15, cast=float)
+
+# Calendar: lifetime of cached recurring-event expansions (per event and date range)
+CALENDAR_OCCURRENCE_CACHE_TTL = config('CALENDAR_OCCURRENCE_CACHE_TTL', default=3600, cast=int)
+
+# Weather-aware scheduling: days ahead to check, and oldest cached forecast to use
+SCHEDULE_HORIZON_DAYS = config('SCHEDULE_HORIZON_DAYS', default=7, cast=int)
+SCHEDULE_FORECAST_MAX_AGE_HOURS = config('SCHEDULE_FORECAST_MAX_AGE_HOURS', default=24, cast=int)
+
+# Calendar .ics import: largest file and event count accepted, and insert batch size
+CALENDAR_IMPORT_MAX_BYTES = config('CALENDAR_IMPORT_MAX_BYTES', default=50 * 1024 * 1024, cast=int)
+CALENDAR_IMPORT_MAX_EVENTS = config('CALENDAR_IMPORT_MAX_EVENTS', default=100000, cast=int)
+CALENDAR_IMPORT_BATCH_SIZE = config('CALENDAR_IMPORT_BATCH_SIZE', default=1000, cast=int)
+
 #Logging Configuration
 LOGGING = {
     'version': 1,
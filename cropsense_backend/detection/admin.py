@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Disease, DetectionRecord
+from .models import Disease, DetectionRecord, DiseaseRiskScore
 # Register your models here.
 
 @admin.register(Disease)
@@ -13,3 +13,9 @@ class DetectionRecordAdmin(admin.ModelAdmin):
     lost_display = ['detected_disease', 'confidence', 'detected_at']
     list_filter = ['detected_at', 'detected_disease']
     search_fields = ['user__username', 'disease__name']
+
+@admin.register(DiseaseRiskScore)
+class DiseaseRiskScoreAdmin(admin.ModelAdmin):
+    list_display = ['location', 'score', 'level', 'computed_at']
+    list_filter = ['level']
+    search_fields = ['location__name', 'location__user__username']
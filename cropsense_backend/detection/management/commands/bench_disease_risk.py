@@ -0,0 +1,49 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from detection.risk import HORIZON_HOURS, get_scorer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark batched disease-risk scoring over synthetic forecasts for many farms'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--locations', type=int, default=50000)
+        parser.add_argument('--forecasts', type=int, default=20000,
+                            help='Distinct cached forecasts shared by the locations')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        scorer = get_scorer()
+        n_locations = options['locations']
+        n_forecasts = options['forecasts']
+
+        temperature = rng.uniform(5, 35, (n_forecasts, HORIZON_HOURS))
+        humidity = rng.uniform(0.4, 1.0, (n_forecasts, HORIZON_HOURS))
+        valid = np.ones(temperature.shape, dtype=bool)
+        forecast_index = rng.integers(0, n_forecasts, n_locations)
+        crops = rng.random((n_locations, len(scorer.crops))) < 0.2
+        detections = rng.poisson(0.5, (n_locations, len(scorer.crops))).astype(float)
+
+        self.stdout.write(
+            f"{n_locations} locations, {n_forecasts} forecasts, "
+            f"{len(scorer.models)} disease models, {len(scorer.crops)} crops"
+        )
+
+        start = time.perf_counter()
+        hours = scorer.favorable_hours(temperature, humidity, valid)
+        favorable = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores, _ = scorer.score(hours[forecast_index], crops, detections)
+        scoring = time.perf_counter() - start
+
+        self.stdout.write(f"favorable hours: {favorable * 1000:.1f} ms")
+        self.stdout.write(f"scores: {scoring * 1000:.1f} ms")
+        self.stdout.write(
+            f"{n_locations / (favorable + scoring):.0f} locations/s, "
+            f"{int((scores.max(axis=1) >= 70).sum())} high risk"
+        )
@@ -0,0 +1,115 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test.client import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from calendar_app.models import Event
+from calendar_app.serializers import EventListSerializer, EventSerializer
+from community.models import Comment, Post
+from community.serializers import PostListSerializer, PostSerializer
+from cropsense_backend.benchmark import throwaway_database
+from cropsense_backend.renderers import FastJSONRenderer
+from detection.models import DetectionRecord, Disease
+from detection.serializers import DetectionHistorySerializer, DetectionRecordSerializer, DiseaseSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark list serialization (ModelSerializer + JSONRenderer vs '
+        '.values() serializers + FastJSONRenderer) for 1,000-row pages'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=7)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            user = self.populate(options['rows'])
+            self.bench(user, options['rows'], options['repeat'])
+
+    def populate(self, rows):
+        user = User.objects.create_user('bench')
+        diseases = Disease.objects.bulk_create([
+            Disease(
+                name=f'Disease_{i}', crop_type='Tomato', description='d' * 400,
+                symptoms='s' * 600, treatment='t' * 600, prevention='p' * 600
+            )
+            for i in range(38)
+        ])
+        DetectionRecord.objects.bulk_create([
+            DetectionRecord(
+                user=user, image=f'detections/2026/10/19/{i}.jpg', detected_disease=diseases[i % 38],
+                confidence=0.9, latitude=-1.28, longitude=36.82
+            )
+            for i in range(rows)
+        ])
+        posts = Post.objects.bulk_create([
+            Post(user=user, title=f'Question {i} about maize', content='How do I treat this? ' * 10, comment_count=2)
+            for i in range(rows)
+        ])
+        Comment.objects.bulk_create([
+            Comment(post=post, user=user, content='Try copper fungicide early in the morning.')
+            for post in posts for _ in range(2)
+        ])
+        Event.objects.bulk_create([
+            Event(user=user, title='Top dress maize', description='CAN fertilizer, 50 kg/acre',
+                  date=date(2026, 1, 1) + timedelta(days=i % 365))
+            for i in range(rows)
+        ])
+        return user
+
+    def bench(self, user, rows, repeat):
+        request = RequestFactory().get('/', SERVER_NAME='localhost')
+        detections = DetectionRecord.objects.filter(user=user)
+        cases = {
+            'detection history': (
+                lambda: DetectionRecordSerializer(
+                    detections.select_related('detected_disease', 'user')[:rows], many=True, context={'request': request}
+                ).data,
+                lambda: self.slim_history(detections, rows, request),
+            ),
+            'posts': (
+                lambda: PostSerializer(
+                    Post.objects.select_related('user').prefetch_related('comments__user')[:rows], many=True
+                ).data,
+                lambda: PostListSerializer(PostListSerializer.values(Post.objects.all())[:rows]).data,
+            ),
+            'events': (
+                lambda: EventSerializer(Event.objects.filter(user=user).select_related('user')[:rows], many=True).data,
+                lambda: EventListSerializer(EventListSerializer.values(Event.objects.filter(user=user))[:rows]).data,
+            ),
+        }
+
+        for name, (model_serializer, values_serializer) in cases.items():
+            for label, serialize, renderer in (
+                ('ModelSerializer + JSONRenderer', model_serializer, JSONRenderer()),
+                ('values() + FastJSONRenderer', values_serializer, FastJSONRenderer()),
+            ):
+                serialize_times, render_times = [], []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    data = serialize()
+                    serialized = time.perf_counter()
+                    body = renderer.render(data)
+                    serialize_times.append(serialized - started)
+                    render_times.append(time.perf_counter() - serialized)
+
+                serialize_ms = statistics.median(serialize_times) * 1000
+                render_ms = statistics.median(render_times) * 1000
+                self.stdout.write(
+                    f"{name:18} {label:31} query+serialize {serialize_ms:7.1f} ms  render {render_ms:6.1f} ms  "
+                    f"total {serialize_ms + render_ms:7.1f} ms  {len(body) / 1024:7.0f} KiB"
+                )
+
+    def slim_history(self, detections, rows, request):
+        data = DetectionHistorySerializer(
+            DetectionHistorySerializer.values(detections)[:rows], context={'request': request}
+        ).data
+        disease_ids = {row['detected_disease'] for row in data}
+        diseases = DiseaseSerializer(Disease.objects.filter(id__in=disease_ids), many=True).data
+        return {'results': data, 'diseases': {str(disease['id']): disease for disease in diseases}}
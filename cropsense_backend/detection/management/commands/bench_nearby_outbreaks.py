@@ -0,0 +1,82 @@
+import statistics
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from cropsense_backend.benchmark import throwaway_database
+from detection.models import DetectionRecord, Disease
+from detection.outbreaks import nearby_outbreaks
+from weather.geo import encode_many
+
+
+class Command(BaseCommand):
+    help = 'Benchmark nearby-outbreak queries over synthetic detections in a throwaway database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--detections', type=int, default=1000000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--radius-km', type=float, default=20)
+        parser.add_argument('--days', type=int, default=14)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.populate(options['detections'], options['seed'])
+            self.bench(options)
+
+    def populate(self, count, seed):
+        rng = np.random.default_rng(seed)
+        user = User.objects.create_user('bench')
+        diseases = [
+            Disease.objects.create(name=f'Disease {i}', crop_type='Tomato', description='',
+                                   symptoms='', treatment='', prevention='')
+            for i in range(20)
+        ]
+
+        # Farms spread over East Africa, detections over the past year
+        latitudes = rng.uniform(-5, 5, count).round(5)
+        longitudes = rng.uniform(30, 42, count).round(5)
+        geohashes = encode_many(latitudes, longitudes)
+        now = datetime.now(dt_timezone.utc)
+        ages = rng.uniform(0, 365 * 86400, count)
+        disease_ids = rng.choice([disease.id for disease in diseases], count)
+
+        started = time.perf_counter()
+        table = DetectionRecord._meta.db_table
+        sql = (
+            f"INSERT INTO {table} (user_id, image, detected_disease_id, confidence, detected_at, "
+            f"latitude, longitude, geohash) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            for start in range(0, count, 10000):
+                end = min(start + 10000, count)
+                cursor.executemany(sql, [
+                    (user.id, 'bench.jpg', int(disease_ids[i]), 0.9,
+                     now - timedelta(seconds=float(ages[i])),
+                     float(latitudes[i]), float(longitudes[i]), str(geohashes[i]))
+                    for i in range(start, end)
+                ])
+        self.stdout.write(f"Inserted {count} detections in {time.perf_counter() - started:.1f}s")
+
+    def bench(self, options):
+        rng = np.random.default_rng(options['seed'] + 1)
+        timings = []
+        found = []
+        for _ in range(options['queries']):
+            latitude, longitude = rng.uniform(-4, 4), rng.uniform(31, 41)
+            started = time.perf_counter()
+            result = nearby_outbreaks(latitude, longitude, options['radius_km'], options['days'])
+            timings.append(time.perf_counter() - started)
+            found.append(result['total_detections'])
+
+        timings.sort()
+        self.stdout.write(
+            f"{options['queries']} queries, radius {options['radius_km']} km, last {options['days']} days: "
+            f"mean {statistics.mean(timings) * 1000:.2f} ms, "
+            f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.2f} ms, "
+            f"{statistics.mean(found):.0f} detections per result"
+        )
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from detection.risk import compute_risk_scores
+
+
+class Command(BaseCommand):
+    help = (
+        'Score weather-driven disease risk for every FarmLocation from cached '
+        'forecasts. Run after prefetch_weather, or with --loop.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Score rows per bulk upsert')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, rescoring every --interval seconds')
+        parser.add_argument('--interval', type=int, default=3600,
+                            help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            stats = compute_risk_scores(batch_size=options['batch_size'])
+            self.stdout.write(
+                f"Scored {stats['scored']} of {stats['locations']} locations "
+                f"({stats['skipped']} without a recent forecast, {stats['high']} high risk, "
+                f"{stats['removed']} stale scores removed) "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-19 08:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0003_weathercache_unique_city'),
+        ('detection', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiseaseRiskScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0.0)),
+                ('level', models.CharField(default='low', max_length=10)),
+                ('diseases', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField()),
+                ('location', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='disease_risk', to='weather.farmlocation')),
+            ],
+            options={
+                'ordering': ['-score'],
+            },
+        ),
+    ]
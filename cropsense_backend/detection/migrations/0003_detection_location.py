@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0002_diseaseriskscore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detectionrecord',
+            name='geohash',
+            field=models.CharField(blank=True, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='detectionrecord',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='detectionrecord',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='detectionrecord',
+            index=models.Index(fields=['geohash', 'detected_at'], name='detection_geohash_time_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from weather.geo import encode
 # Create your models here.
 
 class Disease(models.Model):
@@ -25,9 +28,40 @@ class DetectionRecord(models.Model):
     detected_disease = models.ForeignKey(Disease, on_delete=models.SET_NULL, null=True, blank=True)
     confidence = models.FloatField(default=0.0)
     detected_at = models.DateTimeField(auto_now_add=True)
+    # Optional location of the photographed plant, indexed by geohash
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True)
 
     class Meta:
         ordering = ['-detected_at']
+        indexes = [
+            # Nearby-outbreak queries: geohash prefix range, then time window
+            models.Index(fields=['geohash', 'detected_at'], name='detection_geohash_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.detected_disease.name if self.detected_disease else 'Unknown'} ({self.detected_at.strftime('%Y-%m-%d %H:%M')})"
+
+
+@receiver(pre_save, sender=DetectionRecord)
+def set_detection_geohash(sender, instance, **kwargs):
+    if instance.latitude is not None and instance.longitude is not None:
+        instance.geohash = encode(instance.latitude, instance.longitude)
+    else:
+        instance.geohash = ''
+
+
+class DiseaseRiskScore(models.Model):
+    # Latest weather-driven disease risk per farm location (see risk.compute_risk_scores)
+    location = models.OneToOneField('weather.FarmLocation', on_delete=models.CASCADE, related_name='disease_risk')
+    score = models.FloatField(default=0.0)
+    level = models.CharField(max_length=10, default='low')
+    diseases = models.JSONField(default=list)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-score']
+
+    def __str__(self):
+        return f"{self.location.name} - {self.level} ({self.score})"
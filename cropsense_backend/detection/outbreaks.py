@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Q
+from django.utils import timezone
+
+from weather.geo import covering_cells, haversine_km, prefix_range
+from .models import DetectionRecord, Disease
+
+
+def nearby_outbreaks(latitude, longitude, radius_km=20, days=14):
+    """
+    Aggregate disease detections within a radius and time window
+
+    Candidates are read with one range scan per covering geohash cell on the
+    (geohash, detected_at) index; exact distances are then computed with
+    NumPy and detections outside the circle dropped.
+
+    Args:
+        latitude (float): Center latitude
+        longitude (float): Center longitude
+        radius_km (float): Search radius in kilometres
+        days (int): Only detections from the last `days` days
+
+    Returns:
+        dict: Total detections and per-disease counts, most detected first
+    """
+    since = timezone.now() - timedelta(days=days)
+
+    cells = Q()
+    for prefix in covering_cells(latitude, longitude, radius_km):
+        low, high = prefix_range(prefix)
+        cells |= Q(geohash__gte=low, geohash__lt=high)
+
+    rows = list(DetectionRecord.objects.filter(
+        cells,
+        detected_at__gte=since,
+        latitude__isnull=False,
+        longitude__isnull=False,
+        detected_disease__isnull=False
+    ).order_by().values_list('latitude', 'longitude', 'detected_disease_id', 'detected_at'))
+
+    result = {'total_detections': 0, 'diseases': []}
+    if not rows:
+        return result
+
+    latitudes, longitudes, disease_ids, _ = zip(*rows)
+    distances = haversine_km(latitude, longitude, np.array(latitudes), np.array(longitudes))
+    inside = np.nonzero(distances <= radius_km)[0]
+    if not len(inside):
+        return result
+
+    diseases = {}
+    for i in inside.tolist():
+        disease_id, detected_at = rows[i][2], rows[i][3]
+        entry = diseases.get(disease_id)
+        if entry is None:
+            diseases[disease_id] = entry = {'count': 0, 'nearest_km': distances[i], 'last_detected': detected_at}
+        entry['count'] += 1
+        entry['nearest_km'] = min(entry['nearest_km'], distances[i])
+        entry['last_detected'] = max(entry['last_detected'], detected_at)
+
+    names = Disease.objects.in_bulk(list(diseases))
+    result['total_detections'] = len(inside)
+    result['diseases'] = sorted(
+        (
+            {
+                'disease': names[disease_id].name,
+                'crop_type': names[disease_id].crop_type,
+                'count': entry['count'],
+                'nearest_km': round(float(entry['nearest_km']), 2),
+                'last_detected': entry['last_detected'].isoformat()
+            }
+            for disease_id, entry in diseases.items() if disease_id in names
+        ),
+        key=lambda disease: (-disease['count'], disease['nearest_km'])
+    )
+    return result
@@ -0,0 +1,333 @@
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import FarmerProfile
+from weather.models import FarmLocation, WeatherCache
+from weather.geo import cell_indices, grid_width
+from weather.recommendations import stack_block
+from weather.services import coordinate_cache_key
+from .models import DetectionRecord, DiseaseRiskScore
+
+
+RISK_MODELS_PATH = os.path.join(os.path.dirname(__file__), 'risk_models.json')
+
+ANY_CROP = '*'
+UNKNOWN_CROP = ''  # Locations whose crops no model covers
+
+HORIZON_HOURS = 48  # Forecast hours scored
+FORECAST_MAX_AGE = timedelta(hours=6)  # Older cached forecasts are ignored
+DETECTION_WINDOW = timedelta(days=14)
+REGION_PRECISION = 5  # Geohash cells of ~5 km; a farm's 3x3 block of cells is "nearby"
+
+WEATHER_WEIGHT = 0.75  # The rest of the score comes from nearby detections
+PRESSURE_SCALE = 3.0  # Nearby detections for ~63% of the detection component
+LEVELS = ((70, 'high'), (40, 'moderate'), (0, 'low'))
+TOP_DISEASES = 3
+
+
+class DiseaseRiskScorer:
+    """
+    Weather-driven disease risk from per-disease infection conditions
+
+    Each model (see risk_models.json) counts the forecast hours inside its
+    temperature band at or above its humidity threshold; `hours` favorable
+    hours give the full weather score. Recent detections of the same crop in
+    the location's region raise the score. All locations are scored together
+    as (locations x models x crops) arrays.
+    """
+
+    def __init__(self, config):
+        self.models = config['models']
+        self.aliases = config.get('aliases', {})
+
+        named = sorted({crop for model in self.models for crop in model['crops']} - {ANY_CROP})
+        self.crops = named + [UNKNOWN_CROP]
+        self.crop_index = {crop: i for i, crop in enumerate(self.crops)}
+
+        self.t_min = np.array([model['temperature'][0] for model in self.models], dtype=float)
+        self.t_max = np.array([model['temperature'][1] for model in self.models], dtype=float)
+        self.humidity = np.array([model['humidity'] for model in self.models], dtype=float)
+        self.hours = np.array([model['hours'] for model in self.models], dtype=float)
+
+        self.model_crops = np.zeros((len(self.models), len(self.crops)), dtype=bool)
+        for i, model in enumerate(self.models):
+            if ANY_CROP in model['crops']:
+                self.model_crops[i] = True
+            else:
+                self.model_crops[i, [self.crop_index[crop] for crop in model['crops']]] = True
+
+    @classmethod
+    def from_file(cls, path=RISK_MODELS_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def normalize_crop(self, name):
+        """
+        Map a crop name to a known crop, or None
+
+        Handles FarmerProfile entries ("Tomatoes") and Disease.crop_type
+        values from the classifier labels ("Corn_(maize)", "Pepper,_bell").
+        """
+        name = re.split(r'[_(,]', (name or '').strip().lower())[0].strip()
+        name = self.aliases.get(name, name)
+        return name if name in self.crop_index and name != UNKNOWN_CROP else None
+
+    def crop_mask(self, primary_crops):
+        """Boolean row over self.crops for a FarmerProfile.primary_crops string"""
+        mask = np.zeros(len(self.crops), dtype=bool)
+        for name in (primary_crops or '').replace(';', ',').split(','):
+            crop = self.normalize_crop(name)
+            if crop:
+                mask[self.crop_index[crop]] = True
+        if not mask.any():
+            mask[self.crop_index[UNKNOWN_CROP]] = True
+        return mask
+
+    def favorable_hours(self, temperature, humidity, valid):
+        """
+        Args:
+            temperature (ndarray): (forecasts x hours), °C
+            humidity (ndarray): (forecasts x hours), 0-1
+            valid (ndarray): (forecasts x hours) hours to count
+
+        Returns:
+            ndarray: (forecasts x models) favorable hour counts
+        """
+        t = temperature[:, None, :]
+        favorable = (
+            (t >= self.t_min[None, :, None])
+            & (t <= self.t_max[None, :, None])
+            & (humidity[:, None, :] >= self.humidity[None, :, None])
+            & valid[:, None, :]
+        )
+        return favorable.sum(axis=2)
+
+    def score(self, hours, crops, detections):
+        """
+        Args:
+            hours (ndarray): (locations x models) favorable forecast hours
+            crops (ndarray): (locations x crops) bool, crops grown
+            detections (ndarray): (locations x crops) recent detections in the region
+
+        Returns:
+            tuple: (scores 0-100, nearby detection counts), both (locations x models)
+        """
+        applies = crops[:, None, :] & self.model_crops[None, :, :]
+        nearby = np.where(applies, detections[:, None, :], 0).max(axis=2)
+
+        weather = np.clip(hours / self.hours, 0, 1)
+        pressure = 1 - np.exp(-nearby / PRESSURE_SCALE)
+        scores = 100 * (WEATHER_WEIGHT * weather + (1 - WEATHER_WEIGHT) * pressure)
+        return np.where(applies.any(axis=2), np.round(scores, 1), 0.0), nearby
+
+
+def risk_level(score):
+    for threshold, level in LEVELS:
+        if score >= threshold:
+            return level
+    return LEVELS[-1][1]
+
+
+_scorer = None
+
+
+def get_scorer():
+    """The process-wide scorer, built from risk_models.json on first use"""
+    global _scorer
+    if _scorer is None:
+        _scorer = DiseaseRiskScorer.from_file()
+    return _scorer
+
+
+def compute_risk_scores(batch_size=1000, now=None):
+    """
+    Score every FarmLocation with coordinates and store the results
+
+    Reads the cached forecasts (see the prefetch_weather command), profile
+    crops and recent detections with a handful of queries, scores all
+    locations in one NumPy pass and upserts DiseaseRiskScore rows in
+    batches. Locations without a recent cached forecast are skipped, and
+    their earlier scores removed in the same transaction, so no score
+    outlives the forecast it was computed from.
+
+    Args:
+        batch_size (int): Rows per bulk upsert
+        now (datetime): Scoring time (defaults to now)
+
+    Returns:
+        dict: Counts of locations, scored, skipped, high-risk locations and
+        removed (stale) scores
+    """
+    now = now or timezone.now()
+    scorer = get_scorer()
+
+    locations = list(FarmLocation.objects.filter(
+        latitude__isnull=False,
+        longitude__isnull=False
+    ).values_list('id', 'user_id', 'latitude', 'longitude'))
+    if not locations:
+        removed, _ = DiseaseRiskScore.objects.all().delete()
+        return {'locations': 0, 'scored': 0, 'skipped': 0, 'high': 0, 'removed': removed}
+
+    ids, users, latitudes, longitudes = (np.array(values) for values in zip(*locations))
+
+    crops = _location_crops(scorer, users)
+    detections = _regional_detections(scorer, users, latitudes, longitudes, now)
+
+    keys = [coordinate_cache_key(lat, lon) for lat, lon in zip(latitudes.tolist(), longitudes.tolist())]
+    unique_keys, forecast_index = np.unique(keys, return_inverse=True)
+    hours, has_forecast = _forecast_hours(scorer, unique_keys.tolist(), now)
+
+    scores, nearby = scorer.score(hours[forecast_index], crops, detections)
+    scored = has_forecast[forecast_index]
+
+    top = np.argsort(-scores, axis=1)[:, :TOP_DISEASES]
+    best = scores[np.arange(len(ids)), top[:, 0]]
+    rows = []
+    for i in np.nonzero(scored)[0].tolist():
+        diseases = [
+            {
+                'disease': scorer.models[m]['name'],
+                'score': float(scores[i, m]),
+                'favorable_hours': int(hours[forecast_index[i], m]),
+                'nearby_detections': int(nearby[i, m])
+            }
+            for m in top[i].tolist() if scores[i, m] > 0
+        ]
+        rows.append(DiseaseRiskScore(
+            location_id=int(ids[i]),
+            score=float(best[i]),
+            level=risk_level(best[i]),
+            diseases=diseases,
+            computed_at=now
+        ))
+
+    with transaction.atomic():
+        DiseaseRiskScore.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['location'],
+            update_fields=['score', 'level', 'diseases', 'computed_at'],
+        )
+        # Every row written above carries this run's time; the rest belong to
+        # locations skipped now (forecast too old, coordinates removed)
+        removed, _ = DiseaseRiskScore.objects.exclude(computed_at=now).delete()
+
+    return {
+        'locations': len(ids),
+        'scored': len(rows),
+        'skipped': len(ids) - len(rows),
+        'high': sum(1 for row in rows if row.level == 'high'),
+        'removed': removed
+    }
+
+
+def _location_crops(scorer, users):
+    """(locations x crops) crops grown, from each owner's FarmerProfile"""
+    by_user = dict(FarmerProfile.objects.exclude(primary_crops='').values_list('user_id', 'primary_crops'))
+    masks = {}
+    crops = np.empty((len(users), len(scorer.crops)), dtype=bool)
+    for i, user_id in enumerate(users.tolist()):
+        primary_crops = by_user.get(user_id, '')
+        if primary_crops not in masks:
+            masks[primary_crops] = scorer.crop_mask(primary_crops)
+        crops[i] = masks[primary_crops]
+    return crops
+
+
+def _regional_detections(scorer, users, latitudes, longitudes, now):
+    """
+    (locations x crops) recent detections around each location
+
+    Detections in the location's geohash cell and the eight cells around it
+    count. Detections without coordinates count towards every farm of the
+    user who made them. The unknown crop column holds all nearby detections,
+    for locations whose crops no specific model covers.
+    """
+    rows, cols = cell_indices(latitudes, longitudes, REGION_PRECISION)
+    width = grid_width(REGION_PRECISION)
+    location_cells = rows * width + cols
+
+    user_cells = defaultdict(list)
+    for user_id, cell in zip(users.tolist(), location_cells.tolist()):
+        user_cells[user_id].append(cell)
+
+    recent = list(DetectionRecord.objects.filter(
+        detected_at__gte=now - DETECTION_WINDOW,
+        detected_disease__isnull=False
+    ).order_by().values_list('user_id', 'latitude', 'longitude', 'detected_disease__crop_type'))
+
+    unknown = scorer.crop_index[UNKNOWN_CROP]
+    crop_of = {}
+    cells, crops = [], []
+    located = [(lat, lon, crop_type) for _, lat, lon, crop_type in recent if lat is not None and lon is not None]
+    if located:
+        lats, lons, crop_types = zip(*located)
+        det_rows, det_cols = cell_indices(lats, lons, REGION_PRECISION)
+        cells.extend((det_rows * width + det_cols).tolist())
+        crops.extend(crop_types)
+    for user_id, lat, lon, crop_type in recent:
+        if lat is None or lon is None:
+            for cell in set(user_cells.get(user_id, ())):
+                cells.append(cell)
+                crops.append(crop_type)
+
+    counts = np.zeros((len(users), len(scorer.crops)))
+    if not cells:
+        return counts
+
+    for crop_type in set(crops):
+        crop = scorer.normalize_crop(crop_type)
+        crop_of[crop_type] = scorer.crop_index[crop] if crop else unknown
+    unique_cells, cell_index = np.unique(np.array(cells, dtype=np.int64), return_inverse=True)
+    crop_index = np.array([crop_of[crop_type] for crop_type in crops])
+    per_cell = np.zeros((len(unique_cells), len(scorer.crops)))
+    np.add.at(per_cell, (cell_index, crop_index), 1)
+    per_cell[:, unknown] = per_cell.sum(axis=1)
+
+    for dr in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            neighbours = (rows + dr) * width + (cols + dc)
+            found = np.searchsorted(unique_cells, neighbours).clip(max=len(unique_cells) - 1)
+            hit = unique_cells[found] == neighbours
+            counts += np.where(hit[:, None], per_cell[found], 0)
+    return counts
+
+
+def _forecast_hours(scorer, keys, now):
+    """
+    Favorable hours per model for each cached forecast in the next HORIZON_HOURS
+
+    Returns:
+        tuple: ((keys x models) hours, (keys,) True where a forecast was found)
+    """
+    # Forecasts may be up to FORECAST_MAX_AGE old, so read a few extra hours
+    limit = HORIZON_HOURS + int(FORECAST_MAX_AGE.total_seconds() // 3600) + 1
+    fields = ('time', 'temperature', 'humidity')
+
+    # Only the needed columns are extracted (by the database's JSON
+    # functions), not whole forecast documents
+    found = {}
+    for i in range(0, len(keys), 500):
+        for key, *columns in WeatherCache.objects.filter(
+            city__in=keys[i:i + 500],
+            cached_at__gte=now - FORECAST_MAX_AGE
+        ).values_list('city', *[f'weather_data__hourly__{field}' for field in fields]):
+            if columns[0]:
+                found[key] = {field: (values or [])[:limit] for field, values in zip(fields, columns)}
+
+    empty = {'time': []}
+    hourly = stack_block([{'hourly': found.get(key, empty)} for key in keys], 'hourly', fields)
+
+    start = now.timestamp()
+    valid = (hourly['time'] >= start - 3600) & (hourly['time'] < start + HORIZON_HOURS * 3600)
+    hours = scorer.favorable_hours(hourly['temperature'], hourly['humidity'], valid)
+    return hours, np.array([key in found for key in keys], dtype=bool)
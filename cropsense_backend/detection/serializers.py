@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Disease, DetectionRecord
+from cropsense_backend.serializers import ValuesSerializer
+from .models import Disease, DetectionRecord, DiseaseRiskScore
 
 class DiseaseSerializer(serializers.ModelSerializer):
     class Meta:
@@ -13,10 +14,26 @@ class DetectionRecordSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = DetectionRecord
-        fields = ['id', 'image', 'detected_disease', 'disease_details', 'username', 'confidence', 'detected_at']
-        read_only_fields = ['id', 'user', 'detected_disease', 'confidence', 'detected_at']
+        fields = ['id', 'image', 'detected_disease', 'disease_details', 'username', 'confidence', 'detected_at', 'latitude', 'longitude']
+        read_only_fields = ['id', 'user', 'detected_disease', 'confidence', 'detected_at', 'latitude', 'longitude']
+
+class DetectionHistorySerializer(ValuesSerializer):
+    """Slim history row: the disease is referenced by id, not embedded"""
+    fields = ('id', 'image', 'detected_disease', 'username', 'confidence', 'detected_at', 'latitude', 'longitude')
+    sources = {'username': 'user__username'}
+
+    def to_representation(self, row):
+        data = super().to_representation(row)
+        data['image'] = self.file_url(data['image'])
+        return data
 
 class DetectionCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = DetectionRecord
         fields = ['image']
+
+class DiseaseRiskScoreSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DiseaseRiskScore
+        fields = ['score', 'level', 'diseases', 'computed_at']
+        read_only_fields = fields
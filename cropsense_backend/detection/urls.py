@@ -5,7 +5,9 @@ from .views import (
     DetectionDetailView,
     DiseaseListView,
     DiseaseDetailView,
-    DetectionStatisticsView
+    DetectionStatisticsView,
+    DiseaseRiskView,
+    NearbyOutbreaksView
 )
 
 urlpatterns = [
@@ -19,6 +21,12 @@ urlpatterns = [
     # Statistics
     path('statistics/', DetectionStatisticsView.as_view(), name='detection-statistics'),
     
+    # Weather-driven disease risk
+    path('risk/', DiseaseRiskView.as_view(), name='disease-risk'),
+    
+    # Detections near a location
+    path('outbreaks/nearby/', NearbyOutbreaksView.as_view(), name='nearby-outbreaks'),
+    
     # Disease Database
     path('diseases/', DiseaseListView.as_view(), name='disease-list'),
     path('diseases/<int:pk>/', DiseaseDetailView.as_view(), name='disease-detail'),
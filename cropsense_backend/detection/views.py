@@ -1,12 +1,27 @@
+from django.db.models import Count, Max, Sum
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from cropsense_backend.conditional import collection_etag, conditional_get
+from weather.models import FarmLocation
 from .models import DetectionRecord as Detection, Disease
-from .serializers import DetectionRecordSerializer, DiseaseSerializer
+from .serializers import DetectionRecordSerializer, DetectionHistorySerializer, DiseaseSerializer, DiseaseRiskScoreSerializer
+from .outbreaks import nearby_outbreaks
 from .ml_model.predictor import predictor
 
 
+def parse_coordinates(latitude, longitude):
+    """Return (lat, lon) as floats, or (None, None) if missing or out of range"""
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None, None
+    return latitude, longitude
+
+
 class DiseaseDetectionView(APIView):
     """POST: Detect disease from uploaded image"""
     permission_classes = [IsAuthenticated]
@@ -24,8 +39,25 @@ class DiseaseDetectionView(APIView):
         if image_file.size > 5 * 1024 * 1024:
             return Response({'error': 'Image too large (max 5MB)'}, status=status.HTTP_400_BAD_REQUEST)
         
+        # Optional location of the plant, defaulting to the user's default farm
+        latitude, longitude = parse_coordinates(request.data.get('latitude'), request.data.get('longitude'))
+        if latitude is None:
+            default_location = FarmLocation.objects.filter(
+                user=request.user,
+                is_default=True,
+                latitude__isnull=False,
+                longitude__isnull=False
+            ).first()
+            if default_location:
+                latitude, longitude = default_location.latitude, default_location.longitude
+        
         # Create detection record
-        detection = Detection.objects.create(user=request.user, image=image_file)
+        detection = Detection.objects.create(
+            user=request.user,
+            image=image_file,
+            latitude=latitude,
+            longitude=longitude
+        )
         
         try:
             # Run ML prediction
@@ -71,12 +103,50 @@ class DiseaseDetectionView(APIView):
 
 
 class DetectionHistoryView(generics.ListAPIView):
-    """GET: List user's detection history"""
+    """
+    GET: List user's detection history
+    
+    Rows reference their disease by id; the page's diseases are included
+    once under "diseases", keyed by id.
+    """
     serializer_class = DetectionRecordSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         return Detection.objects.filter(user=self.request.user).select_related('detected_disease')
+    
+    def validators(self, request, *args, **kwargs):
+        # Count and newest id track added and deleted rows. A record's
+        # prediction (disease, confidence) is saved after the row is created,
+        # so their sums are folded in too. The disease catalog tag covers the
+        # included disease details.
+        rows = Detection.objects.filter(user=request.user).order_by().aggregate(
+            count=Count('pk'), latest=Max('id'),
+            confidence=Sum('confidence'), diseases=Sum('detected_disease_id')
+        )
+        rows = f"{rows['count']}-{rows['latest'] or 0}-{rows['confidence'] or 0}-{rows['diseases'] or 0}"
+        return f"history-{request.user.pk}-{rows}-{collection_etag(Disease.objects.all())}", None
+    
+    @conditional_get(validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    def list(self, request, *args, **kwargs):
+        rows = DetectionHistorySerializer.values(self.get_queryset())
+        page = self.paginate_queryset(rows)
+        data = DetectionHistorySerializer(page if page is not None else rows, context={'request': request}).data
+        
+        disease_ids = {row['detected_disease'] for row in data if row['detected_disease'] is not None}
+        diseases = {
+            str(disease['id']): disease
+            for disease in DiseaseSerializer(Disease.objects.filter(id__in=disease_ids), many=True).data
+        }
+        
+        if page is None:
+            return Response({'results': data, 'diseases': diseases})
+        response = self.get_paginated_response(data)
+        response.data['diseases'] = diseases
+        return response
 
 
 class DetectionDetailView(generics.RetrieveDestroyAPIView):
@@ -86,6 +156,19 @@ class DetectionDetailView(generics.RetrieveDestroyAPIView):
     
     def get_queryset(self):
         return Detection.objects.filter(user=self.request.user)
+    
+    def validators(self, request, pk):
+        rows = list(Detection.objects.filter(pk=pk, user=request.user).values_list(
+            'detected_disease__updated_at', flat=True
+        ))
+        if not rows:
+            return None, None
+        disease_updated = rows[0].timestamp() if rows[0] else 0
+        return f"detection-{pk}-{disease_updated}", None
+    
+    @conditional_get(validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
 class DiseaseListView(generics.ListAPIView):
@@ -93,6 +176,13 @@ class DiseaseListView(generics.ListAPIView):
     queryset = Disease.objects.all()
     serializer_class = DiseaseSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    
+    def validators(self, request, *args, **kwargs):
+        return f"diseases-{collection_etag(Disease.objects.all())}", None
+    
+    @conditional_get(validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
 class DiseaseDetailView(generics.RetrieveAPIView):
@@ -100,6 +190,16 @@ class DiseaseDetailView(generics.RetrieveAPIView):
     queryset = Disease.objects.all()
     serializer_class = DiseaseSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    
+    def validators(self, request, pk):
+        updated_at = Disease.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None, None
+        return f"disease-{pk}-{updated_at.timestamp()}", updated_at
+    
+    @conditional_get(validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
 class DetectionStatisticsView(APIView):
@@ -133,4 +233,90 @@ class DetectionStatisticsView(APIView):
             'most_common_diseases': [{'disease': name, 'count': count} for name, count in most_common],
             'average_confidence': avg_confidence,
             'average_confidence_percentage': f"{avg_confidence * 100:.2f}%"
-        })
\ No newline at end of file
+        })
+
+
+class DiseaseRiskView(APIView):
+    """GET: Latest disease-risk scores for the user's farm locations"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        # Scores are precomputed by the compute_disease_risk command
+        locations = FarmLocation.objects.filter(
+            user=request.user
+        ).select_related('disease_risk').order_by('-is_default', 'name')
+        
+        results = []
+        for location in locations:
+            risk = getattr(location, 'disease_risk', None)
+            results.append({
+                'location': {
+                    'id': location.id,
+                    'name': location.name,
+                    'city': location.city,
+                    'is_default': location.is_default
+                },
+                'risk': DiseaseRiskScoreSerializer(risk).data if risk else None
+            })
+        
+        return Response({'locations': results})
+
+
+class NearbyOutbreaksView(APIView):
+    """GET: Diseases detected near a point or farm location in the last days"""
+    permission_classes = [IsAuthenticated]
+    MAX_RADIUS_KM = 200
+    MAX_DAYS = 365
+    
+    def get(self, request):
+        latitude, longitude = parse_coordinates(
+            request.query_params.get('lat'),
+            request.query_params.get('lon')
+        )
+        location_id = request.query_params.get('location')
+        
+        try:
+            radius_km = float(request.query_params.get('radius_km', 20))
+            days = int(request.query_params.get('days', 14))
+            location_id = int(location_id) if location_id else None
+        except ValueError:
+            return Response(
+                {'error': 'radius_km and days must be numbers and location a location id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not (0 < radius_km <= self.MAX_RADIUS_KM and 0 < days <= self.MAX_DAYS):
+            return Response(
+                {'error': f'radius_km must be in (0, {self.MAX_RADIUS_KM}] and days in (0, {self.MAX_DAYS}]'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if latitude is None:
+            # Fall back to the given or default farm location
+            locations = FarmLocation.objects.filter(user=request.user)
+            if location_id is not None:
+                location = locations.filter(pk=location_id).first()
+            else:
+                location = locations.filter(is_default=True).first()
+            
+            if not location or location.latitude is None or location.longitude is None:
+                return Response(
+                    {'error': 'Please provide lat/lon or a farm location with coordinates'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            latitude, longitude = location.latitude, location.longitude
+        
+        try:
+            outbreaks = nearby_outbreaks(latitude, longitude, radius_km, days)
+            return Response({
+                'center': {'latitude': latitude, 'longitude': longitude},
+                'radius_km': radius_km,
+                'days': days,
+                **outbreaks
+            })
+        
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
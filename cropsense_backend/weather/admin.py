@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import WeatherCache, FarmLocation
+from .models import WeatherCache, FarmLocation, GeocodeCache, WeatherObservationBlock
 # Register your models here.
 
 @admin.register(WeatherCache)
@@ -7,6 +7,17 @@ class WeatherCacheAdmin(admin.ModelAdmin):
     list_display = ['city', 'cached_at']
     search_fields = ['city']
 
+@admin.register(GeocodeCache)
+class GeocodeCacheAdmin(admin.ModelAdmin):
+    list_display = ['query', 'latitude', 'longitude', 'created_at']
+    search_fields = ['query', 'normalized_name']
+
+@admin.register(WeatherObservationBlock)
+class WeatherObservationBlockAdmin(admin.ModelAdmin):
+    list_display = ['bucket', 'month', 'updated_at']
+    search_fields = ['bucket']
+    exclude = ['data']
+
 @admin.register(FarmLocation)
 class FarmLocationAdmin(admin.ModelAdmin):
     list_display = ['name', 'user', 'city', 'is_default', 'created_at']
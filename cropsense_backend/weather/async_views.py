@@ -0,0 +1,132 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework import status
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from accounts.authentication import CachedJWTAuthentication
+from .services import weather_service
+from .forecast import UNITS
+from .models import FarmLocation
+
+
+# DRF 3.14 views cannot be async, so these are plain Django views served by
+# the ASGI app. They return the same payloads as CurrentWeatherView and
+# WeatherForecastView without tying up a worker thread on upstream I/O.
+
+
+async def authenticate(request):
+    """Authenticate a JWT bearer token, returning the user (profile loaded, cached) or None"""
+    try:
+        result = await sync_to_async(CachedJWTAuthentication().authenticate)(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return result[0] if result else None
+
+
+def unauthorized():
+    return JsonResponse(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=status.HTTP_401_UNAUTHORIZED
+    )
+
+
+class AsyncCurrentWeatherView(View):
+    """GET: Current weather by coordinates or city (async)"""
+
+    async def get(self, request):
+        user = await authenticate(request)
+        if user is None:
+            return unauthorized()
+
+        latitude = request.GET.get('lat')
+        longitude = request.GET.get('lon')
+        city = request.GET.get('city')
+        units = request.GET.get('units', 'si')
+
+        if units not in UNITS:
+            return JsonResponse(
+                {'error': f"units must be one of: {', '.join(UNITS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        async def load_forecast():
+            if latitude and longitude:
+                return await weather_service.aget_forecast(float(latitude), float(longitude))
+            if city:
+                return await weather_service.aget_forecast_by_city(city)
+            default_location = await FarmLocation.objects.filter(
+                user=user,
+                is_default=True
+            ).afirst()
+            if not default_location:
+                return None
+            return await weather_service.aget_forecast_for_location(default_location)
+
+        try:
+            # The forecast (geocoding, cache, upstream) and the user's crops are independent
+            forecast, crops = await asyncio.gather(
+                load_forecast(),
+                sync_to_async(weather_service.get_user_crops)(user)
+            )
+            if forecast is None:
+                return JsonResponse(
+                    {'error': 'No location provided and no default location set'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            recommendations = weather_service.get_recommendations(forecast, crops)
+
+            return JsonResponse({
+                'weather': forecast.render(units),
+                'farming_recommendations': recommendations
+            })
+
+        except Exception as e:
+            return JsonResponse(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class AsyncWeatherForecastView(View):
+    """GET: Weather forecast (hourly and daily, async)"""
+
+    async def get(self, request):
+        user = await authenticate(request)
+        if user is None:
+            return unauthorized()
+
+        latitude = request.GET.get('lat')
+        longitude = request.GET.get('lon')
+        city = request.GET.get('city')
+        units = request.GET.get('units', 'si')
+
+        if units not in UNITS:
+            return JsonResponse(
+                {'error': f"units must be one of: {', '.join(UNITS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            if latitude and longitude:
+                forecast = await weather_service.aget_forecast(
+                    float(latitude),
+                    float(longitude)
+                )
+            elif city:
+                forecast = await weather_service.aget_forecast_by_city(city)
+            else:
+                return JsonResponse(
+                    {'error': 'Please provide latitude/longitude or city name'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            return JsonResponse(forecast.render(units, view='forecast'))
+
+        except Exception as e:
+            return JsonResponse(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
@@ -0,0 +1,240 @@
+import numpy as np
+from .geocoding import LRUCache
+
+
+# Pirate Weather is always queried in SI units; other unit systems are derived
+# from the stored forecast when a response is rendered.
+UNITS = ('si', 'us', 'uk', 'ca')
+
+FORMAT_VERSION = 1
+
+# Fields kept from each block of the upstream response
+CURRENT_FIELDS = (
+    'time', 'summary', 'icon', 'temperature', 'apparentTemperature', 'dewPoint',
+    'humidity', 'pressure', 'windSpeed', 'windGust', 'windBearing', 'cloudCover',
+    'uvIndex', 'visibility', 'precipProbability', 'precipIntensity', 'precipType',
+)
+HOURLY_FIELDS = (
+    'time', 'summary', 'icon', 'temperature', 'apparentTemperature', 'dewPoint',
+    'humidity', 'windSpeed', 'windGust', 'cloudCover', 'uvIndex',
+    'precipProbability', 'precipIntensity', 'precipType',
+)
+DAILY_FIELDS = (
+    'time', 'summary', 'icon', 'temperatureHigh', 'temperatureLow', 'humidity',
+    'windSpeed', 'windGust', 'uvIndex', 'precipProbability', 'precipIntensity',
+    'precipType', 'sunriseTime', 'sunsetTime',
+)
+
+# Multipliers from SI per unit system (temperature is handled separately)
+TEMPERATURE_FIELDS = {'temperature', 'apparentTemperature', 'dewPoint', 'temperatureHigh', 'temperatureLow'}
+CONVERSIONS = {
+    'us': {'windSpeed': 2.2369363, 'windGust': 2.2369363, 'visibility': 0.62137119, 'precipIntensity': 1 / 25.4},
+    'uk': {'windSpeed': 2.2369363, 'windGust': 2.2369363, 'visibility': 0.62137119},
+    'ca': {'windSpeed': 3.6, 'windGust': 3.6},
+}
+
+HOURLY_HOURS = 24  # Next 24 hours
+DAILY_DAYS = 7  # Next 7 days
+
+
+def compact_forecast(data):
+    """
+    Reduce a raw Pirate Weather response (SI units) to the stored form
+
+    Scalars are kept for the current conditions; the full hourly and daily
+    blocks are stored column-wise (one list per field) without truncation.
+
+    Args:
+        data (dict): Raw API response
+
+    Returns:
+        dict: Compact forecast
+    """
+    current = data.get('currently', {})
+    hourly = data.get('hourly', {}).get('data', [])
+    daily = data.get('daily', {}).get('data', [])
+
+    return {
+        'version': FORMAT_VERSION,
+        'location': {
+            'latitude': data.get('latitude'),
+            'longitude': data.get('longitude'),
+            'timezone': data.get('timezone', 'Unknown')
+        },
+        'currently': {field: current.get(field) for field in CURRENT_FIELDS},
+        'hourly': {field: [row.get(field) for row in hourly] for field in HOURLY_FIELDS},
+        'daily': {field: [row.get(field) for row in daily] for field in DAILY_FIELDS},
+    }
+
+
+def is_compact(weather_data):
+    return isinstance(weather_data, dict) and weather_data.get('version') == FORMAT_VERSION
+
+
+def column(block, field, units='si', limit=None, default=np.nan):
+    """
+    Return one numeric column of a forecast block as a float array in `units`
+
+    Missing values become `default`.
+    """
+    values = block.get(field) or []
+    if limit is not None:
+        values = values[:limit]
+    if not values:
+        return np.full(len(block.get('time', [])[:limit]), default, dtype=float)
+
+    array = np.array(values, dtype=float)
+    if default is not np.nan:
+        array = np.where(np.isnan(array), default, array)
+
+    if units == 'us' and field in TEMPERATURE_FIELDS:
+        array = np.round(array * 9 / 5 + 32, 2)
+    elif field in CONVERSIONS.get(units, {}):
+        array = np.round(array * CONVERSIONS[units][field], 2)
+    return array
+
+
+def _values(array):
+    """Array to list, with NaN as None"""
+    return [None if value != value else value for value in array.tolist()]
+
+
+def _times(block, limit, unit, field='time'):
+    """Unix timestamps to ISO 8601 strings (UTC) at the given resolution"""
+    seconds = column(block, field, limit=limit, default=0).astype('int64')
+    return np.datetime_as_string(seconds.astype('datetime64[s]'), unit=unit)
+
+
+def _strings(block, field, limit, default):
+    return [value if value is not None else default for value in (block.get(field) or [])[:limit]]
+
+
+def format_hourly(raw, units):
+    hourly = raw['hourly']
+    n = min(HOURLY_HOURS, len(hourly['time']))
+
+    times = np.char.replace(_times(hourly, n, 'm'), 'T', ' ')
+    temperature = _values(column(hourly, 'temperature', units, n))
+    precipitation = _values(column(hourly, 'precipProbability', limit=n, default=0) * 100)
+    icons = _strings(hourly, 'icon', n, 'unknown')
+    summaries = _strings(hourly, 'summary', n, 'N/A')
+
+    return [
+        {
+            'time': time,
+            'temperature': temp,
+            'precipitation_probability': precip,
+            'icon': icon,
+            'summary': summary
+        }
+        for time, temp, precip, icon, summary
+        in zip(times.tolist(), temperature, precipitation, icons, summaries)
+    ]
+
+
+def format_daily(raw, units):
+    daily = raw['daily']
+    n = min(DAILY_DAYS, len(daily['time']))
+
+    dates = _times(daily, n, 'D').tolist()
+    sunrise = [value[11:] for value in _times(daily, n, 'm', 'sunriseTime').tolist()]
+    sunset = [value[11:] for value in _times(daily, n, 'm', 'sunsetTime').tolist()]
+
+    columns = zip(
+        dates,
+        _strings(daily, 'summary', n, 'N/A'),
+        _strings(daily, 'icon', n, 'unknown'),
+        _values(column(daily, 'temperatureHigh', units, n)),
+        _values(column(daily, 'temperatureLow', units, n)),
+        _values(column(daily, 'precipProbability', limit=n, default=0) * 100),
+        _strings(daily, 'precipType', n, 'none'),
+        _values(column(daily, 'humidity', limit=n, default=0) * 100),
+        _values(column(daily, 'windSpeed', units, n)),
+        sunrise,
+        sunset,
+    )
+    keys = (
+        'date', 'summary', 'icon', 'temperature_high', 'temperature_low',
+        'precipitation_probability', 'precipitation_type', 'humidity',
+        'wind_speed', 'sunrise', 'sunset',
+    )
+    return [dict(zip(keys, row)) for row in columns]
+
+
+def format_current(raw, units):
+    # One-row columns so the current block goes through the same conversions
+    current = {field: [value] for field, value in raw['currently'].items()}
+
+    def value(field, default=np.nan):
+        return _values(column(current, field, units, default=default))[0]
+
+    return {
+        'time': str(_times(current, 1, 's')[0]),
+        'summary': raw['currently'].get('summary') or 'N/A',
+        'icon': raw['currently'].get('icon') or 'unknown',
+        'temperature': value('temperature'),
+        'feels_like': value('apparentTemperature'),
+        'humidity': value('humidity', 0) * 100,  # Convert to percentage
+        'pressure': value('pressure'),
+        'wind_speed': value('windSpeed'),
+        'wind_direction': value('windBearing'),
+        'cloud_cover': value('cloudCover', 0) * 100,
+        'uv_index': value('uvIndex'),
+        'visibility': value('visibility'),
+        'precipitation_probability': value('precipProbability', 0) * 100,
+        'precipitation_intensity': value('precipIntensity'),
+        'precipitation_type': raw['currently'].get('precipType') or 'none'
+    }
+
+
+class Forecast:
+    """
+    A stored forecast for one location, rendered lazily per request
+
+    Rendered views are memoized per (location, fetch time, units, view), so
+    one upstream fetch serves every unit system and both the current and
+    forecast endpoints. Rendered dicts are shared between requests and must
+    not be mutated.
+    """
+
+    _rendered = LRUCache(maxsize=1024)
+
+    def __init__(self, key, raw, cached_at):
+        self.key = key
+        self.raw = raw
+        self.cached_at = cached_at
+
+    def render(self, units='si', view='full'):
+        """
+        Args:
+            units (str): Unit system - 'si' (metric), 'us', 'uk', 'ca'
+            view (str): 'full' (location, current, forecasts) or 'forecast'
+
+        Returns:
+            dict: Formatted weather data
+        """
+        if units not in UNITS:
+            raise ValueError(f"Unsupported units: {units}")
+
+        memo_key = (self.key, self.cached_at, units, view)
+        rendered = self._rendered.get(memo_key)
+        if rendered is None:
+            rendered = self._render(units, view)
+            self._rendered.set(memo_key, rendered)
+        return rendered
+
+    def _render(self, units, view):
+        forecast = {
+            'hourly_forecast': format_hourly(self.raw, units),
+            'daily_forecast': format_daily(self.raw, units),
+        }
+        if view == 'forecast':
+            return forecast
+
+        return {
+            'location': self.raw['location'],
+            'current': format_current(self.raw, units),
+            **forecast,
+            'units': units,
+            'cached_at': self.cached_at.isoformat()
+        }
@@ -0,0 +1,139 @@
+import math
+import numpy as np
+
+
+# Geohashes give SQLite a spatial index: nearby points share a prefix, so
+# "points in this cell" is a range scan on an ordinary B-tree index.
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 7  # Stored precision, ~150 m cells
+EARTH_RADIUS_KM = 6371.0088
+
+_ALPHABET = np.array(list(BASE32))
+
+
+def _bits(precision):
+    """(latitude bits, longitude bits) of a geohash with `precision` characters"""
+    total = 5 * precision
+    return total // 2, total - total // 2
+
+
+def _cell(latitude, longitude, precision):
+    """Integer (row, column) of the cell containing a point"""
+    lat_bits, lon_bits = _bits(precision)
+    row = min(int((latitude + 90) / 180 * (1 << lat_bits)), (1 << lat_bits) - 1)
+    col = min(int((longitude + 180) / 360 * (1 << lon_bits)), (1 << lon_bits) - 1)
+    return max(row, 0), max(col, 0)
+
+
+def _interleave(row, col, precision):
+    """Geohash integer from cell indices (longitude bit first)"""
+    lat_bits, lon_bits = _bits(precision)
+    code = 0
+    for i in range(5 * precision):
+        if i % 2 == 0:
+            bit = (col >> (lon_bits - 1 - i // 2)) & 1
+        else:
+            bit = (row >> (lat_bits - 1 - i // 2)) & 1
+        code = (code << 1) | bit
+    return code
+
+
+def _to_string(code, precision):
+    return ''.join(BASE32[(code >> (5 * (precision - 1 - i))) & 31] for i in range(precision))
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Geohash of a point"""
+    row, col = _cell(latitude, longitude, precision)
+    return _to_string(_interleave(row, col, precision), precision)
+
+
+def grid_width(precision):
+    """Number of cell columns around the globe at a precision"""
+    return 1 << _bits(precision)[1]
+
+
+def cell_indices(latitudes, longitudes, precision):
+    """
+    Integer (row, column) arrays of the cells containing many points
+
+    Neighbouring cells differ by one in row or column, which makes
+    "this cell and the ones around it" simple arithmetic.
+    """
+    lat_bits, lon_bits = _bits(precision)
+    latitudes = np.asarray(latitudes, dtype=float)
+    longitudes = np.asarray(longitudes, dtype=float)
+    row = np.clip(((latitudes + 90) / 180 * (1 << lat_bits)).astype(np.int64), 0, (1 << lat_bits) - 1)
+    col = np.clip(((longitudes + 180) / 360 * (1 << lon_bits)).astype(np.int64), 0, (1 << lon_bits) - 1)
+    return row, col
+
+
+def encode_many(latitudes, longitudes, precision=PRECISION):
+    """Geohashes of many points at once (NumPy string array)"""
+    lat_bits, lon_bits = _bits(precision)
+    row, col = cell_indices(latitudes, longitudes, precision)
+
+    code = np.zeros(row.shape, dtype=np.int64)
+    for i in range(5 * precision):
+        if i % 2 == 0:
+            bit = (col >> (lon_bits - 1 - i // 2)) & 1
+        else:
+            bit = (row >> (lat_bits - 1 - i // 2)) & 1
+        code = (code << 1) | bit
+
+    chars = [_ALPHABET[(code >> (5 * (precision - 1 - i))) & 31] for i in range(precision)]
+    result = chars[0]
+    for column in chars[1:]:
+        result = np.char.add(result, column)
+    return result
+
+
+def covering_cells(latitude, longitude, radius_km, max_cells=9):
+    """
+    Geohash prefixes whose cells together cover a circle
+
+    Uses the finest precision at which the circle's bounding box spans at
+    most `max_cells` cells, so a radius query is a few index range scans.
+
+    Returns:
+        list: Geohash prefixes
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    dlon = dlat / max(math.cos(math.radians(latitude)), 1e-6)
+    lat_min, lat_max = max(latitude - dlat, -90.0), min(latitude + dlat, 90.0)
+
+    cells = ['']  # Precision 0: the whole world
+    for precision in range(1, PRECISION + 1):
+        if longitude - dlon < -180 or longitude + dlon > 180:
+            break  # Wraps around the antimeridian; keep the coarser cover
+        row_min, col_min = _cell(lat_min, longitude - dlon, precision)
+        row_max, col_max = _cell(lat_max, longitude + dlon, precision)
+
+        count = (row_max - row_min + 1) * (col_max - col_min + 1)
+        if count > max_cells:
+            break
+        cells = [
+            _to_string(_interleave(row, col, precision), precision)
+            for row in range(row_min, row_max + 1)
+            for col in range(col_min, col_max + 1)
+        ]
+    return cells
+
+
+def prefix_range(prefix):
+    """
+    [low, high) bounds matching every geohash that starts with `prefix`
+
+    A plain range comparison can always use the index, unlike LIKE on SQLite.
+    """
+    return prefix, prefix + '~'  # '~' sorts after every base32 character
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Great-circle distances (km) from one point to arrays of points"""
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(latitudes)
+    dlat = lat2 - lat1
+    dlon = np.radians(longitudes) - math.radians(longitude)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
@@ -0,0 +1,80 @@
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_city_name(city_name):
+    """
+    Normalize a city name so that equivalent spellings share one cache entry
+
+    "  Nairobi ", "nairobi" and "NAIROBI" all map to "nairobi".
+    """
+    return re.sub(r'\s+', ' ', (city_name or '').strip()).casefold()
+
+
+class LRUCache:
+    """Small thread-safe in-memory LRU cache"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls at least `min_interval` seconds apart
+
+    Callers reserve a slot under the lock and sleep outside of it, so
+    concurrent threads queue up behind each other instead of bursting.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Reserve the next slot and return how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        return slot - now
+
+    def wait(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
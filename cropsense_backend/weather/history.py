@@ -0,0 +1,199 @@
+import calendar
+from datetime import date, datetime, timezone as dt_timezone
+
+import numpy as np
+
+from .models import WeatherObservationBlock
+
+
+# Observed conditions kept per hour. A block holds one float32 column per
+# field for every hour of a calendar month (UTC); missing hours are NaN.
+HISTORY_FIELDS = (
+    'temperature', 'apparentTemperature', 'dewPoint', 'humidity', 'pressure',
+    'windSpeed', 'windGust', 'cloudCover', 'uvIndex', 'precipProbability',
+    'precipIntensity',
+)
+RESOLUTIONS = ('hour', 'day', 'week', 'month')
+SUM_FIELDS = {'precipIntensity'}  # mm/h summed over hours gives mm; the rest are averaged
+
+
+def month_start(moment):
+    return date(moment.year, moment.month, 1)
+
+
+def hours_in_month(month):
+    return calendar.monthrange(month.year, month.month)[1] * 24
+
+
+def _timestamp(month):
+    return calendar.timegm(month.timetuple())
+
+
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def unpack(block):
+    """{field: float32 array over the block's hours} for a stored block"""
+    fields = block.fields.split(',')
+    columns = np.frombuffer(bytes(block.data), dtype='<f4').reshape(len(fields), -1)
+    return dict(zip(fields, columns))
+
+
+def pack(columns, hours):
+    """Pack {field: array} into a block's bytes, in HISTORY_FIELDS order"""
+    data = np.full((len(HISTORY_FIELDS), hours), np.nan, dtype='<f4')
+    for i, field in enumerate(HISTORY_FIELDS):
+        if field in columns:
+            data[i] = columns[field]
+    return data.tobytes()
+
+
+def append_observations(forecasts):
+    """
+    Record the current conditions of freshly fetched forecasts
+
+    Each observation is written into its hour slot of the month block for
+    its bucket, so refetching within the same hour overwrites rather than
+    duplicates. Blocks are read with one query and written back with one
+    bulk upsert.
+
+    Args:
+        forecasts (dict): {bucket cache key: compact forecast}
+    """
+    observations = {}
+    for bucket, raw in forecasts.items():
+        current = raw.get('currently') or {}
+        if current.get('time') is None:
+            continue
+        moment = datetime.fromtimestamp(current['time'], tz=dt_timezone.utc)
+        month = month_start(moment)
+        hour = (int(current['time']) - _timestamp(month)) // 3600
+        observations[(bucket, month)] = (hour, current)
+
+    if not observations:
+        return
+
+    existing = {
+        (block.bucket, block.month): block
+        for block in WeatherObservationBlock.objects.filter(
+            bucket__in={bucket for bucket, _ in observations},
+            month__in={month for _, month in observations}
+        )
+    }
+
+    blocks = []
+    for (bucket, month), (hour, current) in observations.items():
+        hours = hours_in_month(month)
+        block = existing.get((bucket, month))
+        columns = {field: values.copy() for field, values in unpack(block).items()} if block else {}
+        for field in HISTORY_FIELDS:
+            column = columns.setdefault(field, np.full(hours, np.nan, dtype='<f4'))
+            value = current.get(field)
+            column[hour] = np.nan if value is None else value
+        blocks.append(WeatherObservationBlock(
+            bucket=bucket,
+            month=month,
+            fields=','.join(HISTORY_FIELDS),
+            data=pack(columns, hours)
+        ))
+
+    WeatherObservationBlock.objects.bulk_create(
+        blocks,
+        update_conflicts=True,
+        unique_fields=['bucket', 'month'],
+        update_fields=['fields', 'data', 'updated_at'],
+    )
+
+
+def load_range(bucket, start, end, fields=HISTORY_FIELDS):
+    """
+    Hourly observations for a bucket between two datetimes
+
+    All months in the range are read with one query.
+
+    Args:
+        bucket (str): Coordinate cache key (see services.coordinate_cache_key)
+        start (datetime): Start, inclusive (aware)
+        end (datetime): End, exclusive (aware)
+        fields (tuple): Fields to return
+
+    Returns:
+        tuple: (datetime64[h] times, {field: float32 array}), NaN where missing
+    """
+    first, last = month_start(start.astimezone(dt_timezone.utc)), month_start(end.astimezone(dt_timezone.utc))
+    blocks = {
+        block.month: unpack(block)
+        for block in WeatherObservationBlock.objects.filter(
+            bucket=bucket,
+            month__gte=first,
+            month__lte=last
+        )
+    }
+
+    parts = {field: [] for field in fields}
+    month = first
+    while month <= last:
+        hours = hours_in_month(month)
+        columns = blocks.get(month, {})
+        for field in fields:
+            parts[field].append(columns.get(field, np.full(hours, np.nan, dtype='<f4')))
+        month = _next_month(month)
+
+    origin = _timestamp(first)
+    offset = max((int(start.timestamp()) - origin + 3599) // 3600, 0)
+    stop = max((int(end.timestamp()) - origin + 3599) // 3600, offset)
+    values = {field: np.concatenate(parts[field])[offset:stop] for field in fields}
+    times = np.datetime64(origin, 's').astype('datetime64[h]') + np.arange(offset, stop)
+    return times, values
+
+
+def downsample(times, values, resolution='day'):
+    """
+    Aggregate hourly observations to a coarser resolution
+
+    Precipitation is summed, other fields averaged, ignoring missing hours;
+    temperature also gets min and max. Periods with no data are NaN.
+
+    Args:
+        times (ndarray): datetime64[h] times from load_range
+        values (dict): {field: array} from load_range
+        resolution (str): 'hour', 'day', 'week' or 'month'
+
+    Returns:
+        tuple: (period start times, {name: float array})
+    """
+    if resolution == 'hour' or not len(times):
+        return times, {field: column.astype(float) for field, column in values.items()}
+
+    if resolution == 'week':
+        # Weeks starting on Monday (the epoch, 1970-01-01, was a Thursday)
+        days = times.astype('datetime64[D]').astype(np.int64)
+        weeks, index = np.unique((days + 3) // 7, return_inverse=True)
+        starts = (weeks * 7 - 3).astype('datetime64[D]')
+    else:
+        unit = 'D' if resolution == 'day' else 'M'
+        starts, index = np.unique(times.astype(f'datetime64[{unit}]'), return_inverse=True)
+    n = len(starts)
+
+    result = {}
+    for field, column in values.items():
+        column = column.astype(float)
+        present = ~np.isnan(column)
+        count = np.bincount(index, weights=present, minlength=n)
+        total = np.bincount(index, weights=np.where(present, column, 0), minlength=n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if field in SUM_FIELDS:
+                result[field] = np.where(count > 0, total, np.nan)
+            else:
+                result[field] = np.where(count > 0, total / count, np.nan)
+
+        if field == 'temperature':
+            low = np.full(n, np.inf)
+            high = np.full(n, -np.inf)
+            np.minimum.at(low, index[present], column[present])
+            np.maximum.at(high, index[present], column[present])
+            result['temperature_min'] = np.where(count > 0, low, np.nan)
+            result['temperature_max'] = np.where(count > 0, high, np.nan)
+
+    return starts, result
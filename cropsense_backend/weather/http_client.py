@@ -0,0 +1,88 @@
+import asyncio
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+
+try:
+    import httpx
+except ImportError:  # Optional: only needed by the async weather views
+    httpx = None
+
+
+USER_AGENT = 'CropSense-AI/1.0'  # Required by Nominatim
+
+# Only idempotent GETs are retried, on connection errors and these statuses
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def get_timeout(read_timeout=None):
+    """Return a (connect, read) timeout tuple from settings"""
+    return (
+        getattr(settings, 'WEATHER_HTTP_CONNECT_TIMEOUT', 3.05),
+        read_timeout or getattr(settings, 'WEATHER_HTTP_READ_TIMEOUT', 10),
+    )
+
+
+def build_session():
+    """
+    Build a pooled keep-alive session for upstream weather/geocoding calls
+
+    Connections are reused across requests (and threads), so only the
+    first call to a host pays for the TCP and TLS handshakes.
+    """
+    pool_size = getattr(settings, 'WEATHER_HTTP_POOL_SIZE', 20)
+    retry = Retry(
+        total=getattr(settings, 'WEATHER_HTTP_RETRIES', 3),
+        backoff_factor=getattr(settings, 'WEATHER_HTTP_BACKOFF', 0.5),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,  # api.pirateweather.net, nominatim, spare
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Return the pooled httpx.AsyncClient for the running event loop
+
+    Clients are bound to the loop they were created on, so one is kept per
+    loop. Returns None when httpx is not installed.
+    """
+    if httpx is None:
+        return None
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        connect_timeout, read_timeout = get_timeout()
+        pool_size = getattr(settings, 'WEATHER_HTTP_POOL_SIZE', 20)
+        client = httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            # Pool limits belong on the transport when one is passed explicitly;
+            # httpx only retries failed connection attempts
+            transport=httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                ),
+                retries=getattr(settings, 'WEATHER_HTTP_RETRIES', 3),
+            ),
+        )
+        _async_clients[loop] = client
+    return client
@@ -0,0 +1,107 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from weather.forecast import DAILY_FIELDS, FORMAT_VERSION, HOURLY_FIELDS
+from weather.recommendations import get_engine
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the recommendation rule engine over synthetic forecasts for many farms'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farms', type=int, default=10000, help='Number of synthetic farm forecasts')
+        parser.add_argument('--hours', type=int, default=168, help='Hourly steps per forecast')
+        parser.add_argument('--days', type=int, default=8, help='Daily steps per forecast')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        engine = get_engine()
+        crop_names = [name for name in engine.crops if name != 'default']
+
+        forecasts = [
+            self._forecast(rng, options['hours'], options['days'])
+            for _ in range(options['farms'])
+        ]
+        crops = [rng.sample(crop_names, rng.randint(1, 3)) for _ in forecasts]
+        rows = sum(len(names) for names in crops)
+
+        self.stdout.write(
+            f"{len(forecasts)} farms, {rows} (farm, crop) rows, "
+            f"{options['hours']} hours / {options['days']} days each"
+        )
+
+        start = time.perf_counter()
+        single = [engine.evaluate([forecast], [names])[0]
+                  for forecast, names in zip(forecasts[:500], crops[:500])]
+        per_farm = (time.perf_counter() - start) / len(single)
+        self.stdout.write(f"one farm per call: {per_farm * 1000:.3f} ms/farm")
+
+        start = time.perf_counter()
+        results = engine.evaluate(forecasts, crops)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"batched: {elapsed:.2f} s total, {elapsed / len(forecasts) * 1000:.3f} ms/farm, "
+            f"{len(forecasts) / elapsed:.0f} farms/s"
+        )
+
+        if results[:len(single)] != single:
+            self.stderr.write("Batched results differ from per-farm results")
+        triggered = sum(1 for result in results if result['precautions'])
+        self.stdout.write(f"{triggered} farms with precautions")
+
+    def _forecast(self, rng, hours, days):
+        start = 1700000000 - 1700000000 % 86400
+        base = rng.uniform(0, 30)
+        hourly = {field: [] for field in HOURLY_FIELDS}
+        for hour in range(hours):
+            values = {
+                'time': start + hour * 3600,
+                'temperature': base + 8 * rng.uniform(-1, 1),
+                'apparentTemperature': base,
+                'dewPoint': base - 5,
+                'humidity': rng.random(),
+                'windSpeed': rng.uniform(0, 9),
+                'windGust': rng.uniform(0, 14),
+                'cloudCover': rng.random(),
+                'uvIndex': rng.randint(0, 11),
+                'precipProbability': rng.random() ** 2,
+                'precipIntensity': rng.uniform(0, 3),
+                'summary': 'Synthetic',
+                'icon': 'cloudy',
+                'precipType': 'rain',
+            }
+            for field in HOURLY_FIELDS:
+                hourly[field].append(values[field])
+
+        daily = {field: [] for field in DAILY_FIELDS}
+        for day in range(days):
+            time_ = start + day * 86400
+            values = {
+                'time': time_,
+                'temperatureHigh': base + 6,
+                'temperatureLow': base - 6,
+                'humidity': rng.random(),
+                'windSpeed': rng.uniform(0, 9),
+                'windGust': rng.uniform(0, 14),
+                'uvIndex': rng.randint(0, 11),
+                'precipProbability': rng.random(),
+                'precipIntensity': rng.uniform(0, 3),
+                'sunriseTime': time_ + 6 * 3600,
+                'sunsetTime': time_ + 18 * 3600,
+                'summary': 'Synthetic',
+                'icon': 'cloudy',
+                'precipType': 'rain',
+            }
+            for field in DAILY_FIELDS:
+                daily[field].append(values[field])
+
+        return {
+            'version': FORMAT_VERSION,
+            'location': {'latitude': 0.0, 'longitude': 0.0, 'timezone': 'UTC'},
+            'currently': {},
+            'hourly': hourly,
+            'daily': daily,
+        }
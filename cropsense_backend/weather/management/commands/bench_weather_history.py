@@ -0,0 +1,85 @@
+import statistics
+import time
+from datetime import date, datetime, timezone as dt_timezone
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from cropsense_backend.benchmark import throwaway_database
+from weather.history import HISTORY_FIELDS, downsample, hours_in_month, load_range, pack
+from weather.models import WeatherCache, WeatherObservationBlock
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark loading a season of hourly history from packed monthly blocks '
+        'against one JSON row per hour, in a throwaway database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buckets', type=int, default=20)
+        parser.add_argument('--months', type=int, default=6)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            self.populate(options['buckets'], options['months'])
+            self.bench(options)
+
+    def months(self, count):
+        return [date(2025, month, 1) for month in range(1, count + 1)]
+
+    def populate(self, buckets, months):
+        rng = np.random.default_rng(0)
+        blocks, rows = [], []
+        for b in range(buckets):
+            bucket = f"{b}.0,36.0"
+            for month in self.months(months):
+                hours = hours_in_month(month)
+                columns = {field: rng.uniform(0, 30, hours).astype('<f4') for field in HISTORY_FIELDS}
+                blocks.append(WeatherObservationBlock(
+                    bucket=bucket, month=month, fields=','.join(HISTORY_FIELDS), data=pack(columns, hours)
+                ))
+                # Baseline: the same observations as one JSON document per hour
+                start = int(datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).timestamp())
+                for hour in range(hours):
+                    rows.append(WeatherCache(
+                        city=f"{bucket}@{start + hour * 3600}",
+                        weather_data={'time': start + hour * 3600,
+                                      **{field: float(columns[field][hour]) for field in HISTORY_FIELDS}}
+                    ))
+        WeatherObservationBlock.objects.bulk_create(blocks, batch_size=500)
+        WeatherCache.objects.bulk_create(rows, batch_size=2000)
+        self.stdout.write(f"{len(blocks)} monthly blocks, {len(rows)} hourly JSON rows")
+
+    def bench(self, options):
+        months = self.months(options['months'])
+        start = datetime(months[0].year, months[0].month, 1, tzinfo=dt_timezone.utc)
+        last = months[-1]
+        end = datetime(last.year + last.month // 12, last.month % 12 + 1, 1, tzinfo=dt_timezone.utc)
+        bucket = "0.0,36.0"
+
+        def blocks():
+            return load_range(bucket, start, end)
+
+        def json_rows():
+            # A key range rather than LIKE, so the unique index on city is used
+            rows = WeatherCache.objects.filter(
+                city__gte=f"{bucket}@",
+                city__lt=f"{bucket}A"
+            ).values_list('weather_data', flat=True)
+            data = sorted(rows, key=lambda row: row['time'])
+            return {field: np.array([row[field] for row in data], dtype='<f4') for field in HISTORY_FIELDS}
+
+        def blocks_daily():
+            return downsample(*load_range(bucket, start, end), 'day')
+
+        for name, load in (('packed monthly blocks', blocks),
+                           ('packed blocks + daily downsample', blocks_daily),
+                           ('one JSON row per hour', json_rows)):
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                load()
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(f"{name:34} mean {statistics.mean(timings) * 1000:8.2f} ms")
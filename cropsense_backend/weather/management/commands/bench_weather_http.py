@@ -0,0 +1,86 @@
+import asyncio
+import statistics
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from weather.http_client import build_session, get_async_client, get_timeout
+from weather.management.stub_upstream import StubUpstreamServer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-call latency of upstream weather requests with and without connection pooling'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=500, help='Requests per client')
+        parser.add_argument('--url', help='Benchmark against this URL instead of a local stub server')
+
+    def handle(self, *args, **options):
+        calls = options['calls']
+        server = None
+        url = options['url']
+
+        if not url:
+            server = StubUpstreamServer().start()
+            url = f"{server.url}/forecast/key/1.0,2.0"
+
+        self.stdout.write(f"Benchmarking {calls} calls against {url}")
+
+        try:
+            results = [
+                ('requests.get (new connection per call)', self._bench_sync(
+                    lambda: requests.get(url, timeout=get_timeout()), calls)),
+            ]
+
+            session = build_session()
+            results.append(('pooled session (keep-alive)', self._bench_sync(
+                lambda: session.get(url, timeout=get_timeout()), calls)))
+            session.close()
+
+            async_timings = asyncio.run(self._bench_async(url, calls))
+            if async_timings is not None:
+                results.append(('pooled httpx.AsyncClient', async_timings))
+            else:
+                self.stdout.write("httpx not installed, skipping async client")
+        finally:
+            if server:
+                server.stop()
+
+        for name, timings in results:
+            self._report(name, timings)
+
+    def _bench_sync(self, fetch, calls):
+        timings = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            response = fetch()
+            response.raise_for_status()
+            response.json()
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    async def _bench_async(self, url, calls):
+        client = get_async_client()
+        if client is None:
+            return None
+
+        timings = []
+        try:
+            for _ in range(calls):
+                start = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                response.json()
+                timings.append(time.perf_counter() - start)
+        finally:
+            await client.aclose()
+        return timings
+
+    def _report(self, name, timings):
+        timings = sorted(t * 1000 for t in timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f"{name:42} mean {statistics.mean(timings):7.3f} ms  "
+            f"p50 {statistics.median(timings):7.3f} ms  p95 {p95:7.3f} ms"
+        )
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from weather.management.stub_upstream import StubUpstreamServer
+from weather.services import PirateWeatherService
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare how many concurrent slow upstream weather requests one worker '
+        'can hold with the sync service versus the async service'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Concurrent client requests')
+        parser.add_argument('--delay', type=float, default=1.0,
+                            help='Simulated upstream latency in seconds')
+        parser.add_argument('--threads', type=int, default=1,
+                            help='Threads in the sync worker (1 = classic sync worker)')
+        parser.add_argument('--pool-size', type=int, default=None,
+                            help='Override WEATHER_HTTP_POOL_SIZE (caps async concurrency)')
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        pool_size = options['pool_size'] or max(total, options['threads'])
+
+        # Per-request INFO logging would dominate the measurement
+        logging.getLogger('weather').setLevel(logging.WARNING)
+
+        server = StubUpstreamServer(delay=options['delay']).start()
+        try:
+            with override_settings(WEATHER_HTTP_POOL_SIZE=pool_size):
+                service = PirateWeatherService()
+                service.BASE_URL = f"{server.url}/forecast"
+
+                self.stdout.write(
+                    f"{total} requests, upstream latency {options['delay']}s, "
+                    f"pool size {pool_size}"
+                )
+
+                elapsed = self.run_sync(service, total, options['threads'])
+                self.report(f"sync worker ({options['threads']} thread(s))", total, elapsed, server.peak)
+
+                server.reset_peak()
+                elapsed = asyncio.run(self.run_async(service, total))
+                self.report("async worker (1 event loop)", total, elapsed, server.peak)
+        finally:
+            server.stop()
+
+    def run_sync(self, service, total, threads):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda i: service.fetch_forecast(i % 90, 0), range(total)))
+        return time.perf_counter() - started
+
+    async def run_async(self, service, total):
+        started = time.perf_counter()
+        await asyncio.gather(*(service.afetch_forecast(i % 90, 0) for i in range(total)))
+        return time.perf_counter() - started
+
+    def report(self, name, total, elapsed, peak):
+        self.stdout.write(
+            f"{name:32} {elapsed:7.2f}s total  {total / elapsed:8.1f} req/s  "
+            f"peak in-flight upstream requests: {peak}"
+        )
@@ -0,0 +1,137 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.db.models import BooleanField, Case, F, Value, When
+from django.utils import timezone
+
+from weather.geocoding import RateLimiter
+from weather.models import FarmLocation, WeatherCache
+from weather.services import bucket_coordinates, coordinate_cache_key, weather_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Prefetch forecasts for every FarmLocation into WeatherCache so '
+        'dashboard requests hit a warm cache. Run hourly, or with --loop.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent upstream requests')
+        parser.add_argument('--rate', type=float, default=5.0,
+                            help='Maximum upstream requests per second')
+        parser.add_argument('--refresh-after', type=int, default=45,
+                            help='Refetch cache entries older than this many minutes')
+        parser.add_argument('--active-days', type=int, default=30,
+                            help='Users who logged in within this many days are fetched first')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Cache rows per bulk upsert')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, prefetching every --interval seconds')
+        parser.add_argument('--interval', type=int, default=900,
+                            help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        if options['rate'] <= 0:
+            raise CommandError('--rate must be greater than 0')
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        while True:
+            started = time.monotonic()
+            try:
+                self.prefetch(options)
+                self.stdout.write(f"Prefetch finished in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                if not options['loop']:
+                    raise
+                # One failed run (database or upstream outage) must not end the loop
+                self.stderr.write(f"Prefetch failed after {time.monotonic() - started:.1f}s: {str(e)}")
+                close_old_connections()
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def prefetch(self, options):
+        buckets = self.collect_buckets(options['active_days'])
+
+        # Skip buckets that are still fresh enough
+        fresh_since = timezone.now() - timedelta(minutes=options['refresh_after'])
+        keys = list(buckets)
+        fresh = set()
+        for i in range(0, len(keys), 500):
+            fresh.update(WeatherCache.objects.filter(
+                city__in=keys[i:i + 500],
+                cached_at__gte=fresh_since
+            ).values_list('city', flat=True))
+
+        todo = [(key, coords) for key, coords in buckets.items() if key not in fresh]
+        self.stdout.write(
+            f"{len(buckets)} unique locations, {len(fresh)} fresh, {len(todo)} to fetch"
+        )
+
+        limiter = RateLimiter(min_interval=1.0 / options['rate'])
+        pending = {}
+        fetched = failed = 0
+
+        # Jobs are submitted in priority order and the pool picks them up FIFO
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {
+                pool.submit(self.fetch, limiter, *coords): key
+                for key, coords in todo
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    pending[key] = future.result()
+                    fetched += 1
+                except Exception as e:
+                    self.stderr.write(f"Failed to prefetch {key}: {str(e)}")
+                    failed += 1
+
+                if len(pending) >= options['batch_size']:
+                    weather_service.store_many(pending)
+                    pending = {}
+
+        weather_service.store_many(pending)
+        self.stdout.write(f"Fetched {fetched} forecasts, {failed} failed")
+
+    def collect_buckets(self, active_days):
+        """
+        Return {cache_key: (lat, lon)} for all farm locations, highest priority first
+
+        Default locations come first, then locations of recently active users,
+        most recent login first. Locations without coordinates are geocoded
+        (and stored) on the way.
+        """
+        active_since = timezone.now() - timedelta(days=active_days)
+        locations = FarmLocation.objects.annotate(
+            recently_active=Case(
+                When(user__last_login__gte=active_since, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+        ).order_by(
+            '-is_default',
+            '-recently_active',
+            F('user__last_login').desc(nulls_last=True),
+        ).only('id', 'city', 'latitude', 'longitude')
+
+        buckets = {}
+        for location in locations:
+            if location.latitude is None or location.longitude is None:
+                if not location.city or not weather_service.geocode_location(location):
+                    continue
+
+            key = coordinate_cache_key(location.latitude, location.longitude)
+            if key not in buckets:
+                buckets[key] = bucket_coordinates(location.latitude, location.longitude)
+        return buckets
+
+    def fetch(self, limiter, latitude, longitude):
+        limiter.wait()
+        return weather_service.fetch_forecast(latitude, longitude)
@@ -0,0 +1,73 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+FORECAST_BODY = json.dumps({
+    'latitude': 0.0,
+    'longitude': 0.0,
+    'timezone': 'UTC',
+    'currently': {'time': 0, 'temperature': 21.0, 'humidity': 0.5},
+    'hourly': {'data': []},
+    'daily': {'data': []},
+}).encode()
+
+
+class StubUpstreamServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the Pirate Weather API used by the benchmark commands
+
+    Every GET gets a small forecast-shaped JSON body after `delay` seconds.
+    The server records the peak number of requests it was handling at once.
+    """
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, delay=0.0):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def reset_peak(self):
+        with self._lock:
+            self.peak = self.active
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Needed for keep-alive
+    disable_nagle_algorithm = True  # Avoid delayed-ACK stalls on reused sockets
+
+    def do_GET(self):
+        server = self.server
+        with server._lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            if server.delay:
+                time.sleep(server.delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(FORECAST_BODY)))
+            self.end_headers()
+            self.wfile.write(FORECAST_BODY)
+        finally:
+            with server._lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
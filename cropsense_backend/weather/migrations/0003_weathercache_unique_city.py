@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 08:22
+
+from django.db import migrations, models
+
+
+def remove_duplicate_cache_entries(apps, schema_editor):
+    # Keep only the newest entry per key before adding the unique constraint
+    WeatherCache = apps.get_model('weather', 'WeatherCache')
+    seen = set()
+    stale_ids = []
+    for entry in WeatherCache.objects.order_by('city', '-cached_at').values('id', 'city'):
+        if entry['city'] in seen:
+            stale_ids.append(entry['id'])
+        else:
+            seen.add(entry['city'])
+    WeatherCache.objects.filter(id__in=stale_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0002_geocodecache'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_cache_entries, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='weathercache',
+            name='city',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
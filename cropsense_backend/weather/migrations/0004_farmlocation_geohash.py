@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 08:47
+
+from django.db import migrations, models
+from weather.geo import encode
+
+
+def backfill_geohashes(apps, schema_editor):
+    FarmLocation = apps.get_model('weather', 'FarmLocation')
+    locations = FarmLocation.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    batch = []
+    for location in list(locations.only('id', 'latitude', 'longitude')):
+        location.geohash = encode(location.latitude, location.longitude)
+        batch.append(location)
+        if len(batch) >= 1000:
+            FarmLocation.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    FarmLocation.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0003_weathercache_unique_city'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='farmlocation',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, max_length=12),
+        ),
+        migrations.RunPython(backfill_geohashes, migrations.RunPython.noop),
+    ]
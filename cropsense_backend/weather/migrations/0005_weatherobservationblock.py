@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-19 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0004_farmlocation_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherObservationBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(max_length=100)),
+                ('month', models.DateField()),
+                ('fields', models.CharField(max_length=255)),
+                ('data', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('bucket', 'month')},
+            },
+        ),
+    ]
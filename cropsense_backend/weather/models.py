@@ -1,22 +1,61 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from .geo import encode
 
 class WeatherCache(models.Model):
-    city = models.CharField(max_length=100)
+    # Keyed by city name or by bucketed "lat,lon" (see services.coordinate_cache_key)
+    city = models.CharField(max_length=100, unique=True)
     weather_data = models.JSONField()
     cached_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.city} - {self.cached_at}"
 
+class WeatherObservationBlock(models.Model):
+    # One month of hourly observations for a coordinate bucket, stored as
+    # packed float32 columns (see history.py)
+    bucket = models.CharField(max_length=100)
+    month = models.DateField()  # First day of the month (UTC)
+    fields = models.CharField(max_length=255)  # Comma-separated column order
+    data = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['bucket', 'month']
+
+    def __str__(self):
+        return f"{self.bucket} - {self.month:%Y-%m}"
+
+class GeocodeCache(models.Model):
+    # Persistent city -> coordinates lookup, keyed by normalized city name
+    query = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, unique=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.query} ({self.latitude}, {self.longitude})"
+
 class FarmLocation(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='farm_locations')
     name = models.CharField(max_length=100)
     city = models.CharField(max_length=100, blank=True)
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True)  # See geo.py
     is_default = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.name} - {self.city}"
\ No newline at end of file
+        return f"{self.name} - {self.city}"
+
+# Keep the spatial index key in step with the coordinates
+@receiver(pre_save, sender=FarmLocation)
+def set_location_geohash(sender, instance, **kwargs):
+    if instance.latitude is not None and instance.longitude is not None:
+        instance.geohash = encode(instance.latitude, instance.longitude)
+    else:
+        instance.geohash = ''
\ No newline at end of file
@@ -0,0 +1,267 @@
+import json
+import os
+import numpy as np
+from .forecast import HOURLY_FIELDS, DAILY_FIELDS
+
+
+RULES_PATH = os.path.join(os.path.dirname(__file__), 'rules.json')
+
+CATEGORIES = ('irrigation', 'precautions', 'best_activities')
+TEXT_FIELDS = ('summary', 'icon', 'precipType')
+MAX_WINDOWS = 3  # Per window type
+
+_COMPARISONS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+
+class Condition:
+    """One `[field, op, operand]` test, compiled to a NumPy comparison"""
+
+    def __init__(self, spec):
+        self.field, self.op, operand = spec
+        if self.op == 'between':
+            self.operands = list(operand)
+        elif self.op in _COMPARISONS:
+            self.operands = [operand]
+        else:
+            raise ValueError(f"Unknown operator in rule condition: {self.op}")
+
+    def evaluate(self, arrays, params):
+        values = arrays[self.field]
+        bounds = [self._resolve(operand, params) for operand in self.operands]
+        # NaN (missing data) compares False, so gaps never trigger a rule
+        if self.op == 'between':
+            return (values >= bounds[0]) & (values <= bounds[1])
+        return _COMPARISONS[self.op](values, bounds[0])
+
+    @staticmethod
+    def _resolve(operand, params):
+        if isinstance(operand, str) and operand.startswith('crop.'):
+            return params[operand[5:]][:, None]  # One threshold per row
+        return operand
+
+
+def _mask(conditions, arrays, params):
+    mask = conditions[0].evaluate(arrays, params)
+    for condition in conditions[1:]:
+        mask = mask & condition.evaluate(arrays, params)
+    return mask
+
+
+class Rule:
+    def __init__(self, spec):
+        self.id = spec['id']
+        self.block = spec.get('block', 'hourly')
+        self.horizon = spec.get('horizon')
+        self.match = spec.get('match', 'any')
+        self.min_count = spec.get('min_count', 1)
+        self.daylight = spec.get('daylight', False)
+        self.conditions = [Condition(condition) for condition in spec['when']]
+        self.actions = spec['actions']
+
+    def evaluate(self, arrays, params):
+        """
+        Returns:
+            tuple: (triggered rows (R,), index of first matching step (R,))
+        """
+        mask = _mask(self.conditions, arrays, params)
+        if self.daylight and self.block == 'hourly':
+            mask = mask & arrays['daylight']
+
+        valid = ~np.isnan(arrays['time'])
+        if self.horizon:
+            mask = mask[:, :self.horizon]
+            valid = valid[:, :self.horizon]
+        if not mask.shape[1]:
+            rows = mask.shape[0]
+            return np.zeros(rows, dtype=bool), np.zeros(rows, dtype=int)
+
+        if self.match == 'all':
+            triggered = (mask | ~valid).all(axis=1) & valid.any(axis=1)
+        else:
+            triggered = mask.sum(axis=1) >= self.min_count
+        return triggered, mask.argmax(axis=1)
+
+
+class Window:
+    def __init__(self, spec):
+        self.id = spec['id']
+        self.min_hours = spec.get('min_hours', 1)
+        self.daylight = spec.get('daylight', False)
+        self.conditions = [Condition(condition) for condition in spec['when']]
+
+    def runs(self, arrays, params):
+        """
+        Find runs of at least `min_hours` consecutive suitable hours
+
+        Returns:
+            tuple: (row, start index, end index exclusive) arrays
+        """
+        mask = _mask(self.conditions, arrays, params)
+        if self.daylight:
+            mask = mask & arrays['daylight']
+
+        padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = mask
+        edges = np.diff(padded, axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)
+        long_enough = (ends - starts) >= self.min_hours
+        return rows[long_enough], starts[long_enough], ends[long_enough]
+
+
+class RuleEngine:
+    """
+    Farming recommendations from data-driven rules (see rules.json)
+
+    Rules are compiled once and evaluated over whole hourly/daily forecast
+    arrays. Many forecasts are evaluated together as (rows x steps)
+    matrices, one row per (forecast, crop) pair, so the cost of a batch is
+    a handful of NumPy operations per rule rather than a Python loop per
+    farm and hour.
+    """
+
+    def __init__(self, config):
+        self.crops = config['crops']
+        self.aliases = config.get('aliases', {})
+        self.param_names = sorted(self.crops['default'])
+        self.rules = [Rule(spec) for spec in config['rules']]
+        self.windows = [Window(spec) for spec in config['windows']]
+
+    @classmethod
+    def from_file(cls, path=RULES_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def parse_crops(self, primary_crops):
+        """
+        Map a FarmerProfile.primary_crops string ("Maize, beans") to known crops
+
+        Unknown crops are dropped; no known crop means the default thresholds.
+        """
+        crops = []
+        for name in (primary_crops or '').replace(';', ',').split(','):
+            name = name.strip().lower()
+            name = self.aliases.get(name, name)
+            if name in self.crops and name != 'default' and name not in crops:
+                crops.append(name)
+        return crops or ['default']
+
+    def evaluate(self, forecasts, crops=None):
+        """
+        Evaluate all rules for a batch of forecasts
+
+        Args:
+            forecasts (list): Compact forecasts (Forecast.raw), SI units
+            crops (list): Crop name lists, one per forecast (default thresholds if omitted)
+
+        Returns:
+            list: One recommendations dict per forecast
+        """
+        if not forecasts:
+            return []
+        crops = crops or [['default']] * len(forecasts)
+
+        hourly = stack_block(forecasts, 'hourly', HOURLY_FIELDS)
+        daily = stack_block(forecasts, 'daily', DAILY_FIELDS)
+        hourly['daylight'] = daylight_mask(hourly, daily)
+
+        # One row per (forecast, crop); windows only depend on the forecast
+        row_forecast = np.array([i for i, names in enumerate(crops) for _ in names])
+        row_crop = [name for names in crops for name in names]
+        params = {
+            name: np.array([self.crops[crop][name] for crop in row_crop], dtype=float)
+            for name in self.param_names
+        }
+        blocks = {
+            'hourly': {field: values[row_forecast] for field, values in hourly.items()},
+            'daily': {field: values[row_forecast] for field, values in daily.items()},
+        }
+
+        results = [
+            {**{category: [] for category in CATEGORIES}, 'windows': {}, 'crops': names}
+            for names in crops
+        ]
+
+        for rule in self.rules:
+            arrays = blocks[rule.block]
+            triggered, first = rule.evaluate(arrays, params)
+            for row in np.nonzero(triggered)[0]:
+                when = _format_step(arrays['time'][row, first[row]], rule.block)
+                crop = row_crop[row] if row_crop[row] != 'default' else 'crops'
+                result = results[row_forecast[row]]
+                for action in rule.actions:
+                    message = action['message'].format(crop=crop, when=when)
+                    if message not in result[action['category']]:
+                        result[action['category']].append(message)
+
+        # Windows are crop-independent, evaluated once per forecast
+        window_params = {
+            name: np.full(len(forecasts), value, dtype=float)
+            for name, value in self.crops['default'].items()
+        }
+        for window in self.windows:
+            for result in results:
+                result['windows'][window.id] = []
+            rows, starts, ends = window.runs(hourly, window_params)
+            for row, start, end in zip(rows.tolist(), starts.tolist(), ends.tolist()):
+                found = results[row]['windows'][window.id]
+                if len(found) < MAX_WINDOWS:
+                    found.append({
+                        'start': _format_step(hourly['time'][row, start], 'hourly'),
+                        'end': _format_step(hourly['time'][row, end - 1] + 3600, 'hourly'),
+                        'hours': end - start
+                    })
+
+        return results
+
+
+def stack_block(forecasts, block, fields):
+    """Stack one block of many forecasts into NaN-padded (forecasts x steps) arrays"""
+    columns = [forecast[block] for forecast in forecasts]
+    length = max(len(values['time']) for values in columns)
+    arrays = {}
+    for field in fields:
+        if field in TEXT_FIELDS:
+            continue
+        rows = [values.get(field) or [] for values in columns]
+        rows = [row + [None] * (length - len(row)) if len(row) < length else row for row in rows]
+        arrays[field] = np.array(rows, dtype=float).reshape(len(columns), length)
+    return arrays
+
+
+def daylight_mask(hourly, daily):
+    """True for hours between the day's sunrise and sunset (True if unknown)"""
+    times = hourly['time']
+    if not daily['time'].shape[1]:
+        return np.ones(times.shape, dtype=bool)
+
+    # Index of the day each hour falls in: the number of day starts before it
+    day = (times[:, :, None] >= daily['time'][:, None, :]).sum(axis=2) - 1
+    day = np.clip(day, 0, daily['time'].shape[1] - 1)
+    rows = np.arange(times.shape[0])[:, None]
+    sunrise = daily['sunriseTime'][rows, day]
+    sunset = daily['sunsetTime'][rows, day]
+    return ~(times < sunrise) & ~(times >= sunset)
+
+
+def _format_step(timestamp, block):
+    if timestamp != timestamp:
+        return 'soon'
+    unit = 'D' if block == 'daily' else 'm'
+    return str(np.datetime_as_string(np.datetime64(int(timestamp), 's'), unit=unit)).replace('T', ' ')
+
+
+_engine = None
+
+
+def get_engine():
+    """The process-wide rule engine, compiled from rules.json on first use"""
+    global _engine
+    if _engine is None:
+        _engine = RuleEngine.from_file()
+    return _engine
@@ -1,11 +1,53 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from datetime import datetime, timedelta
-from .models import WeatherCache
+from datetime import timedelta
+from urllib.parse import urlsplit
+from django.db import IntegrityError
+from django.utils import timezone
+from .models import WeatherCache, GeocodeCache, FarmLocation
+from .geocoding import LRUCache, RateLimiter, normalize_city_name
+from .http_client import build_session, get_async_client, get_timeout, httpx
+from .forecast import Forecast, compact_forecast, is_compact
+from .geo import encode
+from .history import append_observations
+from .recommendations import get_engine
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Geocoding is shared by every service instance in the process:
+# coordinates for a city never change, and Nominatim allows 1 request/second
+_geocode_memo = LRUCache(maxsize=getattr(settings, 'GEOCODE_LRU_SIZE', 2048))
+_nominatim_limiter = RateLimiter(
+    min_interval=getattr(settings, 'NOMINATIM_MIN_INTERVAL', 1.0)
+)
+
+
+def bucket_coordinates(latitude, longitude):
+    """
+    Snap coordinates to the weather cache grid
+
+    Nearby farms share one forecast: at the default precision of 2 decimal
+    places a bucket is roughly 1 km across, well below the forecast model's
+    own resolution.
+    """
+    precision = getattr(settings, 'WEATHER_COORD_PRECISION', 2)
+    return round(float(latitude), precision), round(float(longitude), precision)
+
+
+def coordinate_cache_key(latitude, longitude):
+    """WeatherCache key for the bucket containing the given coordinates"""
+    latitude, longitude = bucket_coordinates(latitude, longitude)
+    return f"{latitude},{longitude}"
+
+
+def cache_cutoff():
+    """Cache entries older than this are stale"""
+    ttl = getattr(settings, 'WEATHER_CACHE_TTL_MINUTES', 60)
+    return timezone.now() - timedelta(minutes=ttl)
+
 
 class PirateWeatherService:
     """
@@ -14,146 +56,547 @@ class PirateWeatherService:
     """
     
     BASE_URL = "https://api.pirateweather.net/forecast"
+    GEOCODE_URL = "https://nominatim.openstreetmap.org/search"
+    
+    # Upper bound on parallel upstream fetches within a single request
+    MAX_CONCURRENT_FETCHES = 8
     
     def __init__(self):
         self.api_key = settings.PIRATE_WEATHER_API_KEY
         if not self.api_key:
             logger.warning("Pirate Weather API key not configured")
+        
+        # Shared keep-alive connection pool with retries for all upstream calls
+        self.session = build_session()
     
     def _make_request(self, endpoint, params=None):
-        """Make HTTP request to Pirate Weather API with error handling"""
+        """Make HTTP request to an upstream API (Pirate Weather, Nominatim) with error handling"""
         try:
-            response = requests.get(endpoint, params=params, timeout=10)
+            response = self.session.get(endpoint, params=params, timeout=get_timeout())
             response.raise_for_status()
             return response.json()
         except requests.exceptions.Timeout:
-            logger.error("Pirate Weather API request timed out")
+            logger.error(f"Request to {urlsplit(endpoint).netloc} timed out")
             raise Exception("Weather service timeout. Please try again.")
         except requests.exceptions.RequestException as e:
-            logger.error(f"Pirate Weather API error: {str(e)}")
+            logger.error(f"Request to {urlsplit(endpoint).netloc} failed: {str(e)}")
             raise Exception(f"Weather service error: {str(e)}")
     
-    def get_weather_by_coordinates(self, latitude, longitude, units='si'):
+    def get_forecast(self, latitude, longitude):
         """
-        Get current weather and forecast by coordinates
+        Get the stored forecast for coordinates, fetching it when stale
         
         Args:
             latitude (float): Location latitude
             longitude (float): Location longitude
-            units (str): Unit system - 'si' (metric), 'us', 'uk', 'ca'
         
         Returns:
-            dict: Weather data including current conditions and forecast
+            Forecast: Forecast that renders in any unit system
         """
+        latitude, longitude = bucket_coordinates(latitude, longitude)
         cache_key = f"{latitude},{longitude}"
         
         # Check cache first (1 hour validity)
-        cache = WeatherCache.objects.filter(
-            city=cache_key,
-            cached_at__gte=datetime.now() - timedelta(hours=1)
-        ).first()
-        
-        if cache:
-            logger.info(f"Using cached weather for {cache_key}")
-            return cache.weather_data
+        forecast = self._get_cached(cache_key)
+        if forecast:
+            return forecast
         
         # Fetch from API
         try:
-            # API format: https://api.pirateweather.net/forecast/[apikey]/[latitude],[longitude]
-            url = f"{self.BASE_URL}/{self.api_key}/{latitude},{longitude}"
-            
-            params = {
-                'units': units,  # si (metric), us, uk, ca
-                'exclude': 'minutely,alerts',  # Exclude minute-by-minute and alerts if not needed
-            }
-            
-            logger.info(f"Fetching weather from Pirate Weather API for {latitude},{longitude}")
-            data = self._make_request(url, params)
-            
-            # Process and format the response
-            weather_data = self._format_weather_data(data)
-            
-            # Cache the result
-            WeatherCache.objects.update_or_create(
-                city=cache_key,
-                defaults={'weather_data': weather_data}
-            )
-            
-            return weather_data
+            raw = self.fetch_forecast(latitude, longitude)
+            return self._store(cache_key, raw)
             
         except Exception as e:
             logger.error(f"Failed to fetch weather: {str(e)}")
             raise
     
-    def get_weather_by_city(self, city_name, units='si'):
+    def get_weather_by_coordinates(self, latitude, longitude, units='si', view='full'):
         """
-        Get weather by city name (requires geocoding first)
-        Note: Pirate Weather doesn't have built-in geocoding, 
-        so you'll need to convert city to coordinates first
+        Get current weather and forecast by coordinates
         
         Args:
-            city_name (str): City name
-            units (str): Unit system
+            latitude (float): Location latitude
+            longitude (float): Location longitude
+            units (str): Unit system - 'si' (metric), 'us', 'uk', 'ca'
+            view (str): 'full' or 'forecast' (hourly and daily only)
         
         Returns:
-            dict: Weather data
+            dict: Weather data including current conditions and forecast
+        """
+        return self.get_forecast(latitude, longitude).render(units, view)
+    
+    def fetch_forecast(self, latitude, longitude):
+        """
+        Fetch a forecast from Pirate Weather, bypassing the cache
+        
+        The forecast is always requested in SI units and stored in compact
+        form; other unit systems are derived when rendering.
+        
+        Args:
+            latitude (float): Location latitude
+            longitude (float): Location longitude
+        
+        Returns:
+            dict: Compact forecast (see forecast.compact_forecast)
         """
-        # Check cache first
+        url, params = self._forecast_request(latitude, longitude)
+        
+        logger.info(f"Fetching weather from Pirate Weather API for {latitude},{longitude}")
+        data = self._make_request(url, params)
+        
+        return compact_forecast(data)
+    
+    def _forecast_request(self, latitude, longitude):
+        """Build the forecast URL and query parameters"""
+        # API format: https://api.pirateweather.net/forecast/[apikey]/[latitude],[longitude]
+        url = f"{self.BASE_URL}/{self.api_key}/{latitude},{longitude}"
+        
+        params = {
+            'units': 'si',  # Converted to us, uk, ca when rendering
+            'exclude': 'minutely,alerts',  # Exclude minute-by-minute and alerts if not needed
+        }
+        return url, params
+    
+    def _get_cached(self, cache_key):
+        """Return the fresh cached Forecast for a key, or None"""
         cache = WeatherCache.objects.filter(
-            city=city_name,
-            cached_at__gte=datetime.now() - timedelta(hours=1)
+            city=cache_key,
+            cached_at__gte=cache_cutoff()
         ).first()
         
-        if cache:
-            logger.info(f"Using cached weather for {city_name}")
-            return cache.weather_data
+        # Entries in the old pre-formatted layout are treated as stale
+        if cache and is_compact(cache.weather_data):
+            logger.info(f"Using cached weather for {cache_key}")
+            return Forecast(cache_key, cache.weather_data, cache.cached_at)
+        return None
+    
+    def _store(self, cache_key, raw):
+        cache, _ = WeatherCache.objects.update_or_create(
+            city=cache_key,
+            defaults={'weather_data': raw}
+        )
+        self._record_history({cache_key: raw})
+        return Forecast(cache_key, raw, cache.cached_at)
+    
+    def _record_history(self, entries):
+        """Append current conditions to the observation history (never fails the request)"""
+        try:
+            append_observations(entries)
+        except Exception as e:
+            logger.error(f"Failed to record weather history: {str(e)}")
+    
+    def get_forecast_by_city(self, city_name):
+        """
+        Get the forecast for a city name (requires geocoding first)
+        Note: Pirate Weather doesn't have built-in geocoding, 
+        so the city is converted to coordinates first
+        
+        Args:
+            city_name (str): City name
         
-        # Get coordinates for city (you can use a geocoding service)
+        Returns:
+            Forecast: Forecast for the city's coordinate bucket
+        """
         coordinates = self._geocode_city(city_name)
         
         if not coordinates:
             raise Exception(f"Could not find coordinates for {city_name}")
         
-        # Fetch weather using coordinates
-        weather_data = self.get_weather_by_coordinates(
-            coordinates['lat'],
-            coordinates['lon'],
-            units
-        )
+        return self.get_forecast(coordinates['lat'], coordinates['lon'])
+    
+    def get_weather_by_city(self, city_name, units='si', view='full'):
+        """
+        Get weather by city name
         
-        # Update cache with city name
-        WeatherCache.objects.update_or_create(
-            city=city_name,
-            defaults={'weather_data': weather_data}
-        )
+        Args:
+            city_name (str): City name
+            units (str): Unit system
+            view (str): 'full' or 'forecast'
         
-        return weather_data
+        Returns:
+            dict: Weather data
+        """
+        return self.get_forecast_by_city(city_name).render(units, view)
     
+    def get_forecast_for_location(self, location):
+        """
+        Get the forecast for a FarmLocation
+
+        Locations without coordinates are geocoded once and the result is
+        stored back on the row, so later requests skip geocoding entirely.
+
+        Args:
+            location (FarmLocation): Farm location
+
+        Returns:
+            Forecast: Forecast for the location
+        """
+        if location.latitude is None or location.longitude is None:
+            if not self.geocode_location(location):
+                raise Exception(f"Could not find coordinates for {location.city}")
+
+        return self.get_forecast(float(location.latitude), float(location.longitude))
+
+    def get_weather_for_location(self, location, units='si', view='full'):
+        """
+        Get weather for a FarmLocation
+
+        Args:
+            location (FarmLocation): Farm location
+            units (str): Unit system
+            view (str): 'full' or 'forecast'
+
+        Returns:
+            dict: Weather data
+        """
+        return self.get_forecast_for_location(location).render(units, view)
+
+    def get_forecasts_for_locations(self, locations):
+        """
+        Get forecasts for several FarmLocations at once
+        
+        Fresh cache entries for all locations are read with a single IN
+        query, and the remaining coordinate buckets are fetched concurrently
+        and stored in one bulk upsert. A failure only affects the locations
+        in the failing bucket.
+        
+        Args:
+            locations (list): FarmLocation objects
+        
+        Returns:
+            dict: {location.id: {'forecast': Forecast} or {'error': message}}
+        """
+        results = {}
+        keys = {}
+        for location in locations:
+            if location.latitude is None or location.longitude is None:
+                if not location.city or not self.geocode_location(location):
+                    results[location.id] = {
+                        'error': f"Could not find coordinates for {location.city}"
+                    }
+                    continue
+            keys[location.id] = coordinate_cache_key(location.latitude, location.longitude)
+        
+        forecasts = {
+            cache.city: Forecast(cache.city, cache.weather_data, cache.cached_at)
+            for cache in WeatherCache.objects.filter(
+                city__in=set(keys.values()),
+                cached_at__gte=cache_cutoff()
+            )
+            if is_compact(cache.weather_data)
+        }
+        
+        missing = {}
+        for location in locations:
+            key = keys.get(location.id)
+            if key and key not in forecasts:
+                missing[key] = bucket_coordinates(location.latitude, location.longitude)
+        
+        errors = {}
+        if missing:
+            workers = min(len(missing), self.MAX_CONCURRENT_FETCHES)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    key: pool.submit(self.fetch_forecast, lat, lon)
+                    for key, (lat, lon) in missing.items()
+                }
+            fetched = {}
+            for key, future in futures.items():
+                try:
+                    fetched[key] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to fetch weather for {key}: {str(e)}")
+                    errors[key] = str(e)
+            
+            forecasts.update(self.store_many(fetched))
+        
+        for location_id, key in keys.items():
+            if key in forecasts:
+                results[location_id] = {'forecast': forecasts[key]}
+            else:
+                results[location_id] = {'error': errors.get(key, 'Weather unavailable')}
+        return results
+    
+    def store_many(self, entries):
+        """
+        Upsert several compact forecasts in one statement
+        
+        Args:
+            entries (dict): {cache_key: compact forecast}
+        
+        Returns:
+            dict: {cache_key: Forecast}
+        """
+        if not entries:
+            return {}
+        caches = WeatherCache.objects.bulk_create(
+            [WeatherCache(city=key, weather_data=raw) for key, raw in entries.items()],
+            update_conflicts=True,
+            unique_fields=['city'],
+            update_fields=['weather_data', 'cached_at'],
+        )
+        self._record_history(entries)
+        return {
+            cache.city: Forecast(cache.city, cache.weather_data, cache.cached_at)
+            for cache in caches
+        }
+
+    def geocode_location(self, location):
+        """
+        Fill in and persist missing coordinates of a FarmLocation from its city
+
+        Args:
+            location (FarmLocation): Farm location
+
+        Returns:
+            bool: True if the location now has coordinates
+        """
+        coordinates = self._geocode_city(location.city)
+        if not coordinates:
+            return False
+
+        location.latitude = coordinates['lat']
+        location.longitude = coordinates['lon']
+        location.geohash = encode(location.latitude, location.longitude)
+        FarmLocation.objects.filter(pk=location.pk).update(
+            latitude=location.latitude,
+            longitude=location.longitude,
+            geohash=location.geohash
+        )
+        return True
+
     def _geocode_city(self, city_name):
+        """
+        Resolve a city name to coordinates
+
+        Lookups go through an in-memory LRU, then the persistent GeocodeCache
+        table, and only then to OpenStreetMap Nominatim (rate limited to its
+        1 request/second usage policy). Upstream results are stored in both.
+
+        Args:
+            city_name (str): City name
+
+        Returns:
+            dict: {'lat': latitude, 'lon': longitude}
+        """
+        normalized = normalize_city_name(city_name)
+        if not normalized:
+            return None
+
+        coordinates = self._geocode_city_local(normalized)
+        if coordinates:
+            return coordinates
+
+        coordinates = self._geocode_city_upstream(city_name)
+        if coordinates:
+            self._remember_geocode(city_name, normalized, coordinates)
+        return coordinates
+
+    def _geocode_city_local(self, normalized):
+        """Look up a normalized city name in the LRU, then in GeocodeCache"""
+        coordinates = _geocode_memo.get(normalized)
+        if coordinates:
+            return coordinates
+
+        cached = GeocodeCache.objects.filter(normalized_name=normalized).first()
+        if cached:
+            coordinates = {'lat': cached.latitude, 'lon': cached.longitude}
+            _geocode_memo.set(normalized, coordinates)
+            return coordinates
+        return None
+
+    def cached_city_key(self, city_name):
+        """
+        WeatherCache key for a city that has been geocoded before
+
+        Only the LRU and GeocodeCache are consulted, never Nominatim, so this
+        is cheap enough for conditional request validators.
+
+        Returns:
+            str: Cache key, or None if the city is not known locally
+        """
+        normalized = normalize_city_name(city_name)
+        coordinates = self._geocode_city_local(normalized) if normalized else None
+        if not coordinates:
+            return None
+        return coordinate_cache_key(coordinates['lat'], coordinates['lon'])
+
+    def _remember_geocode(self, city_name, normalized, coordinates):
+        """Store an upstream geocoding result in GeocodeCache and the LRU"""
+        try:
+            GeocodeCache.objects.get_or_create(
+                normalized_name=normalized,
+                defaults={
+                    'query': city_name.strip(),
+                    'latitude': coordinates['lat'],
+                    'longitude': coordinates['lon']
+                }
+            )
+        except IntegrityError:
+            # Another worker stored the same city concurrently
+            pass
+
+        _geocode_memo.set(normalized, coordinates)
+
+    def _geocode_city_upstream(self, city_name):
         """
         Simple geocoding using OpenStreetMap Nominatim (free, no API key needed)
         Alternative: Use Google Geocoding API or other services
-        
+
         Args:
             city_name (str): City name
-        
+
         Returns:
             dict: {'lat': latitude, 'lon': longitude}
         """
         try:
-            geocode_url = "https://nominatim.openstreetmap.org/search"
+            geocode_url = self.GEOCODE_URL
             params = {
                 'q': city_name,
                 'format': 'json',
                 'limit': 1
             }
-            headers = {
-                'User-Agent': 'CropSense-AI/1.0'  # Required by Nominatim
-            }
-            
-            response = requests.get(geocode_url, params=params, headers=headers, timeout=5)
+
+            # The session sends the User-Agent header Nominatim requires
+            _nominatim_limiter.wait()
+            logger.info(f"Geocoding {city_name} via Nominatim")
+            response = self.session.get(
+                geocode_url,
+                params=params,
+                timeout=get_timeout(read_timeout=5)
+            )
             response.raise_for_status()
             results = response.json()
+
+            if results:
+                return {
+                    'lat': float(results[0]['lat']),
+                    'lon': float(results[0]['lon'])
+                }
+            return None
+
+        except Exception as e:
+            logger.error(f"Geocoding failed for {city_name}: {str(e)}")
+            return None
+
+    # Async variants, used by the ASGI views in async_views.py. They share the
+    # caches above but use the pooled httpx client and the async ORM, and run
+    # independent lookups concurrently.
+    
+    async def _amake_request(self, endpoint, params=None):
+        """Async HTTP request to an upstream API with error handling"""
+        client = get_async_client()
+        if client is None:
+            # httpx not installed: run the pooled sync client in a thread
+            return await sync_to_async(self._make_request, thread_sensitive=False)(endpoint, params)
+        
+        try:
+            response = await client.get(endpoint, params=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.TimeoutException:
+            logger.error(f"Request to {urlsplit(endpoint).netloc} timed out")
+            raise Exception("Weather service timeout. Please try again.")
+        except httpx.HTTPError as e:
+            logger.error(f"Request to {urlsplit(endpoint).netloc} failed: {str(e)}")
+            raise Exception(f"Weather service error: {str(e)}")
+    
+    async def afetch_forecast(self, latitude, longitude):
+        """Async version of fetch_forecast"""
+        url, params = self._forecast_request(latitude, longitude)
+        
+        logger.info(f"Fetching weather from Pirate Weather API for {latitude},{longitude}")
+        data = await self._amake_request(url, params)
+        return compact_forecast(data)
+    
+    async def _aget_cached(self, cache_key):
+        """Async version of _get_cached"""
+        cache = await WeatherCache.objects.filter(
+            city=cache_key,
+            cached_at__gte=cache_cutoff()
+        ).afirst()
+        
+        if cache and is_compact(cache.weather_data):
+            logger.info(f"Using cached weather for {cache_key}")
+            return Forecast(cache_key, cache.weather_data, cache.cached_at)
+        return None
+    
+    async def _astore(self, cache_key, raw):
+        cache, _ = await WeatherCache.objects.aupdate_or_create(
+            city=cache_key,
+            defaults={'weather_data': raw}
+        )
+        await sync_to_async(self._record_history)({cache_key: raw})
+        return Forecast(cache_key, raw, cache.cached_at)
+    
+    async def aget_forecast(self, latitude, longitude):
+        """Async version of get_forecast"""
+        latitude, longitude = bucket_coordinates(latitude, longitude)
+        cache_key = f"{latitude},{longitude}"
+        
+        forecast = await self._aget_cached(cache_key)
+        if forecast:
+            return forecast
+        
+        try:
+            raw = await self.afetch_forecast(latitude, longitude)
+            return await self._astore(cache_key, raw)
+        except Exception as e:
+            logger.error(f"Failed to fetch weather: {str(e)}")
+            raise
+    
+    async def aget_forecast_by_city(self, city_name):
+        """Async version of get_forecast_by_city"""
+        normalized = normalize_city_name(city_name)
+        coordinates = await self._ageocode_city_local(normalized)
+        
+        if not coordinates and normalized:
+            coordinates = await self._ageocode_city_upstream(city_name)
+            if coordinates:
+                await sync_to_async(self._remember_geocode)(city_name, normalized, coordinates)
+        
+        if not coordinates:
+            raise Exception(f"Could not find coordinates for {city_name}")
+        
+        return await self.aget_forecast(coordinates['lat'], coordinates['lon'])
+    
+    async def aget_forecast_for_location(self, location):
+        """Async version of get_forecast_for_location"""
+        if location.latitude is None or location.longitude is None:
+            geocoded = await sync_to_async(self.geocode_location)(location)
+            if not geocoded:
+                raise Exception(f"Could not find coordinates for {location.city}")
+        
+        return await self.aget_forecast(float(location.latitude), float(location.longitude))
+    
+    async def _ageocode_city_local(self, normalized):
+        """Async version of _geocode_city_local"""
+        if not normalized:
+            return None
+        
+        coordinates = _geocode_memo.get(normalized)
+        if coordinates:
+            return coordinates
+        
+        cached = await GeocodeCache.objects.filter(normalized_name=normalized).afirst()
+        if cached:
+            coordinates = {'lat': cached.latitude, 'lon': cached.longitude}
+            _geocode_memo.set(normalized, coordinates)
+            return coordinates
+        return None
+    
+    async def _ageocode_city_upstream(self, city_name):
+        """Async version of _geocode_city_upstream"""
+        try:
+            params = {
+                'q': city_name,
+                'format': 'json',
+                'limit': 1
+            }
+            
+            await _nominatim_limiter.wait_async()
+            logger.info(f"Geocoding {city_name} via Nominatim")
+            results = await self._amake_request(self.GEOCODE_URL, params)
             
             if results:
                 return {
@@ -166,127 +609,36 @@ class PirateWeatherService:
             logger.error(f"Geocoding failed for {city_name}: {str(e)}")
             return None
     
-    def _format_weather_data(self, data):
+    def get_recommendations(self, forecast, crops=None):
         """
-        Format Pirate Weather API response to simplified structure
-        
+        Generate farming recommendations for the whole forecast
+
         Args:
-            data (dict): Raw API response
-        
+            forecast (Forecast): Stored forecast
+            crops (list): Crop names from RuleEngine.parse_crops (default thresholds if omitted)
+
         Returns:
-            dict: Formatted weather data
+            dict: Farming recommendations
         """
-        current = data.get('currently', {})
-        hourly = data.get('hourly', {}).get('data', [])[:24]  # Next 24 hours
-        daily = data.get('daily', {}).get('data', [])[:7]  # Next 7 days
-        
-        formatted = {
-            'location': {
-                'latitude': data.get('latitude'),
-                'longitude': data.get('longitude'),
-                'timezone': data.get('timezone', 'Unknown')
-            },
-            'current': {
-                'time': datetime.fromtimestamp(current.get('time', 0)).isoformat(),
-                'summary': current.get('summary', 'N/A'),
-                'icon': current.get('icon', 'unknown'),
-                'temperature': current.get('temperature'),
-                'feels_like': current.get('apparentTemperature'),
-                'humidity': current.get('humidity', 0) * 100,  # Convert to percentage
-                'pressure': current.get('pressure'),
-                'wind_speed': current.get('windSpeed'),
-                'wind_direction': current.get('windBearing'),
-                'cloud_cover': current.get('cloudCover', 0) * 100,
-                'uv_index': current.get('uvIndex'),
-                'visibility': current.get('visibility'),
-                'precipitation_probability': current.get('precipProbability', 0) * 100,
-                'precipitation_intensity': current.get('precipIntensity'),
-                'precipitation_type': current.get('precipType', 'none')
-            },
-            'hourly_forecast': [
-                {
-                    'time': datetime.fromtimestamp(hour.get('time', 0)).strftime('%Y-%m-%d %H:%M'),
-                    'temperature': hour.get('temperature'),
-                    'precipitation_probability': hour.get('precipProbability', 0) * 100,
-                    'icon': hour.get('icon', 'unknown'),
-                    'summary': hour.get('summary', 'N/A')
-                }
-                for hour in hourly
-            ],
-            'daily_forecast': [
-                {
-                    'date': datetime.fromtimestamp(day.get('time', 0)).strftime('%Y-%m-%d'),
-                    'summary': day.get('summary', 'N/A'),
-                    'icon': day.get('icon', 'unknown'),
-                    'temperature_high': day.get('temperatureHigh'),
-                    'temperature_low': day.get('temperatureLow'),
-                    'precipitation_probability': day.get('precipProbability', 0) * 100,
-                    'precipitation_type': day.get('precipType', 'none'),
-                    'humidity': day.get('humidity', 0) * 100,
-                    'wind_speed': day.get('windSpeed'),
-                    'sunrise': datetime.fromtimestamp(day.get('sunriseTime', 0)).strftime('%H:%M'),
-                    'sunset': datetime.fromtimestamp(day.get('sunsetTime', 0)).strftime('%H:%M')
-                }
-                for day in daily
-            ],
-            'cached_at': datetime.now().isoformat()
-        }
-        
-        return formatted
-    
-    def get_farming_recommendation(self, weather_data):
+        return self.get_recommendations_many([forecast], [crops] if crops else None)[0]
+
+    def get_recommendations_many(self, forecasts, crops=None):
         """
-        Generate farming recommendations based on weather data
-        
+        Generate farming recommendations for many forecasts in one batch
+
         Args:
-            weather_data (dict): Formatted weather data
-        
+            forecasts (list): Forecast objects
+            crops (list): Crop name lists, one per forecast
+
         Returns:
-            dict: Farming recommendations
+            list: Recommendations dicts, in the order of `forecasts`
         """
-        current = weather_data['current']
-        daily = weather_data['daily_forecast']
-        
-        recommendations = {
-            'irrigation': [],
-            'precautions': [],
-            'best_activities': []
-        }
-        
-        # Temperature-based recommendations
-        temp = current['temperature']
-        if temp > 35:
-            recommendations['precautions'].append("🌡️ High temperature alert! Ensure adequate irrigation.")
-            recommendations['irrigation'].append("Increase watering frequency")
-        elif temp < 5:
-            recommendations['precautions'].append("❄️ Cold weather! Protect sensitive crops from frost.")
-        
-        # Precipitation recommendations
-        precip_prob = current['precipitation_probability']
-        if precip_prob > 70:
-            recommendations['precautions'].append("🌧️ High chance of rain. Avoid irrigation and pesticide application.")
-            recommendations['irrigation'].append("Skip irrigation today")
-        elif precip_prob < 20:
-            recommendations['irrigation'].append("Low rain probability - consider irrigation")
-        
-        # Humidity recommendations
-        humidity = current['humidity']
-        if humidity > 80:
-            recommendations['precautions'].append("💧 High humidity! Monitor for fungal diseases.")
-        
-        # Wind recommendations
-        wind_speed = current.get('wind_speed', 0)
-        if wind_speed > 20:
-            recommendations['precautions'].append("💨 High winds! Avoid spraying operations.")
-        
-        # Best activities
-        if precip_prob < 30 and 15 < temp < 30 and wind_speed < 15:
-            recommendations['best_activities'].append("✅ Good day for field work and spraying")
-        
-        if precip_prob < 20 and temp > 10:
-            recommendations['best_activities'].append("✅ Suitable for planting and transplanting")
-        
-        return recommendations
+        return get_engine().evaluate([forecast.raw for forecast in forecasts], crops)
+
+    def get_user_crops(self, user):
+        """Known crops from the user's farmer profile ('default' if none)"""
+        profile = getattr(user, 'profile', None)
+        return get_engine().parse_crops(getattr(profile, 'primary_crops', ''))
 
 
 # Create singleton instance
@@ -2,17 +2,26 @@ from django.urls import path
 from .views import (
     CurrentWeatherView,
     WeatherForecastView,
+    PortfolioWeatherView,
+    WeatherHistoryView,
     FarmLocationListCreateView,
     FarmLocationDetailView,
     SetDefaultLocationView
 )
+from .async_views import AsyncCurrentWeatherView, AsyncWeatherForecastView
 
 urlpatterns = [
     # Weather endpoints
     path('current/', CurrentWeatherView.as_view(), name='current-weather'),
     path('forecast/', WeatherForecastView.as_view(), name='weather-forecast'),
+    path('history/', WeatherHistoryView.as_view(), name='weather-history'),
+    
+    # Async (ASGI) weather endpoints
+    path('async/current/', AsyncCurrentWeatherView.as_view(), name='async-current-weather'),
+    path('async/forecast/', AsyncWeatherForecastView.as_view(), name='async-weather-forecast'),
     
     # Farm location endpoints
+    path('locations/weather/', PortfolioWeatherView.as_view(), name='location-portfolio-weather'),
     path('locations/', FarmLocationListCreateView.as_view(), name='location-list'),
     path('locations/<int:pk>/', FarmLocationDetailView.as_view(), name='location-detail'),
     path('locations/<int:pk>/set-default/', SetDefaultLocationView.as_view(), name='set-default-location'),
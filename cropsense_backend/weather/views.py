@@ -1,16 +1,82 @@
+import hashlib
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .services import weather_service
-from .models import FarmLocation
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from cropsense_backend.conditional import conditional_get
+from .services import weather_service, cache_cutoff, coordinate_cache_key
+from .forecast import UNITS
+from .history import HISTORY_FIELDS, RESOLUTIONS, load_range, downsample
+from .models import FarmLocation, WeatherCache
 from .serializers import FarmLocationSerializer
 
 
+def request_cache_key(request, default_location=False):
+    """
+    WeatherCache key of the forecast a request is for, without fetching
+
+    Coordinates, else a city geocoded before, else (if asked) the user's
+    default location with coordinates. None when the key is not known
+    without an upstream call.
+    """
+    latitude = request.query_params.get('lat')
+    longitude = request.query_params.get('lon')
+    city = request.query_params.get('city')
+    if latitude and longitude:
+        try:
+            return coordinate_cache_key(float(latitude), float(longitude))
+        except (TypeError, ValueError):
+            return None
+    if city:
+        return weather_service.cached_city_key(city)
+    if not default_location:
+        return None
+    location = FarmLocation.objects.filter(
+        user=request.user,
+        is_default=True
+    ).values('latitude', 'longitude').first()
+    if location is None or location['latitude'] is None or location['longitude'] is None:
+        return None
+    return coordinate_cache_key(location['latitude'], location['longitude'])
+
+
+def fresh_cached_at(cache_keys):
+    """
+    {cache key: cached_at} for the keys with a fresh WeatherCache entry
+
+    Response validators come from these timestamps; a key without a fresh
+    entry is fetched by the view first, so no validators are sent for it.
+    """
+    return dict(WeatherCache.objects.filter(
+        city__in=set(cache_keys),
+        cached_at__gte=cache_cutoff()
+    ).values_list('city', 'cached_at'))
+
+
+def etag_key(cache_key):
+    """A cache key as it appears in an ETag (If-None-Match lists are comma-separated)"""
+    return cache_key.replace(',', '_')
+
+
 class CurrentWeatherView(APIView):
     """GET: Current weather by coordinates or city"""
     permission_classes = [IsAuthenticated]
     
+    def validators(self, request):
+        # The forecast's cache timestamp plus the crops the recommendations
+        # are for. No Last-Modified: a change of crops does not move it.
+        cache_key = request_cache_key(request, default_location=True)
+        cached_at = fresh_cached_at([cache_key]).get(cache_key) if cache_key else None
+        if cached_at is None:
+            return None, None
+        units = request.query_params.get('units', 'si')
+        crops = '+'.join(weather_service.get_user_crops(request.user))
+        return f"current-{etag_key(cache_key)}-{units}-{crops}-{cached_at.timestamp()}", None
+    
+    @conditional_get(validators)
     def get(self, request):
         # Get parameters
         latitude = request.query_params.get('lat')
@@ -18,17 +84,22 @@ class CurrentWeatherView(APIView):
         city = request.query_params.get('city')
         units = request.query_params.get('units', 'si')  # si=metric, us=imperial
         
+        if units not in UNITS:
+            return Response(
+                {'error': f"units must be one of: {', '.join(UNITS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         try:
             if latitude and longitude:
                 # Get by coordinates
-                weather_data = weather_service.get_weather_by_coordinates(
+                forecast = weather_service.get_forecast(
                     float(latitude), 
-                    float(longitude),
-                    units
+                    float(longitude)
                 )
             elif city:
                 # Get by city name
-                weather_data = weather_service.get_weather_by_city(city, units)
+                forecast = weather_service.get_forecast_by_city(city)
             else:
                 # Use user's default location
                 default_location = FarmLocation.objects.filter(
@@ -42,23 +113,16 @@ class CurrentWeatherView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 
-                if default_location.latitude and default_location.longitude:
-                    weather_data = weather_service.get_weather_by_coordinates(
-                        float(default_location.latitude),
-                        float(default_location.longitude),
-                        units
-                    )
-                else:
-                    weather_data = weather_service.get_weather_by_city(
-                        default_location.city,
-                        units
-                    )
+                forecast = weather_service.get_forecast_for_location(default_location)
             
-            # Get farming recommendations
-            recommendations = weather_service.get_farming_recommendation(weather_data)
+            # Get farming recommendations for the user's crops
+            recommendations = weather_service.get_recommendations(
+                forecast,
+                weather_service.get_user_crops(request.user)
+            )
             
             return Response({
-                'weather': weather_data,
+                'weather': forecast.render(units),
                 'farming_recommendations': recommendations
             })
             
@@ -73,30 +137,221 @@ class WeatherForecastView(APIView):
     """GET: Weather forecast (hourly and daily)"""
     permission_classes = [IsAuthenticated]
     
+    def validators(self, request):
+        # Validators come from the cache row's timestamp, for coordinates or
+        # a known city with a fresh entry
+        cache_key = request_cache_key(request)
+        cached_at = fresh_cached_at([cache_key]).get(cache_key) if cache_key else None
+        if cached_at is None:
+            return None, None
+        units = request.query_params.get('units', 'si')
+        return f"forecast-{etag_key(cache_key)}-{units}-{cached_at.timestamp()}", cached_at
+    
+    @conditional_get(validators)
     def get(self, request):
         latitude = request.query_params.get('lat')
         longitude = request.query_params.get('lon')
         city = request.query_params.get('city')
+        units = request.query_params.get('units', 'si')
+        
+        if units not in UNITS:
+            return Response(
+                {'error': f"units must be one of: {', '.join(UNITS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         try:
             if latitude and longitude:
                 weather_data = weather_service.get_weather_by_coordinates(
                     float(latitude),
-                    float(longitude)
+                    float(longitude),
+                    units,
+                    view='forecast'
                 )
             elif city:
-                weather_data = weather_service.get_weather_by_city(city)
+                weather_data = weather_service.get_weather_by_city(city, units, view='forecast')
             else:
                 return Response(
                     {'error': 'Please provide latitude/longitude or city name'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            return Response(weather_data)
+            
+        except Exception as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class PortfolioWeatherView(APIView):
+    """GET: Current weather and recommendations for all of the user's farm locations"""
+    permission_classes = [IsAuthenticated]
+    
+    def validators(self, request):
+        # A digest of the locations as listed, their forecasts' cache
+        # timestamps and the user's crops; only when every location has a
+        # fresh forecast. No Last-Modified: a removed location does not move it.
+        locations = list(
+            FarmLocation.objects.filter(user=request.user).order_by('-is_default', 'name').values_list(
+                'id', 'name', 'city', 'latitude', 'longitude', 'is_default'
+            )
+        )
+        if any(latitude is None or longitude is None for _, _, _, latitude, longitude, _ in locations):
+            return None, None
+        keys = [coordinate_cache_key(latitude, longitude) for _, _, _, latitude, longitude, _ in locations]
+        cached = fresh_cached_at(keys)
+        if len(cached) < len(set(keys)):
+            return None, None
+        
+        digest = hashlib.md5(repr((
+            locations,
+            [cached[key].timestamp() for key in keys],
+            weather_service.get_user_crops(request.user)
+        )).encode()).hexdigest()
+        return f"portfolio-{request.user.pk}-{request.query_params.get('units', 'si')}-{digest}", None
+    
+    @conditional_get(validators)
+    def get(self, request):
+        units = request.query_params.get('units', 'si')
+        
+        if units not in UNITS:
+            return Response(
+                {'error': f"units must be one of: {', '.join(UNITS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        locations = list(
+            FarmLocation.objects.filter(user=request.user).order_by('-is_default', 'name')
+        )
+        
+        results = weather_service.get_forecasts_for_locations(locations)
+        
+        # Recommendations for every forecast in one batch
+        crops = weather_service.get_user_crops(request.user)
+        forecasts = [results[location.id]['forecast'] for location in locations
+                     if 'forecast' in results[location.id]]
+        recommendations = iter(weather_service.get_recommendations_many(
+            forecasts,
+            [crops] * len(forecasts)
+        ))
+        
+        portfolio = []
+        for location in locations:
+            result = results[location.id]
+            entry = {
+                'location': {
+                    'id': location.id,
+                    'name': location.name,
+                    'city': location.city,
+                    'latitude': location.latitude,
+                    'longitude': location.longitude,
+                    'is_default': location.is_default
+                }
+            }
+            
+            if 'forecast' in result:
+                entry['weather'] = result['forecast'].render(units)
+                entry['farming_recommendations'] = next(recommendations)
+            else:
+                entry['error'] = result['error']
+            portfolio.append(entry)
+        
+        return Response({'locations': portfolio})
+
+
+class WeatherHistoryView(APIView):
+    """GET: Recorded hourly weather for a location, optionally downsampled"""
+    permission_classes = [IsAuthenticated]
+    MAX_DAYS = 400
+    
+    def get(self, request):
+        latitude = request.query_params.get('lat')
+        longitude = request.query_params.get('lon')
+        location_id = request.query_params.get('location')
+        resolution = request.query_params.get('resolution', 'day')
+        fields = request.query_params.get('fields')
+        fields = fields.split(',') if fields else list(HISTORY_FIELDS)
+        
+        if resolution not in RESOLUTIONS:
+            return Response(
+                {'error': f"resolution must be one of: {', '.join(RESOLUTIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        unknown = [field for field in fields if field not in HISTORY_FIELDS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown fields: {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            latitude = float(latitude) if latitude else None
+            longitude = float(longitude) if longitude else None
+            location_id = int(location_id) if location_id else None
+            if latitude is not None and longitude is not None and not (
+                -90 <= latitude <= 90 and -180 <= longitude <= 180
+            ):
+                raise ValueError('coordinates out of range')
+        except ValueError:
+            return Response(
+                {'error': 'lat and lon must be valid coordinates and location a location id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Dates are inclusive, in UTC; the last 30 days by default
+        try:
+            end = request.query_params.get('end')
+            end_date = parse_date(end) if end else timezone.now().date()
+            start = request.query_params.get('start')
+            start_date = parse_date(start) if start else end_date - timedelta(days=29)
+        except (TypeError, ValueError):
+            start_date = end_date = None
+        if not start_date or not end_date or start_date > end_date:
+            return Response(
+                {'error': 'start and end must be dates (YYYY-MM-DD), start before end'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end_date - start_date).days >= self.MAX_DAYS:
+            return Response(
+                {'error': f'Date range is limited to {self.MAX_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if latitude is not None and longitude is not None:
+            bucket = coordinate_cache_key(latitude, longitude)
+        else:
+            locations = FarmLocation.objects.filter(user=request.user)
+            if location_id is not None:
+                location = locations.filter(pk=location_id).first()
+            else:
+                location = locations.filter(is_default=True).first()
+            
+            if not location or location.latitude is None or location.longitude is None:
+                return Response(
+                    {'error': 'Please provide latitude/longitude or a farm location with coordinates'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            bucket = coordinate_cache_key(location.latitude, location.longitude)
+        
+        try:
+            start = datetime.combine(start_date, time.min, tzinfo=dt_timezone.utc)
+            end = datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=dt_timezone.utc)
+            times, values = downsample(*load_range(bucket, start, end, fields), resolution)
+            
             return Response({
-                'hourly_forecast': weather_data['hourly_forecast'],
-                'daily_forecast': weather_data['daily_forecast']
+                'location': bucket,
+                'resolution': resolution,
+                'start': start_date.isoformat(),
+                'end': end_date.isoformat(),
+                'time': [moment.isoformat() for moment in times.tolist()],
+                'values': {
+                    field: [None if value != value else round(value, 2) for value in column.tolist()]
+                    for field, column in values.items()
+                }
             })
-            
+        
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -139,7 +394,13 @@ class FarmLocationDetailView(generics.RetrieveUpdateDestroyAPIView):
                 is_default=True
             ).exclude(id=self.get_object().id).update(is_default=False)
         
-        serializer.save()
+        # Coordinates geocoded from the old city no longer apply
+        data = serializer.validated_data
+        city_changed = 'city' in data and data['city'] != serializer.instance.city
+        if city_changed and 'latitude' not in data and 'longitude' not in data:
+            serializer.save(latitude=None, longitude=None)
+        else:
+            serializer.save()
 
 
 class SetDefaultLocationView(APIView):
@@ -19,9 +19,7 @@ import {
 } from "@/components/ui/card";
 import { useToast } from "@/hooks/use-toast";
 import authService from "@/services/authService";
-import detectionService from "@/services/detectionService";
 import communityService from "@/services/communityService";
-import weatherService from "@/services/weatherService";
 import { Badge } from "@/components/ui/badge";
 
 export default function Dashboard() {
@@ -40,70 +38,34 @@ export default function Dashboard() {
   const fetchAllData = async () => {
     setIsLoading(true);
     try {
-      // Fetch user info (required)
-      try {
-        const userData = await authService.getMe();
-        setUser(userData);
-      } catch (error) {
-        console.error("Failed to fetch user:", error);
-        toast({
-          title: "Failed to load user data",
-          description: "Please try logging in again",
-          variant: "destructive",
-        });
-      }
-
-      // Fetch user statistics (optional)
-      try {
-        const stats = await authService.getStatistics();
-        setStatistics(stats.statistics);
-      } catch (error) {
-        console.log("User statistics not available");
-        // Set default statistics
-        setStatistics({
-          total_detections: 0,
-          total_posts: 0,
-          total_comments: 0,
-          total_tasks: 0,
-          completed_tasks: 0,
-          pending_tasks: 0,
-          total_locations: 0,
-        });
-      }
-
-      // Fetch detection statistics (optional)
-      try {
-        const detStats = await detectionService.getStatistics();
-        setDetectionStats(detStats);
-      } catch (error) {
-        console.log("Detection statistics not available");
-        setDetectionStats({
-          total_detections: 0,
-          most_common_diseases: [],
-          average_confidence: 0,
-          average_confidence_percentage: "0%",
-        });
-      }
-
-      // Fetch recent detections (optional)
-      try {
-        const detections = await detectionService.getHistory();
-        setRecentDetections((detections.results || detections).slice(0, 3));
-      } catch (error) {
-        console.log("No detection history available");
-        setRecentDetections([]);
-      }
-
-      // Fetch weather (optional)
-      try {
-        const weatherData = await weatherService.getCurrentWeather();
-        setWeather(weatherData.weather);
-      } catch (error) {
-        console.log("Weather data not available:", error);
-        setWeather(null);
-      }
+      // One request for the whole page; parts that failed to load are null
+      const data = await authService.getDashboard();
+      setUser(data.user);
+      setStatistics(data.statistics);
+      setDetectionStats(data.detection_statistics);
+      setRecentDetections(data.recent_detections || []);
+      setWeather(data.weather);
     } catch (error) {
       console.error("Dashboard error:", error);
+      toast({
+        title: "Failed to load dashboard",
+        description: "Please try logging in again",
+        variant: "destructive",
+      });
+      setStatistics({
+        total_detections: 0,
+        total_posts: 0,
+        total_comments: 0,
+        total_locations: 0,
+      });
+      setDetectionStats({
+        total_detections: 0,
+        most_common_diseases: [],
+        average_confidence: 0,
+        average_confidence_percentage: "0%",
+      });
+      setRecentDetections([]);
+      setWeather(null);
     } finally {
       setIsLoading(false);
     }
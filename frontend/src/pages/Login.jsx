@@ -67,7 +67,8 @@ export default function Login() {
     } catch (error) {
       toast({
         title: "Login failed",
-        description: "Invalid email or password. Please try again.",
+        // Rate-limited attempts (429) say when to try again
+        description: error?.detail || "Invalid email or password. Please try again.",
         variant: "destructive",
       });
     } finally {
@@ -158,6 +158,17 @@ const authService = {
     }
   },
 
+  // Everything the dashboard shows (user, statistics, recent detections,
+  // upcoming events, cached weather) in one request
+  getDashboard: async () => {
+    try {
+      const response = await API.get(`${API_BASE_URL}/dashboard/`);
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || error.message;
+    }
+  },
+
   getCurrentUser: async () => {
     try {
       const response = await API.get(`${API_BASE_URL}/me/`);
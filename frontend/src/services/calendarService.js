@@ -34,6 +34,7 @@ const calendarService = {
           eventData.date instanceof Date
             ? eventData.date.toISOString().split("T")[0]
             : eventData.date,
+        recurrence: eventData.recurrence?.trim() || "",
       };
 
       const response = await API.post(`${API_BASE_URL}/`, formattedData);
@@ -53,6 +54,7 @@ const calendarService = {
           eventData.date instanceof Date
             ? eventData.date.toISOString().split("T")[0]
             : eventData.date,
+        recurrence: eventData.recurrence?.trim() || "",
       };
 
       const response = await API.put(
@@ -88,16 +90,16 @@ const calendarService = {
     }
   },
 
-  // Get events for specific date range
+  // Get event occurrences (recurring events expanded) in a date range
   getEventsByDateRange: async (startDate, endDate) => {
     try {
       const response = await API.get(`${API_BASE_URL}/`, {
         params: {
-          start_date:
+          start:
             startDate instanceof Date
               ? startDate.toISOString().split("T")[0]
               : startDate,
-          end_date:
+          end:
             endDate instanceof Date
               ? endDate.toISOString().split("T")[0]
               : endDate,
@@ -108,6 +110,42 @@ const calendarService = {
       throw error.response?.data || error.message;
     }
   },
+
+  // Upcoming events whose forecast weather does not suit them, with a suggested day
+  getSuggestions: async () => {
+    try {
+      const response = await API.get(`${API_BASE_URL}/suggestions/`);
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || error.message;
+    }
+  },
+
+  // Download the calendar as an iCalendar (.ics) file
+  exportCalendar: async () => {
+    try {
+      const response = await API.get(`${API_BASE_URL}/export/`, {
+        responseType: "blob",
+      });
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || error.message;
+    }
+  },
+
+  // Import events from an iCalendar (.ics) file
+  importCalendar: async (file) => {
+    try {
+      const formData = new FormData();
+      formData.append("file", file);
+      const response = await API.post(`${API_BASE_URL}/import/`, formData, {
+        headers: { "Content-Type": "multipart/form-data" },
+      });
+      return response.data;
+    } catch (error) {
+      throw error.response?.data || error.message;
+    }
+  },
 };
 
 export default calendarService;
@@ -25,7 +25,15 @@ const detectionService = {
   getHistory: async () => {
     try {
       const response = await API.get(`${API_BASE_URL}/history/`);
-      return response.data;
+      const data = response.data;
+      // Rows reference their disease by id; attach the page's disease details
+      if (data.diseases && data.results) {
+        data.results = data.results.map((item) => ({
+          ...item,
+          disease_details: data.diseases[item.detected_disease] || null,
+        }));
+      }
+      return data;
     } catch (error) {
       throw error.response?.data || error.message;
     }